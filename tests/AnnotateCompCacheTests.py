@@ -0,0 +1,96 @@
+##
+# File: AnnotateCompCacheTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for AnnotateCompCache module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from wwpdb.apps.chemeditor.webapp.AnnotateCompCache import AnnotateCompCache
+
+
+class AnnotateCompCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__cachePath = os.path.join(self.__tmpDir.name, "cache")
+        os.mkdir(self.__cachePath)
+        self.__inPath = self.__writeFile("in.cif", "data_ATP\n_chem_comp.id ATP\n")
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeFile(self, fileName, text):
+        filePath = os.path.join(self.__tmpDir.name, fileName)
+        with open(filePath, "w") as ofh:
+            ofh.write(text)
+        return filePath
+
+    def testHitAndMiss(self):
+        """Tests storing and retrieving an annotated file"""
+        cache = AnnotateCompCache(self.__cachePath, log=io.StringIO())
+        key = cache.getKey(self.__inPath, "annotateComp:1")
+        outPath = os.path.join(self.__tmpDir.name, "out.cif")
+        self.assertFalse(cache.get(key, outPath))
+        self.assertTrue(cache.put(key, self.__writeFile("result.cif", "data_ATP\n_chem_comp.name ATP\n")))
+        self.assertTrue(cache.get(key, outPath))
+        with open(outPath) as ifh:
+            self.assertEqual(ifh.read(), "data_ATP\n_chem_comp.name ATP\n")
+        self.assertEqual(cache.getStats(), {"hits": 1, "misses": 1})
+
+    def testKeyNormalization(self):
+        """Tests that white space differences do not change the key but tool versions do"""
+        cache = AnnotateCompCache(self.__cachePath, log=io.StringIO())
+        otherPath = self.__writeFile("other.cif", "data_ATP  \r\n\r\n_chem_comp.id ATP\r\n")
+        self.assertEqual(cache.getKey(self.__inPath, "v1"), cache.getKey(otherPath, "v1"))
+        self.assertNotEqual(cache.getKey(self.__inPath, "v1"), cache.getKey(self.__inPath, "v2"))
+
+    def testEviction(self):
+        """Tests that the least recently used entries are evicted when the cache is full"""
+        cache = AnnotateCompCache(self.__cachePath, maxBytes=250, evictInterval=1, log=io.StringIO())
+        resultPath = self.__writeFile("result.cif", "x" * 100)
+        for i, key in enumerate(("a", "b", "c")):
+            cache.put(key, resultPath)
+            entryPath = os.path.join(self.__cachePath, key + ".cif")
+            os.utime(entryPath, (1000 + i, 1000 + i))
+        outPath = os.path.join(self.__tmpDir.name, "out.cif")
+        self.assertTrue(cache.get("c", outPath))
+        cache.put("d", resultPath)
+        self.assertFalse(cache.get("a", outPath))
+        self.assertFalse(cache.get("b", outPath))
+        self.assertTrue(cache.get("d", outPath))
+
+    def testEvictionBound(self):
+        """Tests that stores never leave the cache above maxBytes and that the directory is only scanned when needed"""
+        cache = AnnotateCompCache(self.__cachePath, maxBytes=250, evictInterval=64, log=io.StringIO())
+        resultPath = self.__writeFile("result.cif", "x" * 100)
+        with patch("os.scandir", side_effect=os.scandir) as scandirMock:
+            for i, key in enumerate(("a", "b", "c", "d")):
+                cache.put(key, resultPath)
+                os.utime(os.path.join(self.__cachePath, key + ".cif"), (1000 + i, 1000 + i))
+                self.assertLessEqual(sum(os.path.getsize(os.path.join(self.__cachePath, name)) for name in os.listdir(self.__cachePath)), 250)
+        # the first store measures the directory, the third and fourth push the estimate past the bound
+        self.assertEqual(scandirMock.call_count, 3)
+        self.assertEqual(sorted(os.listdir(self.__cachePath)), ["c.cif", "d.cif"])
+
+    def testTextFieldNormalization(self):
+        """Tests that blank lines and trailing white space inside text fields change the key"""
+        cache = AnnotateCompCache(self.__cachePath, log=io.StringIO())
+        firstPath = self.__writeFile("first.cif", "data_ATP\n_chem_comp.name\n;line one\n\nline two\n;\n")
+        secondPath = self.__writeFile("second.cif", "data_ATP\n_chem_comp.name\n;line one\nline two\n;\n")
+        self.assertNotEqual(cache.getKey(firstPath, "v1"), cache.getKey(secondPath, "v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+##
+# File: ArchiveUploadTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ArchiveUpload module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, Mock, patch
+
+from wwpdb.apps.chemeditor.webapp import ArchiveUpload as ArchiveUploadModule
+from wwpdb.apps.chemeditor.webapp.ArchiveUpload import ArchiveUpload, getArchiveExecutor
+
+CIF = "data_ATP\n_chem_comp.id ATP\n#\ndata_BAD\n_chem_comp.id BAD\n#\ndata_CRASH\n_chem_comp.id CRASH\n#\ndata_NEW\n_chem_comp.id NEW\n#\n"
+
+
+class _InputRequestStub:
+    def __init__(self, paramDict, verbose=False, log=None):  # pylint: disable=unused-argument
+        self.__valueD = dict(paramDict)
+
+    def setValue(self, name, value):
+        self.__valueD[name] = value
+
+    def getValue(self, name):
+        return self.__valueD.get(name, "")
+
+
+class _SearchStub:
+    """Matches ATP to itself, fails to annotate BAD and raises for CRASH"""
+
+    def __init__(self, reqObj=None, verbose=False, log=None):  # pylint: disable=unused-argument
+        self.__reqObj = reqObj
+        self.__ccId = reqObj.getValue("cif").split()[0][5:]
+        self.__reqObj.setValue("sessionid", "session_" + self.__ccId)
+
+    def GetResult(self):
+        if self.__ccId == "CRASH":
+            raise RuntimeError("worker crashed")
+        return "ATP\n" if self.__ccId == "ATP" else ""
+
+    def getErrorMessage(self):
+        return "annotateComp failed" if self.__ccId == "BAD" else ""
+
+
+class ArchiveUploadTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__filePath = os.path.join(self.__tmpDir.name, "upload.cif")
+        with open(self.__filePath, "w") as ofh:
+            ofh.write(CIF)
+        self.__executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.__executor.shutdown)
+        self.__getExecutorMock = Mock(return_value=self.__executor)
+        module = "wwpdb.apps.chemeditor.webapp.ArchiveUpload."
+        for target, value in (
+            ("getArchiveExecutor", self.__getExecutorMock),
+            ("getMaxUploadBytes", Mock(return_value=1 << 20)),
+            ("InputRequest", _InputRequestStub),
+            ("Search", _SearchStub),
+        ):
+            patcher = patch(module + target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __getResult(self):
+        reqObj = MagicMock()
+        reqObj.getValue.side_effect = lambda name: {"WWPDB_SITE_ID": "TEST_SITE", "TopSessionPath": self.__tmpDir.name, "exact": "yes"}.get(name, "")
+        return ArchiveUpload(reqObj=reqObj, log=io.StringIO()).GetResult(self.__filePath)
+
+    def testGetResult(self):
+        """Tests the ok/failed summary of the components of an upload"""
+        summaryList = self.__getResult()
+        self.assertEqual(
+            [(summary["id"], summary["status"], summary["sessionid"], summary["matches"], summary["message"]) for summary in summaryList],
+            [
+                ("ATP", "ok", "session_ATP", ["ATP"], ""),
+                ("BAD", "failed", "session_BAD", [], "annotateComp failed"),
+                ("CRASH", "failed", "", [], "worker crashed"),
+                ("NEW", "ok", "session_NEW", [], ""),
+            ],
+        )
+        self.assertEqual({summary["source"] for summary in summaryList}, {"upload.cif"})
+
+    def testBrokenExecutor(self):
+        """Tests that a pool broken by a dead worker is replaced"""
+        brokenExecutor = Mock()
+        brokenExecutor.submit.side_effect = BrokenProcessPool("worker died")
+        self.__getExecutorMock.side_effect = [brokenExecutor, self.__executor]
+        self.assertEqual([summary["status"] for summary in self.__getResult()], ["ok", "failed", "failed", "ok"])
+        brokenExecutor.shutdown.assert_called_once_with(wait=False)
+
+    def testSharedExecutor(self):
+        """Tests that all requests share one process pool"""
+        with patch.dict(ArchiveUploadModule._executorD, clear=True):  # pylint: disable=protected-access
+            executor = getArchiveExecutor(workers=1)
+            self.assertIs(getArchiveExecutor(workers=1), executor)
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
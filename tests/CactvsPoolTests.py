@@ -0,0 +1,89 @@
+##
+# File: CactvsPoolTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CactvsPool module.  A small script speaking the interpreter protocol stands in for csts."""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.CactvsPool import CactvsError, CactvsPool
+
+FAKE_CSTS = """#!%(python)s
+import base64
+import os
+import sys
+import time
+
+for line in sys.stdin:
+    if not line.startswith("serve "):
+        continue
+    _cmd, b64, hflag = line.split()
+    data = base64.b64decode(b64).decode()
+    if "SLOW" in data:
+        time.sleep(5)
+    if "FAIL" in data:
+        sys.stdout.write("@@GET2D ERR %%s\\n" %% base64.b64encode(b"bad molfile").decode())
+    else:
+        result = "%%s|%%s|%%d" %% (data.strip(), hflag, os.getpid())
+        sys.stdout.write("noise line\\n@@GET2D OK %%s\\n" %% base64.b64encode(result.encode()).decode())
+    sys.stdout.flush()
+"""
+
+
+class CactvsPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        filePath = os.path.join(self.__tmpDir.name, "csts")
+        with open(filePath, "w") as ofh:
+            ofh.write(FAKE_CSTS % {"python": sys.executable})
+        os.chmod(filePath, 0o755)
+        self.__lfh = io.StringIO()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testLayout(self):
+        pool = CactvsPool(self.__tmpDir.name, workers=1, maxCalls=3, timeout=2.0, log=self.__lfh)
+        data, hflag, pid1 = pool.layout("MOL1", hflag=True).split("|")
+        self.assertEqual((data, hflag), ("MOL1", "1"))
+        # a reported error keeps the interpreter
+        self.assertRaises(CactvsError, pool.layout, "FAIL")
+        self.assertEqual(pool.layout("MOL2").split("|")[2], pid1)
+        # the interpreter is recycled after maxCalls
+        self.assertNotEqual(pool.layout("MOL3").split("|")[2], pid1)
+        pool.shutdown()
+
+    def testLayoutMany(self):
+        pool = CactvsPool(self.__tmpDir.name, workers=2, timeout=2.0, log=self.__lfh)
+        sdfList = ["MOL%d" % i for i in range(6)] + ["FAIL"]
+        resultList = pool.layoutMany(sdfList)
+        # results are in input order and failed records are None
+        self.assertEqual([result.split("|")[0] for result in resultList[:-1]], sdfList[:-1])
+        self.assertIsNone(resultList[-1])
+        self.assertLessEqual(len({result.split("|")[2] for result in resultList[:-1]}), 2)
+        self.assertEqual(pool.layoutMany([]), [])
+        pool.shutdown()
+
+    def testTimeout(self):
+        pool = CactvsPool(self.__tmpDir.name, workers=1, timeout=0.5, log=self.__lfh)
+        pid1 = pool.layout("MOL1").split("|")[2]
+        self.assertRaises(CactvsError, pool.layout, "SLOW")
+        # the stuck interpreter was replaced
+        self.assertNotEqual(pool.layout("MOL2").split("|")[2], pid1)
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+##
+# File: CcdCodeAllocatorTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdCodeAllocator module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from wwpdb.apps.chemeditor.webapp.CcdCodeAllocator import (
+    CcdCodeAllocator,
+    CcdSiteCodeAllocator,
+    isInSandbox,
+)
+from wwpdb.apps.chemeditor.webapp.ChemCompHash import ChemCompHash
+
+
+class CcdCodeAllocatorTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__poolFilePath = os.path.join(self.__tmpDir.name, "unusedCodes.lst")
+        self.__lfh = io.StringIO()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writePool(self, idList, mode="w"):
+        with open(self.__poolFilePath, mode) as ofh:
+            ofh.write("".join(ccId + "\n" for ccId in idList))
+
+    def testAllocate(self):
+        self.__writePool(["1AB", "", "CDEFG", "XYZ"])
+        allocator = CcdCodeAllocator(self.__poolFilePath, isTaken=lambda ccId: ccId == "CDEFG", log=self.__lfh)
+        self.assertEqual(allocator.allocate(), (["1AB"], 3, 2))
+        # a taken code is consumed without being returned
+        self.assertEqual(allocator.allocate(), (["XYZ"], 2, 0))
+        self.assertEqual(allocator.allocate(), ([], 0, 0))
+        # appended codes are served after the current offset
+        self.__writePool(["A01", "A02"], mode="a")
+        self.assertEqual(CcdCodeAllocator(self.__poolFilePath, log=self.__lfh).allocate(count=5), (["A01", "A02"], 2, 0))
+        # touching the pool keeps the offset, a truncated pool is served from the start
+        os.utime(self.__poolFilePath, (1000, 1000))
+        self.assertEqual(allocator.allocate(), ([], 0, 0))
+        self.__writePool(["1AB"])
+        self.assertEqual(allocator.allocate(), (["1AB"], 1, 0))
+        # a pool rewritten in place with other ids is served from the start
+        self.__writePool(["2CD", "EFGHI"])
+        self.assertEqual(allocator.getRemaining(), 2)
+        self.assertEqual(allocator.allocate()[0], ["2CD"])
+        # a replaced pool is served from the start
+        tmpPath = self.__poolFilePath + ".new"
+        with open(tmpPath, "w") as ofh:
+            ofh.write("2CD\nEFGHI\n")
+        os.replace(tmpPath, self.__poolFilePath)
+        self.assertEqual(allocator.allocate(count=3)[0], ["2CD", "EFGHI"])
+
+    def testIsInSandbox(self):
+        """Tests that ids whose sandbox path cannot be resolved are reported as taken"""
+        crpi = Mock()
+        crpi.getFilePath.return_value = self.__poolFilePath
+        self.assertFalse(isInSandbox(crpi, "AAA", log=self.__lfh))
+        self.__writePool(["AAA"])
+        self.assertTrue(isInSandbox(crpi, "AAA", log=self.__lfh))
+        crpi.getFilePath.side_effect = ValueError("bad id")
+        self.assertTrue(isInSandbox(crpi, "A.B", log=self.__lfh))
+
+    def testAllocateAllOrNothing(self):
+        self.__writePool(["AAA", "BBB", "CCC"])
+        allocator = CcdCodeAllocator(self.__poolFilePath, log=self.__lfh)
+        self.assertEqual(allocator.allocate(count=4, allOrNothing=True), ([], 3, 3))
+        self.assertEqual(allocator.allocate(count=2, allOrNothing=True), (["AAA", "BBB"], 3, 1))
+        self.assertEqual(allocator.allocate(count=2), (["CCC"], 1, 0))
+
+    def testReplacePool(self):
+        self.__writePool(["AAA", "BBB", "CCC", "DDD"])
+        allocator = CcdCodeAllocator(self.__poolFilePath, log=self.__lfh)
+        self.assertEqual(allocator.allocate()[0], ["AAA"])
+        idList = allocator.getPendingIds()
+        self.assertEqual(idList, ["BBB", "CCC", "DDD"])
+        # allocated while the pool was being validated
+        self.assertEqual(allocator.allocate()[0], ["BBB"])
+        self.assertEqual(allocator.replacePool([ccId for ccId in idList if ccId != "CCC"]), 1)
+        self.assertEqual(allocator.allocate(count=3), (["DDD"], 1, 0))
+        # ids appended after the snapshot are kept
+        self.__writePool(["EEE", "FFF", "GGG"], mode="a")
+        idList = allocator.getPendingIds()
+        self.__writePool(["HHH"], mode="a")
+        self.assertEqual(allocator.replacePool([ccId for ccId in idList if ccId != "FFF"], snapshotList=idList), 3)
+        self.assertEqual(allocator.getPendingIds(), ["EEE", "GGG", "HHH"])
+
+    def testSiteAllocate(self):
+        cch = ChemCompHash()
+        idList = ["A%02d" % idx for idx in range(30)]
+        self.__writePool(idList)
+        allocatorD = {}
+        for site in ("RCSB", "PDBE", "PDBJ"):
+            allocatorD[site] = CcdSiteCodeAllocator(self.__poolFilePath, site, log=self.__lfh)
+        codeD = {}
+        for site, allocator in allocatorD.items():
+            # the pool ids were moved to the partitions of their sites and only those are served
+            siteIdList = [ccId for ccId in idList if cch.getChemCompIdSite(ccId) == site]
+            self.assertTrue(0 < len(siteIdList) < 30)
+            codeList, preSize, postSize = allocator.allocate(count=2)
+            self.assertEqual(codeList, siteIdList[:2])
+            # the sizes are the numbers of curated ids left for the site
+            self.assertEqual((preSize, postSize), (len(siteIdList), len(siteIdList) - 2))
+            codeList += allocator.allocate(count=30)[0]
+            self.assertEqual(codeList, siteIdList)
+            for ccId in codeList:
+                self.assertNotIn(ccId, codeD)
+                codeD[ccId] = site
+        self.assertEqual(sorted(codeD), idList)
+        # no ids are added beyond the curated pool
+        self.assertEqual(allocatorD["PDBE"].allocate(count=1), ([], 0, 0))
+        # ids curated into the shared pool later rebalance the partitions
+        self.__writePool(["B%02d" % idx for idx in range(30)], mode="a")
+        siteIdList = [ccId for ccId in ("B%02d" % idx for idx in range(30)) if cch.getChemCompIdSite(ccId) == "PDBE"]
+        self.assertEqual(allocatorD["PDBE"].getRemaining(), len(siteIdList))
+        self.assertEqual(allocatorD["PDBE"].allocate(count=30)[0], siteIdList)
+
+    def testConcurrentAllocate(self):
+        idList = ["%03d" % idx for idx in range(200)]
+        self.__writePool(idList)
+
+        def allocate(_idx):
+            return CcdCodeAllocator(self.__poolFilePath, log=self.__lfh).allocate()[0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            codeList = [code for result in executor.map(allocate, range(210)) for code in result]
+        self.assertEqual(sorted(codeList), idList)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+##
+# File: CcdCodePoolValidatorTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdCodePoolValidator module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from wwpdb.apps.chemeditor.webapp.CcdCodeAllocator import CcdCodeAllocator
+from wwpdb.apps.chemeditor.webapp.CcdCodePoolValidator import CcdCodePoolValidator
+
+
+class _ChemRefPathInfoStub:
+    """Sandbox layout <sandbox>/<last character>/<id>/<id>.cif of the ligand-dict-v3 project"""
+
+    def __init__(self, sbPath):
+        self.__sbPath = sbPath
+
+    def getFilePath(self, ccId, _contentType):
+        return os.path.join(self.__sbPath, ccId[-1], ccId, ccId + ".cif")
+
+    def getCvsProjectInfo(self, ccId, _contentType):
+        if ccId.startswith("?"):
+            return None, None
+        return "ligand-dict-v3", "%s/%s/%s.cif" % (ccId[-1], ccId, ccId)
+
+
+class CcdCodePoolValidatorTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__poolFilePath = os.path.join(self.__tmpDir.name, "unusedCodes.lst")
+        with open(self.__poolFilePath, "w") as ofh:
+            ofh.write("".join(ccId + "\n" for ccId in ("AAA", "BBA", "CCB", "DDC", "?EC")))
+        # AAA is already in the sandbox, the checkout of hash directory C fails
+        os.makedirs(os.path.join(self.__sbPath, "A", "AAA"))
+        open(os.path.join(self.__sbPath, "A", "AAA", "AAA.cif"), "w").close()
+        self.__allocator = CcdCodeAllocator(self.__poolFilePath, log=io.StringIO())
+        siteConfig = Mock(crpi=_ChemRefPathInfoStub(self.__sbPath))
+        siteConfig.cIAppCc.get_unused_ccd_file.return_value = self.__poolFilePath
+        siteConfig.getCachePath.return_value = self.__tmpDir.name
+        self.__cvsMock = Mock()
+        self.__cvsMock.return_value.checkOut.side_effect = lambda projectPath: (not projectPath.endswith("/C"), "")
+        module = "wwpdb.apps.chemeditor.webapp.CcdCodePoolValidator."
+        for target, value in (
+            ("getSiteConfig", Mock(return_value=siteConfig)),
+            ("getCcdCodeAllocator", Mock(return_value=self.__allocator)),
+            ("CvsSandBoxAdmin", self.__cvsMock),
+        ):
+            patcher = patch(module + target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __readIds(self, suffix):
+        with open(self.__poolFilePath + suffix) as ifh:
+            return [line.split()[-1] for line in ifh if line.strip()]
+
+    def testRun(self):
+        """Tests that taken ids and ids of failed checkouts are removed from the pool"""
+        validator = CcdCodePoolValidator("TEST_SITE", workers=2, log=io.StringIO())
+        freeCount, takenList = validator.run()
+        self.assertEqual((freeCount, takenList), (2, ["AAA"]))
+        self.assertEqual(sorted(call[0][0] for call in self.__cvsMock.return_value.checkOut.call_args_list), ["ligand-dict-v3/A", "ligand-dict-v3/B", "ligand-dict-v3/C"])
+        self.assertEqual(self.__allocator.getPendingIds(), ["BBA", "CCB"])
+        self.assertEqual(self.__readIds(".taken"), ["AAA"])
+        self.assertEqual(self.__readIds(".unchecked"), ["DDC", "?EC"])
+
+    def testIdsAddedDuringRun(self):
+        """Tests that ids allocated during the run are dropped and ids appended during the run are kept"""
+        validator = CcdCodePoolValidator("TEST_SITE", workers=2, updateCvs=False, log=io.StringIO())
+        allocator = self.__allocator
+
+        def isTaken(ccId):
+            if ccId == "AAA":
+                # another request allocates and the pool is extended while the sandbox is checked
+                allocator.allocate()
+                allocator.extendPool(["FFF"])
+            return os.access(os.path.join(self.__sbPath, ccId[-1], ccId, ccId + ".cif"), os.F_OK)
+
+        with patch.object(validator, "_CcdCodePoolValidator__isTaken", isTaken):
+            self.assertEqual(validator.run(), (5, ["AAA"]))
+        self.assertEqual(self.__allocator.getPendingIds(), ["BBA", "CCB", "DDC", "?EC", "FFF"])
+
+
+if __name__ == "__main__":
+    unittest.main()
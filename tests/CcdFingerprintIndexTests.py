@@ -0,0 +1,135 @@
+##
+# File: CcdFingerprintIndexTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdFingerprintIndex module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.CcdFingerprintIndex import CcdFingerprintIndex
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import readCifFile
+
+ATOM_HEADER = """data_%(id)s
+_chem_comp.id %(id)s
+_chem_comp.formula "%(formula)s"
+loop_
+_chem_comp_atom.comp_id
+_chem_comp_atom.atom_id
+_chem_comp_atom.type_symbol
+_chem_comp_atom.charge
+"""
+
+BOND_HEADER = """loop_
+_chem_comp_bond.comp_id
+_chem_comp_bond.atom_id_1
+_chem_comp_bond.atom_id_2
+_chem_comp_bond.value_order
+"""
+
+# ethanol, methanol, cyclopropane and propanol (atoms, bonds)
+COMPONENTS = {
+    "EOH": ("C2 H6 O", ["C1 C", "C2 C", "O O", "H1 H"], ["C1 C2 SING", "C2 O SING", "C1 H1 SING"]),
+    "MOH": ("C H4 O", ["C C", "O O"], ["C O SING"]),
+    "CPR": ("C3 H6", ["C1 C", "C2 C", "C3 C"], ["C1 C2 SING", "C2 C3 SING", "C3 C1 SING"]),
+    "POL": ("C3 H8 O", ["C1 C", "C2 C", "C3 C", "O O"], ["C1 C2 SING", "C2 C3 SING", "C3 O SING"]),
+}
+
+
+class CcdFingerprintIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__indexFilePath = os.path.join(self.__tmpDir.name, "ccd_fingerprint.npy")
+        for ccId in ("EOH", "MOH", "CPR"):
+            self.__writeComp(ccId)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeComp(self, ccId, dirPath=None):
+        formula, atomList, bondList = COMPONENTS[ccId]
+        if dirPath is None:
+            dirPath = os.path.join(self.__sbPath, ccId[-1], ccId)
+        if not os.access(dirPath, os.F_OK):
+            os.makedirs(dirPath)
+        filePath = os.path.join(dirPath, ccId + ".cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(ATOM_HEADER % {"id": ccId, "formula": formula})
+            ofh.writelines("%s %s 0\n" % (ccId, atom) for atom in atomList)
+            ofh.write(BOND_HEADER)
+            ofh.writelines("%s %s\n" % (ccId, bond) for bond in bondList)
+        return filePath
+
+    def __readComp(self, ccId):
+        return readCifFile(self.__writeComp(ccId, dirPath=os.path.join(self.__tmpDir.name, "query")))[0]
+
+    def testShortlist(self):
+        """Tests building the index and screening by heavy-atom composition"""
+        index = CcdFingerprintIndex(self.__indexFilePath, log=io.StringIO())
+        self.assertIsNone(index.shortlist(self.__readComp("EOH")))
+        self.assertEqual(index.refresh(self.__sbPath, processes=1), 3)
+        self.assertEqual(index.refresh(self.__sbPath, processes=1), 0)
+        data = index.getData()
+        self.assertEqual(data["id"].tolist(), ["CPR", "EOH", "MOH"])
+        self.assertEqual(data["rings"].tolist(), [1, 0, 0])
+        self.assertEqual(data["formula"].tolist(), ["C3 H6", "C2 H6 O", "C H4 O"])
+        self.assertEqual(index.shortlist(self.__readComp("EOH")), ["EOH"])
+        self.assertEqual(index.shortlist(self.__readComp("EOH"), maxExtraAtoms=1), ["CPR", "EOH", "MOH"])
+        self.assertEqual(index.shortlist(self.__readComp("POL")), [])
+
+    def testUpdate(self):
+        """Tests adding a committed component to the index"""
+        index = CcdFingerprintIndex(self.__indexFilePath, log=io.StringIO())
+        self.assertFalse(index.update("POL", self.__readComp("POL")))
+        index.refresh(self.__sbPath, processes=1)
+        self.assertTrue(index.update("POL", self.__readComp("POL")))
+        self.assertEqual(index.shortlist(self.__readComp("POL")), ["POL"])
+        self.assertEqual(len(index.getData()), 4)
+
+    def testIsFresh(self):
+        """Tests that the index is out of date once a sandbox component is added, edited or removed"""
+        index = CcdFingerprintIndex(self.__indexFilePath, log=io.StringIO())
+        self.assertFalse(index.isFresh(self.__sbPath))
+        index.refresh(self.__sbPath, processes=1)
+        self.assertTrue(index.isFresh(self.__sbPath))
+        self.assertFalse(index.isFresh(os.path.join(self.__tmpDir.name, "missing")))
+        # in-place edit
+        filePath = os.path.join(self.__sbPath, "H", "EOH", "EOH.cif")
+        os.utime(filePath, (1000, 1000))
+        self.assertFalse(index.isFresh(self.__sbPath))
+        index.refresh(self.__sbPath, processes=1)
+        self.assertTrue(index.isFresh(self.__sbPath))
+        # a committed component is fresh once the index is updated with its file time
+        filePath = self.__writeComp("POL")
+        self.assertFalse(index.isFresh(self.__sbPath))
+        index.update("POL", readCifFile(filePath)[0], mtime=os.stat(filePath).st_mtime)
+        self.assertTrue(index.isFresh(self.__sbPath))
+        os.remove(filePath)
+        self.assertFalse(index.isFresh(self.__sbPath))
+
+    def testSimilarity(self):
+        """Tests Tanimoto ranking of the indexed components"""
+        index = CcdFingerprintIndex(self.__indexFilePath, log=io.StringIO())
+        self.assertIsNone(index.similarity(self.__readComp("EOH")))
+        index.refresh(self.__sbPath, processes=1)
+        hitList = index.similarity(self.__readComp("EOH"), topK=2)
+        self.assertEqual(len(hitList), 2)
+        self.assertEqual(hitList[0], ("EOH", 1.0))
+        self.assertLess(hitList[1][1], 1.0)
+        self.assertEqual([ccId for ccId, _score in index.similarity(self.__readComp("POL"), topK=5)][:1], ["EOH"])
+        self.assertEqual(len(index.similarity(self.__readComp("POL"), topK=5)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
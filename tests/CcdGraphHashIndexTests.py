@@ -0,0 +1,95 @@
+##
+# File: CcdGraphHashIndexTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdGraphHashIndex module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.CcdGraphHashIndex import CcdGraphHashIndex
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import readCifFile
+
+CIF_TEMPLATE = """data_%(id)s
+_chem_comp.id %(id)s
+loop_
+_chem_comp_atom.comp_id
+_chem_comp_atom.atom_id
+_chem_comp_atom.type_symbol
+_chem_comp_atom.charge
+%(id)s C1 C 0
+%(id)s %(oxygen)s O %(charge)s
+loop_
+_chem_comp_bond.comp_id
+_chem_comp_bond.atom_id_1
+_chem_comp_bond.atom_id_2
+_chem_comp_bond.value_order
+%(id)s C1 %(oxygen)s SING
+"""
+
+
+class CcdGraphHashIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__dbPath = os.path.join(self.__tmpDir.name, "ccd_graph_hash.sqlite")
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeComp(self, ccId, oxygen="O1", charge="0", dirPath=None):
+        if dirPath is None:
+            dirPath = os.path.join(self.__sbPath, ccId[-1], ccId)
+        if not os.access(dirPath, os.F_OK):
+            os.makedirs(dirPath)
+        filePath = os.path.join(dirPath, ccId + ".cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(CIF_TEMPLATE % {"id": ccId, "oxygen": oxygen, "charge": charge})
+        return filePath
+
+    def testDuplicates(self):
+        """Tests finding exact duplicates after a parallel build and after an update"""
+        self.__writeComp("AAA")
+        self.__writeComp("BBB", oxygen="OXT")
+        self.__writeComp("CCC", charge="-1")
+        index = CcdGraphHashIndex(self.__dbPath, self.__sbPath, log=io.StringIO())
+        self.assertEqual(index.refresh(processes=2), 3)
+        self.assertEqual(index.refresh(processes=2), 0)
+        queryPath = self.__writeComp("XYZ", dirPath=os.path.join(self.__tmpDir.name, "query"))
+        self.assertEqual(index.findDuplicates(readCifFile(queryPath)[0]), ["AAA", "BBB"])
+        queryPath = self.__writeComp("XYZ", charge="-1", dirPath=os.path.join(self.__tmpDir.name, "query"))
+        self.assertEqual(index.findDuplicates(readCifFile(queryPath)[0]), ["CCC"])
+        index.update("DDD", readCifFile(queryPath)[0])
+        self.assertEqual(index.findDuplicates(readCifFile(queryPath)[0]), ["CCC", "DDD"])
+
+    def testIsFresh(self):
+        """Tests that the map is out of date once a sandbox component is added, edited or removed"""
+        filePath = self.__writeComp("AAA")
+        index = CcdGraphHashIndex(self.__dbPath, self.__sbPath, log=io.StringIO())
+        self.assertFalse(index.isFresh())
+        index.refresh(processes=1)
+        self.assertTrue(index.isFresh())
+        os.utime(filePath, (1000, 1000))
+        self.assertFalse(index.isFresh())
+        index.refresh(processes=1)
+        self.assertTrue(index.isFresh())
+        otherPath = self.__writeComp("BBB")
+        self.assertFalse(index.isFresh())
+        index.update("BBB", readCifFile(otherPath)[0], mtime=os.stat(otherPath).st_mtime)
+        self.assertTrue(index.isFresh())
+        os.remove(otherPath)
+        self.assertFalse(index.isFresh())
+
+
+if __name__ == "__main__":
+    unittest.main()
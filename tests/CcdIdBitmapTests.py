@@ -0,0 +1,66 @@
+##
+# File: CcdIdBitmapTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdIdBitmap module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.CcdIdBitmap import CcdIdBitmap
+from wwpdb.apps.chemeditor.webapp.ChemCompHash import ChemCompHash
+
+
+class CcdIdBitmapTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__bitmapFilePath = os.path.join(self.__tmpDir.name, "ccd_id_bitmap.npy")
+        self.__lfh = io.StringIO()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testBuildAndLookup(self):
+        for ccId in ("A", "AB", "ATP", "HEM", "A1AAA"):
+            os.makedirs(os.path.join(self.__sbPath, ccId[-1], ccId))
+        bitmap = CcdIdBitmap(self.__bitmapFilePath, log=self.__lfh)
+        self.assertIsNone(bitmap.contains("ATP"))
+        self.assertEqual(bitmap.buildFromSandbox(self.__sbPath), 5)
+        self.assertEqual(bitmap.getCount(), 5)
+        self.assertTrue(bitmap.contains("atp"))
+        self.assertFalse(bitmap.contains("AA"))
+        self.assertFalse(bitmap.contains("A-B"))
+        self.assertEqual(bitmap.containsMany(["HEM", "ZZZ", "A1AAA", "", "AB"]).tolist(), [True, False, True, False, True])
+        self.assertEqual(bitmap.getFreeIds(1, limit=3), ["B", "C", "D"])
+        self.assertEqual(bitmap.getFreeIds(2, limit=2), ["AA", "AC"])
+
+        self.assertTrue(bitmap.add(["ZZZ"]))
+        self.assertTrue(bitmap.contains("ZZZ"))
+        self.assertEqual(bitmap.getCount(), 6)
+
+    def testSitePartition(self):
+        bitmap = CcdIdBitmap(self.__bitmapFilePath, log=self.__lfh)
+        bitmap.build(["AAA", "AAB"])
+        cch = ChemCompHash()
+        for site in ("RCSB", "PDBE", "PDBJ"):
+            idList = bitmap.getFreeIds(3, site=site, limit=50)
+            self.assertEqual(len(idList), 50)
+            self.assertNotIn("AAA", idList)
+            self.assertNotIn("AAB", idList)
+            for ccId in idList:
+                self.assertEqual(cch.getChemCompIdSite(ccId), site)
+
+
+if __name__ == "__main__":
+    unittest.main()
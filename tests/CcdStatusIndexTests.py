@@ -0,0 +1,78 @@
+##
+# File: CcdStatusIndexTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for CcdStatusIndex module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import CcdStatusIndex
+
+CIF_TEMPLATE = """data_%(id)s
+_chem_comp.id %(id)s
+_chem_comp.name "test component"
+_chem_comp.pdbx_release_status %(status)s
+_chem_comp.pdbx_replaced_by %(replacedBy)s
+"""
+
+
+class CcdStatusIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__dbPath = os.path.join(self.__tmpDir.name, "ccd_status.sqlite")
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeComp(self, ccId, status, replacedBy="?", mtime=None):
+        dirPath = os.path.join(self.__sbPath, ccId[-1], ccId)
+        if not os.access(dirPath, os.F_OK):
+            os.makedirs(dirPath)
+        filePath = os.path.join(dirPath, ccId + ".cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(CIF_TEMPLATE % {"id": ccId, "status": status, "replacedBy": replacedBy})
+        if mtime is not None:
+            os.utime(filePath, (mtime, mtime))
+        return filePath
+
+    def testRefreshAndLookup(self):
+        """Tests building the index and incremental refresh"""
+        self.__writeComp("ATP", "REL", mtime=1000)
+        self.__writeComp("AAA", "OBS", replacedBy="ABC", mtime=1000)
+        index = CcdStatusIndex(self.__dbPath, self.__sbPath, log=io.StringIO())
+        self.assertIsNone(index.getBuildTime())
+        self.assertEqual(index.refresh(), 2)
+        self.assertIsNotNone(index.getBuildTime())
+        self.assertEqual(index.lookup("atp"), ("REL", ""))
+        self.assertEqual(index.lookup("AAA"), ("OBS", "ABC"))
+        self.assertIsNone(index.lookup("XYZ"))
+        self.assertEqual(index.refresh(), 0)
+        self.__writeComp("ATP", "OBS", mtime=2000)
+        os.remove(os.path.join(self.__sbPath, "A", "AAA", "AAA.cif"))
+        self.assertEqual(index.refresh(), 1)
+        self.assertEqual(index.getCount(), 1)
+        self.assertEqual(index.lookup("ATP"), ("OBS", ""))
+
+    def testLookupModifiedFile(self):
+        """Tests that a lookup re-reads a file modified after it was indexed"""
+        filePath = self.__writeComp("ATP", "REL", mtime=1000)
+        index = CcdStatusIndex(self.__dbPath, self.__sbPath, log=io.StringIO())
+        self.assertEqual(index.update("ATP", filePath), ("REL", ""))
+        self.__writeComp("ATP", "OBS", mtime=2000)
+        self.assertEqual(index.lookup("ATP"), ("OBS", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
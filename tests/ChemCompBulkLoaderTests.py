@@ -0,0 +1,155 @@
+##
+# File: ChemCompBulkLoaderTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ChemCompBulkLoader module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from wwpdb.apps.chemeditor.webapp.ChemCompBulkLoader import ChemCompBulkLoader
+
+
+class _TableStub:
+    def getName(self):
+        return "chem_comp"
+
+    def getAttributeIdList(self):
+        return ["ID", "NAME"]
+
+    def getAttributeNameList(self):
+        return ["id", "name"]
+
+    def getDeleteAttributeName(self):
+        return "id"
+
+
+class _SchemaStub:
+    def getDatabaseName(self):
+        return "compv4"
+
+    def getTableIdList(self):
+        return ["CHEM_COMP"]
+
+    def getTable(self, tableId):  # pylint: disable=unused-argument
+        return _TableStub()
+
+
+class _SchemaDefLoaderStub:
+    """Returns one chem_comp row per file; files of components named BAD cannot be parsed"""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def fetch(self, filePathList):
+        ccIdList = [os.path.basename(filePath)[:-4] for filePath in filePathList]
+        if "BAD" in ccIdList:
+            raise ValueError("parse error")
+        return {"CHEM_COMP": [{"ID": ccId, "NAME": "name of " + ccId} for ccId in ccIdList]}, ccIdList
+
+
+class _PoolStub:
+    """In-process replacement of multiprocessing.Pool"""
+
+    def __init__(self, processes=None):
+        pass
+
+    def imap_unordered(self, func, iterable):
+        return map(func, iterable)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+class ChemCompBulkLoaderTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sbPath = os.path.join(self.__tmpDir.name, "sandbox")
+        self.__checkpointPath = os.path.join(self.__tmpDir.name, "checkpoint.txt")
+        for ccId in ("AAA", "BBB", "CCC"):
+            self.__writeComp(ccId)
+        self.__conMock = MagicMock()
+        self.__cursorMock = self.__conMock.cursor.return_value
+        siteConfig = Mock()
+        siteConfig.cIAppCc.get_site_cc_cvs_path.return_value = self.__sbPath
+        module = "wwpdb.apps.chemeditor.webapp.ChemCompBulkLoader."
+        for target, value in (
+            ("getSiteConfig", Mock(return_value=siteConfig)),
+            ("ChemCompSchemaDef", _SchemaStub),
+            ("SchemaDefLoader", _SchemaDefLoaderStub),
+            ("IoAdapterCore", Mock()),
+            ("multiprocessing.Pool", _PoolStub),
+            ("_CcDbConnection", Mock(return_value=Mock(getConnection=Mock(return_value=self.__conMock)))),
+        ):
+            patcher = patch(module + target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeComp(self, ccId):
+        dirPath = os.path.join(self.__sbPath, ccId[-1], ccId)
+        os.makedirs(dirPath)
+        with open(os.path.join(dirPath, ccId + ".cif"), "w") as ofh:
+            ofh.write("data_%s\n" % ccId)
+
+    def __getLoader(self):
+        return ChemCompBulkLoader("TEST_SITE", checkpointPath=self.__checkpointPath, connections=1, chunkSize=1, log=io.StringIO())
+
+    def __readCheckpoint(self):
+        with open(self.__checkpointPath) as ifh:
+            return sorted(ifh.read().split())
+
+    def __getInsertedIds(self):
+        return sorted(call[0][1][0][0] for call in self.__cursorMock.executemany.call_args_list)
+
+    def testTruncateAndLoad(self):
+        """Tests a complete load into emptied tables"""
+        self.assertTrue(self.__getLoader().run(truncate=True))
+        sqlList = [call[0][0] for call in self.__cursorMock.execute.call_args_list]
+        self.assertEqual(sqlList, ["truncate table compv4.chem_comp"])
+        self.assertEqual(self.__getInsertedIds(), ["AAA", "BBB", "CCC"])
+        self.assertEqual(self.__cursorMock.executemany.call_args[0][0], "insert into compv4.chem_comp (id,name) values (%s,%s)")
+        self.assertEqual(self.__conMock.commit.call_count, 4)
+        # a complete run removes the checkpoint
+        self.assertFalse(os.access(self.__checkpointPath, os.F_OK))
+
+    def testResume(self):
+        """Tests that a failed run is resumed from the checkpoint file without truncating the tables"""
+        self.__cursorMock.executemany.side_effect = lambda sql, valueLists: self.__failOn("BBB", valueLists)
+        self.__writeComp("BAD")
+        loader = self.__getLoader()
+        self.assertFalse(loader.run(truncate=True))
+        self.assertEqual(self.__readCheckpoint(), ["AAA", "CCC"])
+        self.assertEqual(self.__conMock.rollback.call_count, 1)
+        self.__cursorMock.reset_mock()
+        self.__cursorMock.executemany.side_effect = None
+        os.remove(os.path.join(self.__sbPath, "D", "BAD", "BAD.cif"))
+        self.assertTrue(self.__getLoader().run(truncate=True))
+        self.assertEqual(self.__getInsertedIds(), ["BBB"])
+        # the rows of a resumed run replace existing rows instead of truncating the tables
+        self.assertEqual([call[0] for call in self.__cursorMock.execute.call_args_list], [("delete from compv4.chem_comp where id in (%s)", ["BBB"])])
+        self.assertFalse(os.access(self.__checkpointPath, os.F_OK))
+
+    def __failOn(self, ccId, valueLists):
+        if valueLists[0][0] == ccId:
+            raise RuntimeError("insert of %s failed" % ccId)
+
+
+if __name__ == "__main__":
+    unittest.main()
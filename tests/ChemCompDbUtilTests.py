@@ -0,0 +1,174 @@
+##
+# File: ChemCompDbUtilTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ChemCompDbUtil module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from wwpdb.apps.chemeditor.webapp.ChemCompDbUtil import (
+    DESCRIPTOR_INDEX_DDL,
+    DESCRIPTOR_MATCH_SQL,
+    ChemCompDbUtil,
+)
+
+DESCRIPTOR_CIF = """data_ATP
+_chem_comp.id ATP
+loop_
+_pdbx_chem_comp_descriptor.comp_id
+_pdbx_chem_comp_descriptor.type
+_pdbx_chem_comp_descriptor.program
+_pdbx_chem_comp_descriptor.program_version
+_pdbx_chem_comp_descriptor.descriptor
+ATP SMILES_CANONICAL CACTVS 3.385 "NC1=NC=N"
+ATP SMILES_CANONICAL "OpenEye OEToolkits" 2.0.7 "c1nc(N)"
+ATP InChI InChI 1.03 "InChI=1S/C10H16N5O13P3"
+ATP SMILES ACDLabs 12.01 "O=P(O)(O)"
+"""
+
+
+class _TableStub:
+    """Table definition with an id, a float value and the comp_id delete attribute"""
+
+    def getName(self):
+        return "chem_comp_atom"
+
+    def getAttributeIdList(self):
+        return ["COMP_ID", "ATOM_ID", "CHARGE"]
+
+    def getAttributeNameList(self):
+        return ["comp_id", "atom_id", "charge"]
+
+    def getDeleteAttributeId(self):
+        return "COMP_ID"
+
+    def getDeleteAttributeName(self):
+        return "comp_id"
+
+    def isAttributeFloatType(self, attributeId):
+        return attributeId == "CHARGE"
+
+    def isAttributeIntegerType(self, attributeId):  # pylint: disable=unused-argument
+        return False
+
+
+class _SchemaStub:
+    def getDatabaseName(self):
+        return "compv4"
+
+    def getTableIdList(self):
+        return ["CHEM_COMP_ATOM"]
+
+    def getTable(self, tableId):  # pylint: disable=unused-argument
+        return _TableStub()
+
+
+class ChemCompDbUtilTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        patcher = patch("wwpdb.utils.db.MyConnectionBase.ConfigInfo")
+        patcher.start().return_value.get.return_value = None
+        self.addCleanup(patcher.stop)
+        reqObj = MagicMock()
+        reqObj.getValue.return_value = "TEST_SITE"
+        reqObj.newSessionObj.return_value.getPath.return_value = self.__tmpDir.name
+        self.__dbUtil = ChemCompDbUtil(reqObj=reqObj, verbose=True, log=io.StringIO())
+        self.__conMock = MagicMock()
+        self.__cursorMock = self.__conMock.cursor.return_value
+        for method, value in (("openConnection", True), ("closeConnection", None)):
+            patcher = patch.object(ChemCompDbUtil, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.__dbUtil._dbCon = self.__conMock  # pylint: disable=protected-access
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testSearchSameCCDs(self):
+        """Tests that the canonical SMILES and InChI descriptors are matched in one parameterized query"""
+        filePath = os.path.join(self.__tmpDir.name, "ATP.cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(DESCRIPTOR_CIF)
+        self.__cursorMock.fetchall.return_value = (("ATP",), ("XYZ",))
+        self.assertEqual(self.__dbUtil.searchSameCCDs(ccdFilePath=filePath), ["ATP", "XYZ"])
+        self.assertEqual(self.__cursorMock.execute.call_count, 1)
+        sql, params = self.__cursorMock.execute.call_args[0]
+        self.assertEqual(sql.count(DESCRIPTOR_MATCH_SQL), 3)
+        self.assertIn("'OBS'", sql)
+        self.assertEqual(
+            params,
+            [
+                "InChI",
+                "InChI",
+                "InChI=1S/C10H16N5O13P3",
+                "SMILES_CANONICAL",
+                "CACTVS",
+                "NC1=NC=N",
+                "SMILES_CANONICAL",
+                "OpenEye OEToolkits",
+                "c1nc(N)",
+                3,
+            ],
+        )
+        # fewer than three descriptors are not searched
+        self.assertEqual(self.__dbUtil.searchSameCCDs(ccdFilePath=os.path.join(self.__tmpDir.name, "missing.cif")), [])
+        self.assertEqual(self.__cursorMock.execute.call_count, 1)
+
+    def testCreateDescriptorIndex(self):
+        self.assertTrue(self.__dbUtil.createDescriptorIndex())
+        self.__cursorMock.execute.assert_called_once_with(DESCRIPTOR_INDEX_DDL)
+        self.__conMock.commit.assert_called_once_with()
+        self.__cursorMock.execute.side_effect = RuntimeError("duplicate key name")
+        self.assertFalse(self.__dbUtil.createDescriptorIndex())
+
+    @patch("wwpdb.apps.chemeditor.webapp.ChemCompDbUtil.SchemaDefLoader")
+    @patch("wwpdb.apps.chemeditor.webapp.ChemCompDbUtil.ChemCompSchemaDef", _SchemaStub)
+    def testLoadTableDifferences(self, loaderMock):
+        """Tests that only the components whose rows differ from the database are rewritten"""
+        filePath = os.path.join(self.__tmpDir.name, "ATP.cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(DESCRIPTOR_CIF)
+        tableDataDict = {
+            "CHEM_COMP_ATOM": [
+                {"COMP_ID": "ATP", "ATOM_ID": "PG", "CHARGE": "0"},
+                {"COMP_ID": "ALA", "ATOM_ID": "N", "CHARGE": "0"},
+                {"COMP_ID": "ALA", "ATOM_ID": "CA", "CHARGE": ""},
+            ]
+        }
+        loaderMock.return_value.fetch.return_value = (tableDataDict, ["ATP", "ALA"])
+        # ATP is stored unchanged (float and string forms compare equal), ALA has another charge
+        self.__cursorMock.fetchall.return_value = (("ATP", "PG", 0.0), ("ALA", "N", 1.0), ("ALA", "CA", None))
+        self.assertTrue(self.__dbUtil.loadCCD(ccdFilePath=filePath))
+        sqlList = [call[0][0] for call in self.__cursorMock.execute.call_args_list]
+        self.assertTrue(sqlList[0].startswith("select comp_id,atom_id,charge from compv4.chem_comp_atom where comp_id in (%s,%s)"))
+        self.assertEqual(sqlList[1:], ["delete from compv4.chem_comp_atom where comp_id = %s"])
+        self.assertEqual(self.__cursorMock.execute.call_args_list[1][0][1], ("ALA",))
+        insertList = [(call[0][0], call[0][1]) for call in self.__cursorMock.executemany.call_args_list]
+        self.assertEqual(
+            insertList,
+            [
+                ("insert into compv4.chem_comp_atom (comp_id,atom_id,charge) values (%s,%s,%s)", [["ALA", "N", "0"]]),
+                ("insert into compv4.chem_comp_atom (comp_id,atom_id) values (%s,%s)", [["ALA", "CA"]]),
+            ],
+        )
+        self.__conMock.commit.assert_called_once_with()
+        # a failed insert rolls the whole load back
+        self.__cursorMock.executemany.side_effect = RuntimeError("insert failed")
+        self.assertFalse(self.__dbUtil.loadCCD(ccdFilePath=filePath))
+        self.__conMock.rollback.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
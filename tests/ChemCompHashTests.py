@@ -72,6 +72,24 @@ class HashTests(unittest.TestCase):
                         cch.getChemCompIdSite("%s%s%s" % (i, j, k)), self.__sites, "Generated id not in sites"
                     )
 
+    def testIdToInt(self):
+        """Tests scalar and batch id conversion"""
+        cch = ChemCompHash()
+        self.assertEqual(cch.chemCompIdToInt("A"), 0)
+        self.assertEqual(cch.chemCompIdToInt("ba"), 36)
+        self.assertEqual(cch.chemCompIdToInt("999"), 36**3 - 1)
+        self.assertRaises(ValueError, cch.chemCompIdToInt, "A-B")
+        idList = ["ATP", "a0", "99999", "", "A-B", "ABCDEF"]
+        values, valid = cch.chemCompIdsToInt(idList)
+        self.assertEqual(valid.tolist(), [True, True, True, False, False, False])
+        self.assertEqual(values[:3].tolist(), [cch.chemCompIdToInt(ccId) for ccId in idList[:3]])
+        indexes, valid = cch.chemCompIdsToIndex(idList)
+        self.assertEqual(indexes[:3].tolist(), [cch.chemCompIdToIndex(ccId) for ccId in idList[:3]])
+        # positions are unique over all id lengths
+        self.assertNotEqual(cch.chemCompIdToIndex("A"), cch.chemCompIdToIndex("AA"))
+        for ccId in ("A", "9", "AA", "ATP", "01234", "99999"):
+            self.assertEqual(cch.indexToChemCompId(cch.chemCompIdToIndex(ccId)), ccId)
+
 
 if __name__ == "__main__":
     unittest.main()
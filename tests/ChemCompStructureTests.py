@@ -0,0 +1,138 @@
+##
+# File: ChemCompStructureTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ChemCompStructure module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import os
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import (
+    getAtomGraph,
+    getGraphHash,
+    getRingCount,
+    getStructureKey,
+    mergeStructureCategories,
+    readCifFile,
+)
+
+CIF_TEMPLATE = """data_%(id)s
+_chem_comp.id %(id)s
+_chem_comp.name "%(name)s"
+_chem_comp.formula %(formula)s
+loop_
+_chem_comp_atom.comp_id
+_chem_comp_atom.atom_id
+_chem_comp_atom.type_symbol
+_chem_comp_atom.charge
+%(id)s C1 C 0
+%(id)s O1 O %(charge)s
+loop_
+_chem_comp_bond.comp_id
+_chem_comp_bond.atom_id_1
+_chem_comp_bond.atom_id_2
+_chem_comp_bond.value_order
+%(id)s C1 O1 DOUB
+%(extra)s
+"""
+
+DESCRIPTOR_LOOP = """loop_
+_pdbx_chem_comp_descriptor.comp_id
+_pdbx_chem_comp_descriptor.type
+_pdbx_chem_comp_descriptor.descriptor
+XYZ SMILES C=O
+"""
+
+
+COORDINATE_CIF = """data_XYZ
+_chem_comp.id XYZ
+loop_
+_chem_comp_atom.comp_id
+_chem_comp_atom.atom_id
+_chem_comp_atom.type_symbol
+_chem_comp_atom.charge
+_chem_comp_atom.model_Cartn_x
+_chem_comp_atom.pdbx_model_Cartn_x_ideal
+XYZ C1 C 0 %(model)s %(ideal)s
+XYZ O1 O 0 1.200 1.210
+"""
+
+
+class ChemCompStructureTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __readCif(self, ccId="XYZ", name="formaldehyde", formula="?", charge="0", extra=""):
+        filePath = os.path.join(self.__tmpDir.name, "in.cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(CIF_TEMPLATE % {"id": ccId, "name": name, "formula": formula, "charge": charge, "extra": extra})
+        return readCifFile(filePath)[0]
+
+    def testStructureKey(self):
+        """Tests that metadata edits keep the structure key and chemistry edits change it"""
+        key = getStructureKey(self.__readCif())
+        self.assertTrue(key)
+        self.assertEqual(key, getStructureKey(self.__readCif(ccId="ABC", name="renamed")))
+        self.assertNotEqual(key, getStructureKey(self.__readCif(charge="1")))
+
+    def testStructureKeyCoordinates(self):
+        """Tests that coordinate changes keep the structure key and that merging keeps the model coordinates"""
+        containerList = []
+        for model, ideal in (("0.000", "0.010"), ("0.500", "0.020")):
+            filePath = os.path.join(self.__tmpDir.name, "coord.cif")
+            with open(filePath, "w") as ofh:
+                ofh.write(COORDINATE_CIF % {"model": model, "ideal": ideal})
+            containerList.append(readCifFile(filePath)[0])
+        self.assertEqual(getStructureKey(containerList[0]), getStructureKey(containerList[1]))
+        mergeStructureCategories(containerList[1], containerList[0])
+        atomCat = containerList[1].getObj("chem_comp_atom")
+        self.assertEqual(atomCat.getValue("model_Cartn_x", 0), "0.500")
+        self.assertEqual(atomCat.getValue("pdbx_model_Cartn_x_ideal", 0), "0.010")
+
+    def testMerge(self):
+        """Tests merging annotated structure categories into an edited definition"""
+        edited = self.__readCif(ccId="ABC", name="renamed")
+        annotated = self.__readCif(formula='"C H2 O"', extra=DESCRIPTOR_LOOP)
+        mergeStructureCategories(edited, annotated)
+        self.assertEqual(edited.getObj("chem_comp").getValue("name", 0), "renamed")
+        self.assertEqual(edited.getObj("chem_comp").getValue("formula", 0), "C H2 O")
+        descriptorCat = edited.getObj("pdbx_chem_comp_descriptor")
+        self.assertEqual(descriptorCat.getValue("descriptor", 0), "C=O")
+        self.assertEqual(descriptorCat.getValue("comp_id", 0), "ABC")
+        self.assertEqual(edited.getObj("chem_comp_atom").getValue("comp_id", 1), "ABC")
+
+    def testGraphHash(self):
+        """Tests that the graph hash ignores atom names and record order but not charges or stereo"""
+        atomList = [("C1", "C", 0, False, "R"), ("O1", "O", 0, False, ""), ("N1", "N", 0, False, "")]
+        bondList = [(0, 1, "SING", False, ""), (0, 2, "SING", False, "")]
+        graphHash = getGraphHash(atomList, bondList)
+        renamedList = [("N9", "N", 0, False, ""), ("O9", "O", 0, False, ""), ("C9", "C", 0, False, "R")]
+        self.assertEqual(graphHash, getGraphHash(renamedList, [(2, 0, "SING", False, ""), (1, 2, "SING", False, "")]))
+        chargedList = [("C1", "C", 0, False, "R"), ("O1", "O", -1, False, ""), ("N1", "N", 0, False, "")]
+        self.assertNotEqual(graphHash, getGraphHash(chargedList, bondList))
+        invertedList = [("C1", "C", 0, False, "S"), ("O1", "O", 0, False, ""), ("N1", "N", 0, False, "")]
+        self.assertNotEqual(graphHash, getGraphHash(invertedList, bondList))
+        self.assertEqual(getGraphHash([], []), "")
+
+    def testAtomGraph(self):
+        """Tests reading the heavy-atom graph of a definition"""
+        atomList, bondList = getAtomGraph(self.__readCif(charge="-1"))
+        self.assertEqual(atomList, [("C1", "C", 0, False, ""), ("O1", "O", -1, False, "")])
+        self.assertEqual(bondList, [(0, 1, "DOUB", False, "")])
+        self.assertEqual(getRingCount(atomList, bondList), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,7 @@ sys.modules["wwpdb.utils.config.ConfigInfo"] = Mock(ConfigInfo=configMock)
 
 # These must be after the definitions - before wwpdb.utils.config imported anywhere
 from wwpdb.apps.chemeditor.webapp.ChemEditorWebApp import ChemEditorWebAppWorker, threshold_crossed  # noqa: E402
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import reloadSiteConfig  # noqa: E402
 from wwpdb.utils.session.WebRequest import InputRequest  # noqa: E402
 
 
@@ -42,6 +43,13 @@ class ChemEditorWebAppTests(unittest.TestCase):
         self._topPath = os.getenv("WWPDB_CCMODULE_TOP_PATH")
         self._reqObj = InputRequest(paramDict={}, verbose=self._verbose, log=self._lfh)
         self._reqObj.setValue("WWPDB_SITE_ID", "PDBE_LOCALHOST")
+        # ConfigInfo may have been imported by other test modules before the mock above was installed
+        for target in ("wwpdb.apps.chemeditor.webapp.SiteConfigCache.ConfigInfo", "wwpdb.utils.config.ConfigInfoApp.ConfigInfo"):
+            patcher = patch(target, configMock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        reloadSiteConfig("PDBE_LOCALHOST")
+        self.addCleanup(reloadSiteConfig, "PDBE_LOCALHOST")
 
     @patch("wwpdb.apps.chemeditor.webapp.ChemEditorWebApp.DaInternalCombineDb", autospec=True)
     def testGetEntriesWithLigand(self, mockDb):
@@ -65,12 +73,28 @@ class ChemEditorWebAppTests(unittest.TestCase):
         response = json.loads(cewa.doOp().get()["RETURN_STRING"])
         self.assertEqual(response["errortext"], "Could not open a connection to the database")
 
-    @patch("wwpdb.apps.chemeditor.webapp.ChemEditorWebApp.ChemEditorBase", autospec=True)
-    def testGetNextAccession(self, mockcvs):
+    @patch("wwpdb.apps.chemeditor.webapp.ChemEditorWebApp.DaInternalCombineDb", autospec=True)
+    def testGetEntriesWithLigandPaging(self, mockDb):
+        """Tests that paging parameters are validated before the database is queried"""
+        mockDb().getEntriesWithLigand.return_value = ["D_800002"]
+        self._reqObj.setValue("ccid", "AAA")
+        self._reqObj.setValue("page", "2")
+        self._reqObj.setValue("page_size", "10")
+        cewa = ChemEditorWebAppWorker(self._reqObj, self._verbose, self._lfh)
+        response = json.loads(cewa._getEntriesWithLigands().get()["RETURN_STRING"])  # noqa: SLF001 pylint: disable=protected-access
+        self.assertEqual(response["datacontent"], ["D_800002"])
+        mockDb().getEntriesWithLigand.assert_called_with("AAA", page=2, pageSize=10)
+        for page, pageSize in (("two", "10"), ("0", "10"), ("1", "")):
+            self._reqObj.setValue("page", page)
+            self._reqObj.setValue("page_size", pageSize)
+            response = json.loads(cewa._getEntriesWithLigands().get()["RETURN_STRING"])  # noqa: SLF001 pylint: disable=protected-access
+            self.assertEqual(response["errortext"], "page and page_size must both be positive integers")
+        self.assertEqual(mockDb().getEntriesWithLigand.call_count, 1)
+
+    @patch("wwpdb.apps.chemeditor.webapp.CcdCodeAllocator.isInSandbox", return_value=False)
+    def testGetNextAccession(self, mockSandbox):  # pylint: disable=unused-argument
         """Tests retrieval of the next CCD code"""
 
-        mockcvs().getSandBoxFilePath.return_value = False
-
         iddir = os.path.join(configInfo["REFERENCE_PATH"], "id_codes")
         if not os.path.isdir(iddir):
             os.mkdir(iddir)
@@ -87,6 +111,29 @@ class ChemEditorWebAppTests(unittest.TestCase):
         response = json.loads(cewa.doOp().get()["RETURN_STRING"])
         self.assertEqual(response["textcontent"], "CDEFG")
 
+    @patch("wwpdb.apps.chemeditor.webapp.CcdCodeAllocator.isInSandbox", return_value=False)
+    def testGetNewCodes(self, mockSandbox):  # pylint: disable=unused-argument
+        """Tests reservation of several CCD codes at once"""
+        iddir = os.path.join(configInfo["REFERENCE_PATH"], "id_codes")
+        if not os.path.isdir(iddir):
+            os.mkdir(iddir)
+        with open(os.path.join(iddir, "unusedCodes.lst"), "w") as fout:
+            fout.write("1AB\nCDEFG\nHIJ\n")
+
+        cewa = ChemEditorWebAppWorker(self._reqObj, self._verbose, self._lfh)
+        self._reqObj.setValue("request_path", "/service/chemeditor/get_new_codes")
+        self._reqObj.setValue("debug_no_notify", "True")
+
+        self._reqObj.setValue("count", "2")
+        response = json.loads(cewa.doOp().get()["RETURN_STRING"])
+        self.assertEqual(response["datacontent"], ["1AB", "CDEFG"])
+        # not enough codes left - nothing is reserved
+        response = json.loads(cewa.doOp().get()["RETURN_STRING"])
+        self.assertEqual(response["errortext"], "failed")
+        self._reqObj.setValue("count", "1")
+        response = json.loads(cewa.doOp().get()["RETURN_STRING"])
+        self.assertEqual(response["datacontent"], ["HIJ"])
+
     def testThreshold(self):
         """Tests retrieval of the next CCD code"""
 
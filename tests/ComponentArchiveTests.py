@@ -0,0 +1,82 @@
+##
+# File: ComponentArchiveTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ComponentArchive module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from wwpdb.apps.chemeditor.webapp.ComponentArchive import (
+    getArchiveType,
+    isMultiBlockCif,
+    readComponents,
+    splitCifBlocks,
+)
+
+ATP = "data_ATP\n#\n_chem_comp.id ATP\n_chem_comp.pdbx_description\n;\ndata_ in a text field\n;\n#\n"
+GTP = "data_GTP\n#\n_chem_comp.id GTP\n#\n"
+
+
+class ComponentArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testSplit(self):
+        self.assertEqual(splitCifBlocks("# header\n" + ATP + GTP), [("ATP", ATP), ("GTP", GTP)])
+        self.assertTrue(isMultiBlockCif(ATP + GTP))
+        self.assertFalse(isMultiBlockCif(ATP))
+
+    def testArchives(self):
+        zipPath = os.path.join(self.__tmpDir.name, "ligands.zip")
+        with zipfile.ZipFile(zipPath, "w") as zf:
+            zf.writestr("ligands/ATP.cif", ATP)
+            zf.writestr("ligands/readme.txt", "not a component")
+            zf.writestr("__MACOSX/ligands/._GTP.cif", "resource fork")
+            zf.writestr("ligands/more.cif", GTP + ATP)
+        tarPath = os.path.join(self.__tmpDir.name, "ligands.tar")
+        with tarfile.open(tarPath, "w") as tf:
+            for name, text in (("ATP.cif", ATP), ("more.cif", GTP + ATP)):
+                info = tarfile.TarInfo(name)
+                info.size = len(text)
+                tf.addfile(info, io.BytesIO(text.encode()))
+        for filePath, kind, prefix in ((zipPath, "zip", "ligands/"), (tarPath, "tar", "")):
+            with open(filePath, "rb") as ifh:
+                self.assertEqual(getArchiveType(ifh.read(512)), kind)
+            componentList = readComponents(filePath)
+            self.assertEqual(
+                [(source, name) for source, name, _text in componentList],
+                [(prefix + "ATP.cif", "ATP"), (prefix + "more.cif", "GTP"), (prefix + "more.cif", "ATP")],
+            )
+            self.assertEqual(componentList[1][2], GTP)
+            self.assertRaises(ValueError, readComponents, filePath, maxComponents=2)
+            self.assertRaises(ValueError, readComponents, filePath, maxBytes=len(ATP) + 1)
+        with open(zipPath, "r+b") as ofh:
+            ofh.truncate(100)
+        self.assertRaises(ValueError, readComponents, zipPath)
+
+    def testCifFile(self):
+        filePath = os.path.join(self.__tmpDir.name, "ligands.cif")
+        with open(filePath, "w") as ofh:
+            ofh.write(ATP + GTP)
+        self.assertIsNone(getArchiveType((ATP + GTP).encode()))
+        self.assertEqual([name for _source, name, _text in readComponents(filePath)], ["ATP", "GTP"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,3 @@
-import os
 import os.path
 import sys
 import tempfile
@@ -52,3 +51,36 @@ class DaInternalCombineDbTests(unittest.TestCase):
             cursorMock.fetchall.return_value = ()
             entries = db.getEntriesWithLigand("BBB")
             self.assertSequenceEqual(entries, [])
+
+    @patch("wwpdb.apps.chemeditor.webapp.DaInternalCombineDb.MyConnectionBase", autospec=True)
+    def testGetEntriesWithLigands(self, mockDbBase):
+        cursorMock = Mock()
+        cursorMock.fetchmany.side_effect = [(("AAA", "D_800008"), ("BBB", "D_800009"), ("AAA", "D_800010")), ()]
+        mockDbBase.return_value.getConnection.return_value.cursor.return_value = cursorMock
+
+        with DaInternalCombineDb() as db:
+            entriesD = db.getEntriesWithLigands(["AAA", "BBB", "CCC"])
+            self.assertEqual(entriesD, {"AAA": ["D_800008", "D_800010"], "BBB": ["D_800009"], "CCC": []})
+            self.assertEqual(cursorMock.execute.call_count, 1)
+
+            countCursorMock = Mock()
+            countCursorMock.fetchall.return_value = (("AAA", 2), ("BBB", 1))
+            mockDbBase.return_value.getCursor.return_value = countCursorMock
+            self.assertEqual(db.countEntriesWithLigands(["AAA", "BBB", "CCC"]), {"AAA": 2, "BBB": 1, "CCC": 0})
+
+    @patch("wwpdb.apps.chemeditor.webapp.DaInternalCombineDb.MyConnectionBase", autospec=True)
+    def testCachedEntriesWithLigand(self, mockDbBase):
+        cacheMock = Mock()
+        cacheMock.get.return_value = ["D_800008"]
+        with DaInternalCombineDb(cache=cacheMock) as db:
+            self.assertSequenceEqual(db.getEntriesWithLigand("AAA"), ["D_800008"])
+        # a cache hit does not open a database connection
+        mockDbBase.return_value.openConnection.assert_not_called()
+
+        cacheMock.get.return_value = None
+        cursorMock = Mock()
+        cursorMock.fetchall.return_value = (("D_800009",),)
+        mockDbBase.return_value.getCursor.return_value = cursorMock
+        with DaInternalCombineDb(cache=cacheMock) as db:
+            self.assertSequenceEqual(db.getEntriesWithLigand("BBB"), ["D_800009"])
+        cacheMock.put.assert_called_once_with("BBB", ["D_800009"])
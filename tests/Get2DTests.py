@@ -0,0 +1,91 @@
+##
+# File: Get2DTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for Get2D module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from wwpdb.apps.chemeditor.webapp.CactvsPool import CactvsError
+from wwpdb.apps.chemeditor.webapp.Get2D import Get2D
+from wwpdb.apps.chemeditor.webapp.LayoutCache import LayoutCache
+
+
+class Get2DTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__sessionPath = self.__tmpDir.name
+        self.__cache = LayoutCache(log=io.StringIO())
+        self.__poolMock = Mock()
+        self.__poolMock.layout.side_effect = CactvsError("no csts interpreter available")
+        self.__poolMock.layoutMany.side_effect = CactvsError("no csts interpreter available")
+        siteConfig = Mock()
+        siteConfig.cICommon.get_site_cc_cactvs_dir.return_value = "/cactvs"
+        module = "wwpdb.apps.chemeditor.webapp.Get2D."
+        for target, value in (
+            ("getSiteConfig", Mock(return_value=siteConfig)),
+            ("getLayoutCache", Mock(return_value=self.__cache)),
+            ("getCactvsPool", Mock(return_value=self.__poolMock)),
+        ):
+            patcher = patch(module + target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(Get2D, "_Get2D__runCACTVSScript", self.__runScript)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __runScript(self):
+        """Stand-in for csts: writes out_<i>.sdf for each input record that does not contain 'fail'"""
+        for fileName in os.listdir(self.__sessionPath):
+            if fileName.startswith("in_"):
+                with open(os.path.join(self.__sessionPath, fileName)) as ifh:
+                    text = ifh.read()
+                if "fail" not in text:
+                    with open(os.path.join(self.__sessionPath, "out_" + fileName[3:]), "w") as ofh:
+                        ofh.write("2D " + text)
+
+    def __getWorker(self, **valueD):
+        reqObj = MagicMock()
+        reqObj.getValue.side_effect = lambda name: valueD.get(name, "")
+        reqObj.newSessionObj.return_value.getPath.return_value = self.__sessionPath
+        return Get2D(reqObj=reqObj, log=io.StringIO())
+
+    def testScriptFallback(self):
+        """Tests that script results are not cached and that stale session files are not returned"""
+        self.assertEqual(self.__getWorker(sdf="ATP").GetResult(), "2D ATP\n")
+        self.assertEqual(self.__cache.getStats()["size"], 0)
+        # the out_0.sdf of the previous run must not be returned for a record that fails
+        self.assertEqual(self.__getWorker(sdf="fail").GetResult(), "")
+        self.assertEqual(self.__getWorker(sdf="A\nM  END\n$$$$\nfail\nM  END\n").GetBatchResult(), ["2D A\nM  END\n", ""])
+        self.assertEqual(self.__cache.getStats()["size"], 0)
+
+    def testPoolResultCached(self):
+        self.__poolMock.layout.side_effect = None
+        self.__poolMock.layout.return_value = "pool ATP"
+        self.assertEqual(self.__getWorker(sdf="ATP").GetResult(), "pool ATP")
+        self.assertEqual(self.__getWorker(sdf="ATP").GetResult(), "pool ATP")
+        self.assertEqual(self.__poolMock.layout.call_count, 1)
+        # records the pool could not lay out fall back to the script and are not cached
+        self.__poolMock.layoutMany.side_effect = None
+        self.__poolMock.layoutMany.return_value = ["pool B", None]
+        self.assertEqual(self.__getWorker(sdf="B\nM  END\n$$$$\nC\nM  END\n").GetBatchResult(), ["pool B", "2D C\nM  END\n\n"])
+        self.assertEqual(self.__cache.getStats()["size"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+##
+# File: LayoutCacheTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for LayoutCache module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import tempfile
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.LayoutCache import LayoutCache, normalizeSdf, splitSdf
+
+MOLFILE = "ATP\r\n  CACTVS  \r\n\r\n  0  0  0  0  0  0  0  0  0  0999 V2000\r\nM  END\r\n\r\n"
+
+
+class LayoutCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__lfh = io.StringIO()
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testNormalize(self):
+        self.assertEqual(normalizeSdf(MOLFILE), "ATP\n  CACTVS\n\n  0  0  0  0  0  0  0  0  0  0999 V2000\nM  END")
+
+    def testSplit(self):
+        self.assertEqual([normalizeSdf(record) for record in splitSdf(MOLFILE)], [normalizeSdf(MOLFILE)])
+        recordList = splitSdf("A\r\nM  END\r\n$$$$\r\n\nB\nM  END\n> <ID>\nB\n\n$$$$\n\n")
+        self.assertEqual(recordList, ["A\nM  END", "\nB\nM  END\n> <ID>\nB\n"])
+
+    def testKey(self):
+        cache = LayoutCache(log=self.__lfh)
+        key = cache.getKey(MOLFILE, False)
+        self.assertEqual(key, cache.getKey(normalizeSdf(MOLFILE) + "\n", False))
+        self.assertNotEqual(key, cache.getKey(MOLFILE, True))
+        self.assertNotEqual(key, cache.getKey(MOLFILE, False, toolVersion="cactvs-3.4"))
+
+    def testMemoryLru(self):
+        cache = LayoutCache(maxEntries=2, log=self.__lfh)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.getStats(), {"hits": 2, "misses": 1, "size": 2})
+
+    def testShared(self):
+        LayoutCache(self.__tmpDir.name, log=self.__lfh).put("a", "A")
+        # another worker process reads the result from the cache directory
+        self.assertEqual(LayoutCache(self.__tmpDir.name, log=self.__lfh).get("a"), "A")
+        self.assertIsNone(LayoutCache(log=self.__lfh).get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
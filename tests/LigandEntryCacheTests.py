@@ -0,0 +1,74 @@
+##
+# File: LigandEntryCacheTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for LigandEntryCache module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.LigandEntryCache import LigandEntryCache
+
+
+class LigandEntryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__dbPath = os.path.join(self.__tmpDir.name, "ligand_entries.sqlite")
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testGetPutInvalidate(self):
+        cache = LigandEntryCache(self.__dbPath)
+        self.assertIsNone(cache.get("ATP"))
+        cache.put("atp", ["D_800001", "D_800002"])
+        self.assertEqual(cache.get("ATP"), ["D_800001", "D_800002"])
+        # entries are shared with other cache objects of the same database
+        otherCache = LigandEntryCache(self.__dbPath)
+        self.assertEqual(otherCache.get("atp"), ["D_800001", "D_800002"])
+        # counters are written in batches
+        otherCache.flush()
+        cache.invalidate("ATP")
+        self.assertIsNone(cache.get("ATP"))
+        statD = cache.getStats()
+        self.assertEqual((statD["hits"], statD["misses"], statD["size"]), (2, 2, 0))
+        self.assertAlmostEqual(statD["hit_rate"], 0.5)
+
+    def testExpiryAndSize(self):
+        cache = LigandEntryCache(self.__dbPath, ttl=0.05, maxEntries=2)
+        cache.put("AAA", [])
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("AAA"))
+        cache = LigandEntryCache(self.__dbPath, maxEntries=2)
+        for ccId in ("BBB", "CCC", "DDD"):
+            cache.put(ccId, ["D_" + ccId])
+            time.sleep(0.01)
+        self.assertEqual(cache.getStats()["size"], 2)
+        self.assertIsNone(cache.get("BBB"))
+        self.assertEqual(cache.get("DDD"), ["D_DDD"])
+
+    def testDatabaseError(self):
+        cache = LigandEntryCache(self.__dbPath, log=io.StringIO())
+        cache.put("ATP", ["D_800001"])
+        with sqlite3.connect(self.__dbPath) as con:
+            con.execute("DROP TABLE ligand_entries")
+        # errors of the cache database are cache misses
+        self.assertIsNone(cache.get("ATP"))
+        cache.put("ATP", ["D_800001"])
+        cache.flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
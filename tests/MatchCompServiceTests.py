@@ -0,0 +1,113 @@
+##
+# File: MatchCompServiceTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for MatchCompService module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from wwpdb.apps.chemeditor.webapp.MatchCompService import MatchCompService
+
+
+class _ToolRunnerStub:
+    """Stand-in for ToolRunner whose matchComp writes the input text and option to the report"""
+
+    def __init__(self, topPath):
+        self.__libraryFiles = (os.path.join(topPath, "cc.sdb"), os.path.join(topPath, "cc.idx"))
+        for filePath in self.__libraryFiles:
+            with open(filePath, "w") as ofh:
+                ofh.write("library")
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def getCcDictFiles(self):
+        return self.__libraryFiles
+
+    def run(self, program, args, workingPath, log=None):  # pylint: disable=unused-argument
+        with self.lock:
+            self.calls += 1
+        with open(os.path.join(workingPath, args[args.index("-i") + 1])) as ifh:
+            text = ifh.read()
+        if "fail" in text:
+            return
+        with open(os.path.join(workingPath, args[args.index("-o") + 1]), "w") as ofh:
+            ofh.write("%s %s" % (text, args[args.index("-op") + 1]))
+
+
+class MatchCompServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__toolRunner = _ToolRunnerStub(self.__tmpDir.name)
+        self.__service = MatchCompService(self.__toolRunner, self.__tmpDir.name, maxWorkers=2, log=io.StringIO())
+        self.__inPath = self.__writeFile("in.cif", "ATP")
+
+    def tearDown(self):
+        self.__service.shutdown()
+        self.__tmpDir.cleanup()
+
+    def __writeFile(self, fileName, text):
+        filePath = os.path.join(self.__tmpDir.name, fileName)
+        with open(filePath, "w") as ofh:
+            ofh.write(text)
+        return filePath
+
+    def testMemo(self):
+        """Tests that repeated searches reuse the report and that the option is part of the key"""
+        self.assertEqual(self.__service.match(self.__inPath, "exact"), "ATP exact")
+        self.assertEqual(self.__service.match(self.__inPath, "exact"), "ATP exact")
+        self.assertEqual(self.__toolRunner.calls, 1)
+        self.assertEqual(self.__service.match(self.__inPath, "close"), "ATP close")
+        self.assertEqual(self.__toolRunner.calls, 2)
+        # scratch directories are removed
+        self.assertEqual(sorted(name for name in os.listdir(self.__tmpDir.name) if name.startswith("match_")), [])
+
+    def testFailureNotMemoized(self):
+        failPath = self.__writeFile("fail.cif", "fail")
+        self.assertEqual(self.__service.match(failPath, "exact"), "")
+        self.assertEqual(self.__service.match(failPath, "exact"), "")
+        self.assertEqual(self.__toolRunner.calls, 2)
+
+    def testLibraryChange(self):
+        """Tests that memoized reports are discarded when the library changes"""
+        self.__service.match(self.__inPath, "exact")
+        sdbFile, _idxFile = self.__toolRunner.getCcDictFiles()
+        with open(sdbFile, "a") as ofh:
+            ofh.write(" updated")
+        self.__service.match(self.__inPath, "exact")
+        self.assertEqual(self.__toolRunner.calls, 2)
+
+    def testShutdownRace(self):
+        """Tests that searches submitted while another thread shuts the pool down still run"""
+        errorList = []
+
+        def search(idx):
+            try:
+                inPath = self.__writeFile("in_%d.cif" % idx, "C%d" % idx)
+                for _ in range(20):
+                    self.assertEqual(self.__service.match(inPath, "exact"), "C%d exact" % idx)
+                    self.__service.shutdown()
+            except (AssertionError, RuntimeError) as e:
+                errorList.append(e)
+
+        threadList = [threading.Thread(target=search, args=(idx,)) for idx in range(4)]
+        for thread in threadList:
+            thread.start()
+        for thread in threadList:
+            thread.join()
+        self.assertEqual(errorList, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
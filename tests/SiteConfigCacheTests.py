@@ -0,0 +1,90 @@
+##
+# File: SiteConfigCacheTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for SiteConfigCache module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import (
+    getConfigFileSignature,
+    getSiteConfig,
+    reloadSiteConfig,
+)
+
+SITE_ID = "TEST_SITE"
+
+
+class SiteConfigCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__configDir = os.path.join(self.__tmpDir.name, "site-config", "test_site")
+        os.makedirs(self.__configDir)
+        self.__configFilePath = os.path.join(self.__configDir, "ConfigInfoFileCache.json")
+        self.__writeConfig("{}")
+        self.__configMock = MagicMock()
+        for target in ("ConfigInfo", "ConfigInfoAppCommon", "ConfigInfoAppCc", "ChemRefPathInfo"):
+            patcher = patch("wwpdb.apps.chemeditor.webapp.SiteConfigCache." + target, self.__configMock if target == "ConfigInfo" else MagicMock())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.dict(os.environ, {"TOP_WWPDB_SITE_CONFIG_DIR": self.__tmpDir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        reloadSiteConfig(SITE_ID)
+        self.addCleanup(reloadSiteConfig, SITE_ID)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def __writeConfig(self, text, mtime=None):
+        with open(self.__configFilePath, "w") as ofh:
+            ofh.write(text)
+        if mtime is not None:
+            os.utime(self.__configFilePath, (mtime, mtime))
+
+    def testSignature(self):
+        self.__writeConfig("{}", mtime=1000)
+        self.assertEqual(getConfigFileSignature(SITE_ID), ((self.__configFilePath, 1000, 2),))
+        self.assertEqual(getConfigFileSignature(None), ())
+
+    def testSharedSnapshot(self):
+        """Tests that one snapshot is shared until the configuration file changes"""
+        snapshot = getSiteConfig(SITE_ID)
+        self.assertIs(getSiteConfig(SITE_ID), snapshot)
+        self.assertEqual(self.__configMock.call_count, 1)
+        self.assertIs(snapshot.cI, self.__configMock.return_value)
+        # the file is not consulted again within CHECK_INTERVAL
+        self.__writeConfig("{ }", mtime=2000)
+        self.assertIs(getSiteConfig(SITE_ID), snapshot)
+        with patch("wwpdb.apps.chemeditor.webapp.SiteConfigCache.CHECK_INTERVAL", 0.0):
+            rebuilt = getSiteConfig(SITE_ID)
+            self.assertIsNot(rebuilt, snapshot)
+            self.assertIs(getSiteConfig(SITE_ID), rebuilt)
+        self.assertEqual(self.__configMock.call_count, 2)
+
+    def testReload(self):
+        snapshot = getSiteConfig(SITE_ID)
+        reloadSiteConfig(SITE_ID)
+        self.assertIsNot(getSiteConfig(SITE_ID), snapshot)
+
+    def testCachePath(self):
+        snapshot = getSiteConfig(SITE_ID)
+        snapshot.cICommon.get_site_web_apps_top_sessions_path.return_value = self.__tmpDir.name
+        cachePath = snapshot.getCachePath("test_cache")
+        self.assertEqual(cachePath, os.path.join(self.__tmpDir.name, "chemeditor_cache", "test_cache"))
+        self.assertTrue(os.path.isdir(cachePath))
+
+
+if __name__ == "__main__":
+    unittest.main()
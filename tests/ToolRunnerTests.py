@@ -0,0 +1,105 @@
+##
+# File: ToolRunnerTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for ToolRunner module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import io
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from wwpdb.apps.chemeditor.webapp.ToolRunner import ToolRunner
+
+# stand-in for annotateComp: prints its arguments and OE_DIR, complains on stderr and sleeps if asked to
+TOOL_SCRIPT = """#!/bin/sh
+echo "args $*"
+echo "oe $OE_DIR"
+echo "warning" >&2
+if [ "$1" = "sleep" ]; then sleep 5; fi
+exit 3
+"""
+
+
+class _ConfigStub:
+    """Configuration object whose getters return a distinct path below topPath"""
+
+    def __init__(self, topPath):
+        self.__topPath = topPath
+
+    def __getattr__(self, name):
+        return lambda: os.path.join(self.__topPath, name)
+
+
+class ToolRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        configStub = _ConfigStub(self.__tmpDir.name)
+        self.__siteConfig = Mock(cICommon=configStub, cIAppCc=configStub)
+        binPath = os.path.join(self.__tmpDir.name, "get_site_cc_apps_path", "bin")
+        os.makedirs(binPath)
+        programPath = os.path.join(binPath, "annotateComp")
+        with open(programPath, "w") as ofh:
+            ofh.write(TOOL_SCRIPT)
+        os.chmod(programPath, os.stat(programPath).st_mode | stat.S_IXUSR)
+        self.__lfh = io.StringIO()
+        self.__runner = ToolRunner(self.__siteConfig, log=self.__lfh)
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testEnvironment(self):
+        """Tests that each tool family gets its own environment"""
+        annotEnv = self.__runner.getEnvironment("annot")
+        ccToolsEnv = self.__runner.getEnvironment("cc-tools")
+        ccDictEnv = self.__runner.getEnvironment("cc-dict")
+        self.assertEqual(annotEnv["RCSBROOT"], os.path.join(self.__tmpDir.name, "get_site_annot_tools_path"))
+        self.assertNotIn("OE_DIR", annotEnv)
+        self.assertEqual(ccToolsEnv["OE_DIR"], os.path.join(self.__tmpDir.name, "get_site_cc_oe_dir"))
+        self.assertNotIn("CC_SDB_FILE", ccToolsEnv)
+        self.assertEqual(ccDictEnv["OE_DIR"], ccToolsEnv["OE_DIR"])
+        self.assertEqual(self.__runner.getCcDictFiles(), (ccDictEnv["CC_SDB_FILE"], ccDictEnv["CC_IDX_FILE"]))
+        self.assertEqual(self.__runner.getProgramPath("GetAtomMatch"), os.path.join(annotEnv["BINPATH"], "GetAtomMatch"))
+
+    def testRun(self):
+        """Tests output capture, exit status and statistics"""
+        result = self.__runner.run("annotateComp", ["-i", "in.cif"], self.__tmpDir.name)
+        self.assertEqual(result.returnCode, 3)
+        self.assertEqual(result.stdout, "args -i in.cif\noe %s\n" % os.path.join(self.__tmpDir.name, "get_site_cc_oe_dir"))
+        self.assertEqual(result.stderr, "warning\n")
+        # the output of failed runs is logged
+        self.assertIn("warning", self.__lfh.getvalue())
+        self.assertEqual(self.__runner.getStats()["annotateComp"]["calls"], 1)
+        self.assertEqual(self.__runner.getStats()["annotateComp"]["failures"], 1)
+
+    def testTimeout(self):
+        result = self.__runner.run("annotateComp", ["sleep"], self.__tmpDir.name, timeout=0.5)
+        self.assertEqual(result.returnCode, -1)
+        self.assertIn("timed out", result.stderr)
+        self.assertLess(result.wallTime, 5.0)
+
+    def testMissingProgram(self):
+        result = self.__runner.run("GetAtomMatch", [], self.__tmpDir.name)
+        self.assertEqual(result.returnCode, 127)
+        self.assertIn("could not be started", result.stderr)
+
+    def testToolchainVersion(self):
+        """Tests that the toolchain signature changes with the installation directories"""
+        version = self.__runner.getToolchainVersion("cc-tools")
+        os.makedirs(os.path.join(self.__tmpDir.name, "get_site_cc_oe_dir"))
+        self.assertNotEqual(self.__runner.getToolchainVersion("cc-tools"), version)
+        self.assertEqual(self.__runner.getToolchainVersion("annot"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
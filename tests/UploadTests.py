@@ -0,0 +1,125 @@
+##
+# File: UploadTests.py
+# Date:  18-Oct-2026
+#
+# Updates:
+##
+"""Test cases for the streaming upload functions of the Upload module"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import MagicMock, Mock, patch
+
+from wwpdb.apps.chemeditor.webapp.Upload import (
+    Upload,
+    _iterChunks,
+    decompressChunks,
+    getCompression,
+    saveUpload,
+)
+
+CIF = b'data_ATP\r\n#\r\n_chem_comp.id ATP\r\n_chem_comp.name "ADENOSINE-5\'-TRIPHOSPHATE"\r\n#\r\n' * 200
+
+
+class UploadTests(unittest.TestCase):
+    def setUp(self):
+        self.__tmpDir = tempfile.TemporaryDirectory()
+        self.__filePath = os.path.join(self.__tmpDir.name, "ATP.cif")
+
+    def tearDown(self):
+        self.__tmpDir.cleanup()
+
+    def testCompression(self):
+        self.assertEqual(getCompression(gzip.compress(CIF)), "gz")
+        self.assertEqual(getCompression(bz2.compress(CIF)), "bz2")
+        self.assertEqual(getCompression(lzma.compress(CIF)), "xz")
+        self.assertIsNone(getCompression(CIF))
+
+    def testDecompress(self):
+        for kind, compress in (("gz", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)):
+            # concatenated streams fed in small pieces come out in pieces of at most chunkSize bytes
+            data = compress(CIF) + compress(CIF)
+            pieceList = list(decompressChunks(_iterChunks(io.BytesIO(data[7:]), data[:7], 13), kind, chunkSize=1000))
+            self.assertEqual(b"".join(pieceList), CIF + CIF, kind)
+            self.assertLessEqual(max(len(piece) for piece in pieceList), 1000)
+            self.assertRaises(ValueError, list, decompressChunks([data[: len(data) // 4]], kind))
+            # zero padding after the last stream is ignored, other trailing data is not
+            self.assertEqual(b"".join(decompressChunks([data + b"\x00" * 100, b"\x00" * 412], kind)), CIF + CIF, kind)
+            self.assertRaises(ValueError, list, decompressChunks([data + b"\x00" * 100, b"\x00x"], kind))
+
+    def testSaveUpload(self):
+        text = saveUpload(_iterChunks(io.BytesIO(CIF), b"", 100), self.__filePath, len(CIF))
+        self.assertEqual(text, CIF.decode().replace("\r\n", "\n"))
+        with open(self.__filePath, "rb") as ifh:
+            self.assertEqual(ifh.read(), CIF)
+        data = gzip.compress(CIF)
+        self.assertEqual(saveUpload([data], self.__filePath, len(CIF), compression="gz"), text)
+        # only the leading text is returned, the file is stored in full
+        text = saveUpload(_iterChunks(io.BytesIO(CIF), b"", 100), self.__filePath, len(CIF), maxTextBytes=250)
+        self.assertEqual(text, CIF[:250].decode().replace("\r\n", "\n"))
+        self.assertEqual(os.path.getsize(self.__filePath), len(CIF))
+
+    def testArchive(self):
+        # archives are stored but not returned as text
+        ofh = io.BytesIO()
+        with zipfile.ZipFile(ofh, "w") as zf:
+            zf.writestr("ATP.cif", CIF)
+        data = ofh.getvalue()
+        self.assertIsNone(saveUpload([data[:600], data[600:]], self.__filePath, len(data)))
+        with open(self.__filePath, "rb") as ifh:
+            self.assertEqual(ifh.read(), data)
+        # the tar magic is recognized when the leading bytes arrive in several chunks
+        ofh = io.BytesIO()
+        with tarfile.open(fileobj=ofh, mode="w") as tf:
+            info = tarfile.TarInfo("ATP.cif")
+            info.size = len(CIF)
+            tf.addfile(info, io.BytesIO(CIF))
+        data = ofh.getvalue()
+        self.assertIsNone(saveUpload(_iterChunks(io.BytesIO(data), b"", 100), self.__filePath, len(data)))
+        # short text uploads are still returned
+        self.assertEqual(saveUpload([b"data_A\n", b"#\n"], self.__filePath, 100), "data_A\n#\n")
+
+    def testSizeCap(self):
+        # the cap applies to the expanded size
+        data = gzip.compress(CIF)
+        self.assertRaises(ValueError, saveUpload, [data], self.__filePath, len(CIF) - 1, compression="gz")
+        self.assertFalse(os.access(self.__filePath, os.F_OK))
+
+    def __getUpload(self, data, maxBytes):
+        reqObj = MagicMock()
+        reqObj.getRawValue.return_value = Mock(filename="ATP.cif.gz", file=io.BytesIO(data))
+        reqObj.newSessionObj.return_value.getPath.return_value = self.__tmpDir.name
+        return Upload(reqObj=reqObj, maxBytes=maxBytes, log=io.StringIO())
+
+    def testUploadError(self):
+        """Tests that a rejected or failed upload reports its error and leaves no file path"""
+        upload = self.__getUpload(gzip.compress(CIF), len(CIF) - 1)
+        self.assertEqual(upload.GetResult(), "")
+        self.assertEqual(upload.getError(), "upload exceeds %d bytes" % (len(CIF) - 1))
+        self.assertIsNone(upload.getFilePath())
+        with patch("wwpdb.apps.chemeditor.webapp.Upload.saveUpload", side_effect=OSError("disk full")):
+            upload = self.__getUpload(gzip.compress(CIF), len(CIF))
+            self.assertEqual(upload.GetResult(), "")
+        self.assertEqual(upload.getError(), "File upload failed")
+        self.assertIsNone(upload.getFilePath())
+        upload = self.__getUpload(gzip.compress(CIF), len(CIF))
+        self.assertEqual(upload.GetResult(), CIF.decode().replace("\r\n", "\n"))
+        self.assertIsNone(upload.getError())
+        self.assertEqual(upload.getFilePath(), os.path.join(self.__tmpDir.name, "atp.cif"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+##
+# File:  AnnotateCompCache.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Persistent content-addressed cache of annotateComp results.
+
+Entries are keyed by a hash of the normalized input chemical component CIF and the annotation
+toolchain version.  The cache directory is bounded in size and the least recently used entries
+are evicted first.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+# Default size bound of the cache directory
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# The cache directory is scanned for eviction once every EVICT_INTERVAL stores, and whenever the
+# stores of this process push the last measured size past the bound
+EVICT_INTERVAL = 64
+
+_cacheD = {}
+_cacheLock = threading.Lock()
+
+
+class AnnotateCompCache:
+    """Size-bounded LRU cache of annotated chemical component CIF files stored in cachePath."""
+
+    def __init__(self, cachePath, maxBytes=DEFAULT_MAX_BYTES, evictInterval=EVICT_INTERVAL, verbose=False, log=sys.stderr):
+        self.__cachePath = cachePath
+        self.__maxBytes = maxBytes
+        self.__evictInterval = evictInterval
+        self.__putCount = 0
+        # size of the cache directory measured by the last scan plus the stores since then
+        self.__totalBytes = None
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def getKey(self, filePath, toolVersion):
+        """Return the cache key of the chemical component CIF file filePath annotated by toolVersion"""
+        ifh = open(filePath, "rb")
+        data = ifh.read()
+        ifh.close()
+        hashObj = hashlib.sha256()
+        hashObj.update(toolVersion.encode("utf-8"))
+        hashObj.update(b"\0")
+        hashObj.update(normalizeCif(data))
+        return hashObj.hexdigest()
+
+    def get(self, key, outputFilePath):
+        """Copy the cached result for key to outputFilePath.  Return True on a cache hit."""
+        entryPath = self.__getEntryPath(key)
+        try:
+            shutil.copyfile(entryPath, outputFilePath)
+            # mark as recently used
+            os.utime(entryPath, None)
+            found = True
+        except OSError:
+            found = False
+        with self.__lock:
+            if found:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+            hits, misses = self.__hits, self.__misses
+        self.__lfh.write("+AnnotateCompCache.get() %s %s (hits %d misses %d)\n" % (key, "hit" if found else "miss", hits, misses))
+        return found
+
+    def put(self, key, resultFilePath):
+        """Store the annotated file resultFilePath under key.  Old entries are evicted once the cache is full."""
+        try:
+            fd, tmpPath = tempfile.mkstemp(dir=self.__cachePath, prefix=".tmp_")
+            os.close(fd)
+            shutil.copyfile(resultFilePath, tmpPath)
+            size = os.path.getsize(tmpPath)
+            os.replace(tmpPath, self.__getEntryPath(key))
+        except OSError as e:
+            self.__lfh.write("+AnnotateCompCache.put() failed storing %s: %s\n" % (key, str(e)))
+            return False
+        with self.__lock:
+            self.__putCount += 1
+            if self.__totalBytes is not None:
+                self.__totalBytes += size
+            evict = (self.__putCount % self.__evictInterval == 0) or (self.__totalBytes is None) or (self.__totalBytes > self.__maxBytes)
+        if evict:
+            totalBytes = self.__evict()
+            with self.__lock:
+                self.__totalBytes = totalBytes
+        return True
+
+    def getStats(self):
+        """Return hit and miss counts of this process"""
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses}
+
+    def __getEntryPath(self, key):
+        return os.path.join(self.__cachePath, key + ".cif")
+
+    def __evict(self):
+        """Remove least recently used entries until the cache fits in maxBytes.  Return the remaining size, or None if the directory cannot be read."""
+        entryList = []
+        totalBytes = 0
+        try:
+            for entry in os.scandir(self.__cachePath):
+                if (not entry.name.endswith(".cif")) or (not entry.is_file()):
+                    continue
+                st = entry.stat()
+                entryList.append((st.st_mtime, st.st_size, entry.path))
+                totalBytes += st.st_size
+        except OSError:
+            return None
+        if totalBytes <= self.__maxBytes:
+            return totalBytes
+        entryList.sort()
+        for _mtime, size, path in entryList:
+            try:
+                os.remove(path)
+                totalBytes -= size
+                if self.__verbose:
+                    self.__lfh.write("+AnnotateCompCache.__evict() removed %s\n" % path)
+            except OSError:
+                pass
+            if totalBytes <= self.__maxBytes:
+                break
+        return totalBytes
+
+
+def normalizeCif(data):
+    """Normalize line endings and trailing/blank-line white space of CIF text (bytes).
+
+    Lines inside semicolon-delimited text fields are part of the value and are kept as they are.
+    """
+    lines = []
+    inTextField = False
+    for line in data.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n"):
+        if line.startswith(b";"):
+            inTextField = not inTextField
+        if inTextField:
+            lines.append(line)
+            continue
+        line = line.rstrip()
+        if line:
+            lines.append(line)
+    return b"\n".join(lines)
+
+
+def getAnnotateCompCache(cachePath, maxBytes=DEFAULT_MAX_BYTES, verbose=False, log=sys.stderr):
+    """Return the process-wide AnnotateCompCache for cachePath"""
+    cache = _cacheD.get(cachePath)
+    if cache is None:
+        with _cacheLock:
+            cache = _cacheD.get(cachePath)
+            if cache is None:
+                cache = AnnotateCompCache(cachePath, maxBytes=maxBytes, verbose=verbose, log=log)
+                _cacheD[cachePath] = cache
+    return cache
@@ -0,0 +1,136 @@
+##
+# File:  ArchiveUpload.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Processing of uploads holding many chemical component definitions.
+
+The components of a zip or tar archive or of a multi-block CIF file (ComponentArchive) are run
+through the same annotation and duplicate search pipeline as a single definition (Search), each
+in its own session, concurrently in one bounded pool of processes shared by all requests of the
+server process, so concurrent uploads queue for the same workers.  The result is a status summary
+with one entry per component; a component is reported as failed if it could not be annotated or
+matchComp did not return a report.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from wwpdb.utils.session.WebRequest import InputRequest
+
+from wwpdb.apps.chemeditor.webapp.ComponentArchive import readComponents
+from wwpdb.apps.chemeditor.webapp.Search import Search
+from wwpdb.apps.chemeditor.webapp.Upload import getMaxUploadBytes
+
+# Number of components processed concurrently by the server process
+DEFAULT_WORKERS = 4
+
+_executorD = {}
+_executorLock = threading.Lock()
+
+
+def _processComponent(siteId, topSessionPath, exact, cifText):
+    """Annotate and search one component in a new session (runs in a pool process).
+
+    :Returns:
+        (session id, list of matching component ids, "" or a message saying what failed)
+    """
+    os.environ["WWPDB_SITE_ID"] = siteId
+    reqObj = InputRequest({}, verbose=False, log=sys.stderr)
+    reqObj.setValue("TopSessionPath", topSessionPath)
+    reqObj.setValue("WWPDB_SITE_ID", siteId)
+    reqObj.setValue("cif", cifText)
+    reqObj.setValue("exact", exact)
+    search = Search(reqObj=reqObj, verbose=False, log=sys.stderr)
+    data = search.GetResult()
+    return reqObj.getValue("sessionid"), [ccId for ccId in data.split("\n") if ccId], search.getErrorMessage()
+
+
+def getArchiveExecutor(workers=DEFAULT_WORKERS):
+    """Return the process-wide pool of at most workers processes that runs the components of all uploads"""
+    executor = _executorD.get("executor")
+    if executor is None:
+        with _executorLock:
+            executor = _executorD.get("executor")
+            if executor is None:
+                # spawned processes do not inherit the locks and threads of the server process
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                _executorD["executor"] = executor
+    return executor
+
+
+def _discardArchiveExecutor(executor):
+    """Drop executor, whose worker processes died, so that the next request starts a new pool"""
+    with _executorLock:
+        if _executorD.get("executor") is executor:
+            del _executorD["executor"]
+    executor.shutdown(wait=False)
+
+
+class ArchiveUpload:
+    """Run the annotation and duplicate search of each component of an uploaded file."""
+
+    def __init__(self, reqObj=None, verbose=False, log=sys.stderr):
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__reqObj = reqObj
+        self.__siteId = str(self.__reqObj.getValue("WWPDB_SITE_ID"))
+
+    def GetResult(self, filePath):
+        """Return the status summary of the components of the uploaded file filePath:
+        [{"source", "id", "status" ("ok" or "failed"), "sessionid", "matches", "message"}, ...] in upload order.
+        Raises ValueError if the upload cannot be split into components.
+        """
+        startTime = time.time()
+        componentList = readComponents(filePath, maxBytes=getMaxUploadBytes(self.__siteId))
+        if not componentList:
+            raise ValueError("no chemical component definition found")
+        topSessionPath = str(self.__reqObj.getValue("TopSessionPath"))
+        exact = str(self.__reqObj.getValue("exact"))
+        futureList = self.__submit([(self.__siteId, topSessionPath, exact, text) for _source, _name, text in componentList])
+        summaryList = []
+        for (source, name, _text), future in zip(componentList, futureList):
+            summary = {"source": source, "id": name, "status": "ok", "sessionid": "", "matches": [], "message": ""}
+            try:
+                summary["sessionid"], summary["matches"], summary["message"] = future.result()
+                if summary["message"]:
+                    self.__lfh.write("+ArchiveUpload.GetResult() %s %s: %s\n" % (source, name, summary["message"]))
+                    summary["status"] = "failed"
+            except:  # noqa: E722 pylint: disable=bare-except
+                self.__lfh.write("+ArchiveUpload.GetResult() processing failed for %s %s\n" % (source, name))
+                traceback.print_exc(file=self.__lfh)
+                summary["status"] = "failed"
+                summary["message"] = str(sys.exc_info()[1])
+            summaryList.append(summary)
+        self.__lfh.write(
+            "+ArchiveUpload.GetResult() %d components, %d failed in %.2f seconds\n"
+            % (
+                len(summaryList),
+                [summary["status"] for summary in summaryList].count("failed"),
+                time.time() - startTime,
+            )
+        )
+        return summaryList
+
+    def __submit(self, argsList):
+        """Queue the components on the shared pool; a pool broken by a dead worker is replaced once"""
+        executor = getArchiveExecutor()
+        try:
+            return [executor.submit(_processComponent, *args) for args in argsList]
+        except BrokenProcessPool:
+            self.__lfh.write("+ArchiveUpload.GetResult() worker pool is broken - starting a new pool\n")
+            _discardArchiveExecutor(executor)
+            executor = getArchiveExecutor()
+            return [executor.submit(_processComponent, *args) for args in argsList]
@@ -2,6 +2,7 @@
 # File:  AtomMatch.py
 # Date:  27-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  run GetAtomMatch through ToolRunner
 ##
 """
 
@@ -48,13 +49,12 @@ class AtomMatch(ChemEditorBase):
             return
         reverse_flag = self._reqObj.getValue("reverse")
         self._removeFile(self.__matchResultPath)
-        cmd = "cd " + self._sessionPath + " ; " + self._annotBashSetting()
         if reverse_flag == "yes":
-            cmd += " ${BINPATH}/GetAtomMatch -first in.cif -second " + ccFilePath
+            args = ["-first", "in.cif", "-second", ccFilePath]
         else:
-            cmd += " ${BINPATH}/GetAtomMatch -first " + ccFilePath + " -second in.cif"
-        cmd += " -output match_result -log logfile > _match_log 2>&1 ; "
-        self._runCmd(cmd)
+            args = ["-first", ccFilePath, "-second", "in.cif"]
+        args.extend(["-output", "match_result", "-log", "logfile"])
+        self._runTool("GetAtomMatch", args, self._sessionPath)
 
     def __returnData(self):
         if not os.access(self.__matchResultPath, os.R_OK):
@@ -4,6 +4,11 @@
 # Updates:
 # 06-Sep-2024  zf replace ${CC_TOOLS}/checkComp with RcsbDpUtility's "annot-check-ccd-definition" operator
 #                 added "begin_comment" & "end_comment" variables to control the "Continue commit to CVS" button
+# 18-Oct-2026  agent run precheckComp and matchComp through ToolRunner
+# 18-Oct-2026  agent update CcdStatusIndex and CcdFingerprintIndex after commit
+# 18-Oct-2026  agent check exact duplicates with CcdGraphHashIndex, falling back to matchComp
+# 18-Oct-2026  agent mark committed ids in CcdIdBitmap
+# 18-Oct-2026  agent confirm graph hash candidates with matchComp, use the map only if it is up to date
 #
 ##
 """
@@ -34,7 +39,12 @@ from mmcif.api.DataCategory import DataCategory
 from mmcif.io.PdbxReader import PdbxReader
 from mmcif.io.PdbxWriter import PdbxWriter
 
+from wwpdb.apps.chemeditor.webapp.CcdFingerprintIndex import getCcdFingerprintIndex
+from wwpdb.apps.chemeditor.webapp.CcdGraphHashIndex import getCcdGraphHashIndex
+from wwpdb.apps.chemeditor.webapp.CcdIdBitmap import getCcdIdBitmap
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import getCcdStatusIndex
 from wwpdb.apps.chemeditor.webapp.ChemCompDbUtil import ChemCompDbUtil
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import readCifFile
 from wwpdb.apps.chemeditor.webapp.ChemEditorBase import ChemEditorBase
 from wwpdb.io.file.mmCIFUtil import mmCIFUtil
 from wwpdb.utils.dp.RcsbDpUtility import RcsbDpUtility
@@ -241,18 +251,7 @@ class CVSCommit(ChemEditorBase):
         """Run syntax checking"""
         logFilePath = os.path.join(self._sessionPath, "precheckComp.log")
         self._removeFile(logFilePath)
-        cmd = (
-            "cd "
-            + self._sessionPath
-            + " ; "
-            + self._annotBashSetting()
-            + " ${BINPATH}/precheckComp -i "
-            + self.__id
-            + ".cif -id "
-            + self.__id
-            + " -o precheckComp.log > _precheckComp_log 2>&1 ; "
-        )
-        self._runCmd(cmd)
+        self._runTool("precheckComp", ["-i", self.__id + ".cif", "-id", self.__id, "-o", "precheckComp.log"], self._sessionPath)
         message = ""
         if os.access(logFilePath, os.R_OK):
             f = open(logFilePath)
@@ -341,7 +340,13 @@ class CVSCommit(ChemEditorBase):
 
     def __checkDuplicate(self):
         """Run duplicate checking"""
-        duplicateList = self.__getDuplicatesFromMatchCompProgram()
+        duplicateList = self.__getDuplicatesFromGraphHashIndex()
+        if duplicateList is None:
+            duplicateList = self.__getDuplicatesFromMatchCompProgram()
+        elif duplicateList:
+            # graph hashes may collide - matchComp decides whether the candidates are duplicates
+            self._lfh.write("+CVSCommit.__checkDuplicate() graph hash candidates %s - confirming with matchComp\n" % ",".join(duplicateList))
+            duplicateList = self.__getDuplicatesFromMatchCompProgram()
         if self.__siteName == "RCSB":
             duplicateList.extend(self.__getDuplicatesFromCompv4Database())
         if len(duplicateList) > 0:
@@ -536,9 +541,22 @@ class CVSCommit(ChemEditorBase):
 
     #     return error_message
 
+    def __getDuplicatesFromGraphHashIndex(self):
+        """Get the duplicate candidates with the same graph hash, or None if the map is not up to date with the sandbox"""
+        try:
+            graphHashIndex = getCcdGraphHashIndex(self._siteConfig.siteId, verbose=self._verbose, log=self._lfh)
+            if not graphHashIndex.isFresh():
+                self._lfh.write("+CVSCommit.__getDuplicatesFromGraphHashIndex() graph hash map is not up to date with the sandbox\n")
+                return None
+            containerObj = readCifFile(os.path.join(self._sessionPath, self.__id + ".cif"))[0]
+            return graphHashIndex.findDuplicates(containerObj)
+        except:  # noqa: E722 pylint: disable=bare-except
+            traceback.print_exc(file=self._lfh)
+            return None
+
     def __getDuplicatesFromMatchCompProgram(self):
         """Get duplicate CCD list from /wwpdb_da/da_top/tools/packages/cc-tools-v2/bin/matchComp program"""
-        self._runMatchComp(self._sessionPath, self.__id + ".cif", self.__id + ".match", "'prefilter|strict|exact'")
+        self._runMatchComp(self._sessionPath, self.__id + ".cif", self.__id + ".match", "prefilter|strict|exact")
         matchFilePath = os.path.join(self._sessionPath, self.__id + ".match")
         if not os.access(matchFilePath, os.R_OK):
             return []
@@ -673,6 +691,16 @@ class CVSCommit(ChemEditorBase):
         self._cvsAdmin.cleanup()
         if not os.access(targetFile, os.R_OK):
             textList.append("CVS commit " + ccId + " failed")
+        else:
+            getCcdStatusIndex(self._siteConfig.siteId, verbose=self._verbose, log=self._lfh).update(ccId, targetFile)
+            try:
+                containerObj = readCifFile(targetFile)[0]
+                mtime = os.stat(targetFile).st_mtime
+                getCcdFingerprintIndex(self._siteConfig.siteId, log=self._lfh).update(ccId, containerObj, mtime=mtime)
+                getCcdGraphHashIndex(self._siteConfig.siteId, log=self._lfh).update(ccId, containerObj, mtime=mtime)
+                getCcdIdBitmap(self._siteConfig.siteId, log=self._lfh).add([ccId])
+            except:  # noqa: E722 pylint: disable=bare-except
+                traceback.print_exc(file=self._lfh)
         if textList:
             return "\n".join(textList)
         return ""
@@ -0,0 +1,240 @@
+##
+# File:  CactvsPool.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Pool of long-lived CACTVS (csts) interpreters used for 2D layout.
+
+Each worker starts csts once and loads a Tcl prelude defining the layout procedure.  A request is
+one line on the interpreter's stdin carrying the base64 encoded molfile; the interpreter answers
+with one marked line on stdout carrying the base64 encoded SDF result.  Calls have a timeout; a
+worker that times out or fails is killed and replaced, and workers are recycled after a number
+of calls to bound their memory.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import base64
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Number of interpreters per pool
+DEFAULT_WORKERS = 2
+# Number of calls served by an interpreter before it is restarted
+DEFAULT_MAX_CALLS = 500
+# Seconds allowed for one layout
+DEFAULT_TIMEOUT = 10.0
+
+_RESULT_MARK = "@@GET2D"
+
+# Same steps as the get2d.csh script of Get2D, reading and writing strings instead of files
+_PRELUDE = """
+proc get2d {data hflag} {
+    set ehandle [ens create $data]
+    if {$hflag} {
+        ens hadd $ehandle
+    }
+    ens need $ehandle E_NATOMS recalc
+    ens lock $ehandle E_NATOMS
+    ens need $ehandle {A_SYMBOL A_FREE_ELECTRONS A_XY A_ELEMENT} nofunc
+    ens lock $ehandle {E_STDBLE A_ELEMENT A_NOM_CHARGE A_CIPSTEREO A_DLSTEREO B_CIPSTEREO B_CTSTEREO}
+    ens need $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO} recalc
+    ens lock $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO}
+    ens need $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO} recalc
+    ens lock $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO}
+    set result [molfile string $ehandle format sdf valencelevel 1]
+    ens delete $ehandle
+    return $result
+}
+proc serve {b64 hflag} {
+    if {[catch {get2d [binary decode base64 $b64] $hflag} result]} {
+        puts "%(mark)s ERR [binary encode base64 $result]"
+    } else {
+        puts "%(mark)s OK [binary encode base64 $result]"
+    }
+    flush stdout
+}
+""" % {"mark": _RESULT_MARK}
+
+_poolD = {}
+_poolLock = threading.Lock()
+
+
+class CactvsError(Exception):
+    """Raised when an interpreter fails, times out or reports an error"""
+
+
+class _CactvsWorker:
+    """One csts process"""
+
+    def __init__(self, cactvsDir):
+        env = dict(os.environ)
+        env["CACTVS_ROOT"] = cactvsDir
+        self.__proc = subprocess.Popen(  # noqa: S603
+            [os.path.join(cactvsDir, "csts"), "-d"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        self.__buffer = b""
+        self.calls = 0
+        self.__send(_PRELUDE)
+
+    def layout(self, sdf, hflag, timeout):
+        """Return (ok, text): the 2D laid out SDF of the molfile sdf, or the Tcl error message"""
+        self.calls += 1
+        b64 = base64.b64encode(sdf.encode("utf-8")).decode("ascii")
+        self.__send("serve %s %d\n" % (b64, 1 if hflag else 0))
+        deadline = time.time() + timeout
+        while True:
+            line = self.__readLine(deadline)
+            if line.startswith(_RESULT_MARK + " "):
+                break
+        _mark, status, payload = (line.split(" ", 2) + [""])[:3]
+        return status == "OK", base64.b64decode(payload).decode("utf-8", "replace")
+
+    def isAlive(self):
+        return self.__proc.poll() is None
+
+    def close(self):
+        if self.__proc.poll() is None:
+            self.__proc.kill()
+        self.__proc.wait()
+        self.__proc.stdin.close()
+        self.__proc.stdout.close()
+
+    def __send(self, text):
+        try:
+            self.__proc.stdin.write(text.encode("utf-8"))
+            self.__proc.stdin.flush()
+        except OSError as e:
+            raise CactvsError("csts input closed: %s" % str(e)) from e
+
+    def __readLine(self, deadline):
+        fd = self.__proc.stdout.fileno()
+        while b"\n" not in self.__buffer:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise CactvsError("csts timed out")
+            ready, _w, _x = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise CactvsError("csts exited")
+            self.__buffer += chunk
+        line, self.__buffer = self.__buffer.split(b"\n", 1)
+        return line.decode("ascii", "replace").strip()
+
+
+class CactvsPool:
+    """Bounded pool of csts interpreters of the CACTVS installation cactvsDir."""
+
+    def __init__(
+        self,
+        cactvsDir,
+        workers=DEFAULT_WORKERS,
+        maxCalls=DEFAULT_MAX_CALLS,
+        timeout=DEFAULT_TIMEOUT,
+        verbose=False,
+        log=sys.stderr,
+    ):
+        self.__cactvsDir = cactvsDir
+        self.__maxCalls = maxCalls
+        self.__timeout = timeout
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__workers = workers
+        # idle workers; None marks a slot whose worker is started on demand
+        self.__idle = queue.LifoQueue()
+        for _i in range(workers):
+            self.__idle.put(None)
+
+    def layout(self, sdf, hflag=False, timeout=None):
+        """Return the 2D laid out SDF of the molfile sdf.  Raises CactvsError on failure."""
+        timeout = timeout if timeout is not None else self.__timeout
+        startTime = time.time()
+        try:
+            worker = self.__idle.get(timeout=timeout)
+        except queue.Empty as e:
+            raise CactvsError("no csts interpreter available") from e
+        try:
+            if (worker is None) or (not worker.isAlive()):
+                worker = _CactvsWorker(self.__cactvsDir)
+            ok, text = worker.layout(sdf, hflag, max(timeout - (time.time() - startTime), 0.1))
+        except:  # noqa: E722 pylint: disable=bare-except
+            if worker is not None:
+                worker.close()
+            self.__idle.put(None)
+            raise
+        if worker.calls >= self.__maxCalls:
+            worker.close()
+            worker = None
+        self.__idle.put(worker)
+        if self.__verbose:
+            self.__lfh.write("+CactvsPool.layout() completed in %.3f seconds\n" % (time.time() - startTime))
+        if not ok:
+            raise CactvsError(text)
+        return text
+
+    def layoutMany(self, sdfList, hflag=False, timeout=None):
+        """Return the 2D laid out SDF of each molfile of sdfList in order, spreading them over the
+        interpreters of the pool.  Records that fail are returned as None.
+        """
+        if not sdfList:
+            return []
+        startTime = time.time()
+        executor = ThreadPoolExecutor(max_workers=min(self.__workers, len(sdfList)))
+        try:
+            futureList = [executor.submit(self.layout, sdf, hflag, timeout) for sdf in sdfList]
+            resultList = []
+            for future in futureList:
+                try:
+                    resultList.append(future.result())
+                except (CactvsError, OSError) as e:
+                    self.__lfh.write("+CactvsPool.layoutMany() record %d failed: %s\n" % (len(resultList), str(e)))
+                    resultList.append(None)
+        finally:
+            executor.shutdown(wait=True)
+        if self.__verbose:
+            self.__lfh.write("+CactvsPool.layoutMany() %d records completed in %.3f seconds\n" % (len(sdfList), time.time() - startTime))
+        return resultList
+
+    def shutdown(self):
+        """Stop the idle interpreters"""
+        workerList = []
+        while True:
+            try:
+                workerList.append(self.__idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workerList:
+            if worker is not None:
+                worker.close()
+            self.__idle.put(None)
+
+
+def getCactvsPool(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide CactvsPool for siteId"""
+    cactvsDir = getSiteConfig(siteId).cICommon.get_site_cc_cactvs_dir()
+    pool = _poolD.get(cactvsDir)
+    if pool is None:
+        with _poolLock:
+            pool = _poolD.get(cactvsDir)
+            if pool is None:
+                pool = CactvsPool(cactvsDir, verbose=verbose, log=log)
+                _poolD[cactvsDir] = pool
+    return pool
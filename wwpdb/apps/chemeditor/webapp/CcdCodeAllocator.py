@@ -0,0 +1,365 @@
+##
+# File:  CcdCodeAllocator.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Allocation of new chemical component ids from the unused code pool.
+
+The pool file (one id per line) is treated as append-only: ids are never rewritten, a sidecar
+state file records the byte offset of the next unread id, the number of ids left and the
+signature of the pool file.  Allocating an id reads one line and advances the offset under an
+exclusive fcntl lock, so concurrent requests in any process never hand out the same id.
+
+Appending ids to the pool (or touching it) keeps the offset.  A pool file that is replaced (new
+inode), truncated (smaller size) or whose bytes just before the offset no longer hold the last id
+handed out is served again from the start.  replacePool() swaps
+in a pre-validated pool (see CcdCodePoolValidator) without losing allocations made meanwhile.
+
+With CcdSiteCodeAllocator each wwPDB site serves only the ids that ChemCompHash.getChemCompIdSite
+assigns to it, from its own partition of the pool, so sites allocating at the same time never
+collide and never skip over ids of other sites.  Partitions are rebalanced only from the curated
+pool: ids appended to the shared pool are moved to the partitions of their sites, and no ids are
+ever added that were not curated into the pool.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.09"
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import traceback
+
+from wwpdb.apps.chemeditor.webapp.ChemCompHash import ChemCompHash
+from wwpdb.apps.chemeditor.webapp.FileLock import FileLock
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Sites sharing the id space, in ChemCompHash.getChemCompIdSite order
+SITES = ["RCSB", "PDBE", "PDBJ"]
+# Number of pool file bytes before the offset checked to detect a rewritten pool
+TAIL_BYTES = 64
+
+_allocatorD = {}
+_allocatorLock = threading.Lock()
+
+
+class CcdCodeAllocator:
+    """Hand out the ids of the pool file poolFilePath in order.
+
+    isTaken is an optional callable; ids for which it returns True are consumed without
+    being returned.  It must not be expensive: it is called while the pool is locked.
+    """
+
+    def __init__(self, poolFilePath, isTaken=None, verbose=False, log=sys.stderr):
+        self.__poolFilePath = poolFilePath
+        self.__stateFilePath = poolFilePath + ".offset"
+        self.__lockFilePath = poolFilePath + ".lock"
+        self.__isTaken = isTaken
+        self.__verbose = verbose
+        self.__lfh = log
+
+    @property
+    def poolFilePath(self):
+        return self.__poolFilePath
+
+    def allocate(self, count=1, allOrNothing=False):
+        """Take count ids from the pool in one locked transaction.
+
+        :Returns:
+            (codeList, preSize, postSize) - the allocated ids (fewer than count if the pool
+            ran out, none in that case with allOrNothing) and the number of ids left in the
+            pool before and after the allocation
+        """
+        with self.__poolLock():
+            stateD = self.__getState()
+            preSize = stateD["remaining"]
+            codeList = []
+            ifh = open(self.__poolFilePath, "rb")
+            try:
+                ifh.seek(stateD["offset"])
+                while len(codeList) < count:
+                    line = ifh.readline()
+                    if not line:
+                        break
+                    ccId = line.decode("ascii", "ignore").strip()
+                    if not ccId:
+                        continue
+                    stateD["remaining"] = max(stateD["remaining"] - 1, 0)
+                    if (self.__isTaken is not None) and self.__isTaken(ccId):
+                        self.__lfh.write("+CcdCodeAllocator.allocate() skipping taken code %s\n" % ccId)
+                        continue
+                    codeList.append(ccId)
+                stateD["offset"] = ifh.tell()
+                stateD["tail"] = self.__readTail(ifh, stateD["offset"])
+            finally:
+                ifh.close()
+            if allOrNothing and (len(codeList) < count):
+                return [], preSize, preSize
+            self.__writeState(stateD)
+            return codeList, preSize, stateD["remaining"]
+
+    def getRemaining(self):
+        """Return the number of ids left in the pool"""
+        with self.__poolLock():
+            stateD = self.__getState()
+            self.__writeState(stateD)
+            return stateD["remaining"]
+
+    def getPendingIds(self):
+        """Return the ids left in the pool, in allocation order"""
+        with self.__poolLock():
+            stateD = self.__getState()
+            self.__writeState(stateD)
+            return self.__readIds(stateD["offset"])
+
+    def getPoolIds(self):
+        """Return all ids of the pool file, allocated or not"""
+        with self.__poolLock():
+            return self.__readIds(0)
+
+    def replacePool(self, idList, snapshotList=None):
+        """Replace the pool with the ids of idList that are still unallocated, keeping their order.
+
+        Ids allocated since idList was read from the pool are dropped.  If snapshotList, the pending
+        ids from which idList was selected, is given, ids added to the pool after the snapshot was
+        read are kept after those of idList.  The pool file is replaced atomically and served from its start.
+
+        :Returns:
+            number of ids in the new pool
+        """
+        with self.__poolLock():
+            pendingList = self.__readIds(self.__getState()["offset"])
+            pendingD = dict.fromkeys(pendingList, True)
+            keepList = [ccId for ccId in idList if pendingD.pop(ccId, False)]
+            if snapshotList is not None:
+                snapshotD = dict.fromkeys(snapshotList, True)
+                keepList.extend([ccId for ccId in pendingList if pendingD.pop(ccId, False) and (ccId not in snapshotD)])
+            fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(self.__poolFilePath), prefix=".tmp_")
+            ofh = os.fdopen(fd, "w")
+            ofh.write("".join(ccId + "\n" for ccId in keepList))
+            ofh.flush()
+            os.fsync(ofh.fileno())
+            ofh.close()
+            os.chmod(tmpPath, 0o664)
+            os.replace(tmpPath, self.__poolFilePath)
+            st = os.stat(self.__poolFilePath)
+            self.__writeState(
+                {
+                    "offset": 0,
+                    "tail": "",
+                    "remaining": len(keepList),
+                    "ino": st.st_ino,
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                }
+            )
+            return len(keepList)
+
+    def extendPool(self, idList):
+        """Append the ids of idList to the pool"""
+        if not idList:
+            return
+        with self.__poolLock():
+            ofh = open(self.__poolFilePath, "a")
+            ofh.write("".join(ccId + "\n" for ccId in idList))
+            ofh.flush()
+            os.fsync(ofh.fileno())
+            ofh.close()
+
+    def __poolLock(self):
+        return FileLock(self.__lockFilePath)
+
+    def __getState(self):
+        """Return the pool state, reconciled with the current pool file.  Must be called with the lock held."""
+        st = os.stat(self.__poolFilePath)
+        stateD = None
+        if os.access(self.__stateFilePath, os.R_OK):
+            try:
+                ifh = open(self.__stateFilePath)
+                stateD = json.load(ifh)
+                ifh.close()
+            except ValueError:
+                stateD = None
+        # ids before the offset may already be handed out, so it is only reset if the pool file has been
+        # replaced, has shrunk or no longer holds the last handed out id just before the offset
+        if stateD and (stateD["ino"] == st.st_ino) and (stateD["size"] <= st.st_size) and self.__hasTail(stateD):
+            if stateD["size"] < st.st_size:
+                # ids appended to the pool
+                stateD["remaining"] += self.__countIds(stateD["size"])
+            stateD.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            return stateD
+        self.__lfh.write("+CcdCodeAllocator() indexing pool file %s\n" % self.__poolFilePath)
+        return {
+            "offset": 0,
+            "tail": "",
+            "remaining": self.__countIds(0),
+            "ino": st.st_ino,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+
+    def __readTail(self, ifh, offset):
+        """Return up to TAIL_BYTES bytes of the pool file before byte offset"""
+        start = max(offset - TAIL_BYTES, 0)
+        ifh.seek(start)
+        return ifh.read(offset - start).decode("latin-1")
+
+    def __hasTail(self, stateD):
+        """Return True if the pool file still holds the recorded tail just before the recorded offset"""
+        tail = stateD.get("tail")
+        if tail is None:
+            # state written before tails were recorded
+            return True
+        if not tail:
+            return stateD["offset"] == 0
+        ifh = open(self.__poolFilePath, "rb")
+        try:
+            return self.__readTail(ifh, stateD["offset"]) == tail
+        finally:
+            ifh.close()
+
+    def __readIds(self, offset):
+        """Return the ids in the pool file after byte offset"""
+        ifh = open(self.__poolFilePath, "rb")
+        ifh.seek(offset)
+        idList = [line.decode("ascii", "ignore").strip() for line in ifh if line.strip()]
+        ifh.close()
+        return idList
+
+    def __countIds(self, offset):
+        """Return the number of ids in the pool file after byte offset"""
+        count = 0
+        ifh = open(self.__poolFilePath, "rb")
+        ifh.seek(offset)
+        for line in ifh:
+            if line.strip():
+                count += 1
+        ifh.close()
+        return count
+
+    def __writeState(self, stateD):
+        fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(self.__stateFilePath), prefix=".tmp_")
+        ofh = os.fdopen(fd, "w")
+        json.dump(stateD, ofh)
+        ofh.flush()
+        os.fsync(ofh.fileno())
+        ofh.close()
+        os.replace(tmpPath, self.__stateFilePath)
+
+
+class CcdSiteCodeAllocator:
+    """Allocate the ids of the pool file poolFilePath that ChemCompHash.getChemCompIdSite assigns to site.
+
+    The partition of each site is kept in its own pool file, <poolFilePath>.<site>.  Ids appended
+    to the shared pool are moved into the partitions of their sites before each allocation, each
+    partition under its own lock, so the size of the partition is the number of curated ids left
+    for the site.
+    """
+
+    def __init__(
+        self,
+        poolFilePath,
+        site,
+        sites=None,
+        isTaken=None,
+        verbose=False,
+        log=sys.stderr,
+    ):
+        self.__site = site
+        self.__sites = sites if sites is not None else SITES
+        self.__lfh = log
+        self.__cCH = ChemCompHash()
+        self.__poolAllocator = CcdCodeAllocator(poolFilePath, verbose=verbose, log=log)
+        partitionFilePath = "%s.%s" % (poolFilePath, site)
+        if not os.access(partitionFilePath, os.F_OK):
+            open(partitionFilePath, "a").close()
+        self.__siteAllocator = CcdCodeAllocator(partitionFilePath, isTaken=isTaken, verbose=verbose, log=log)
+        # partitions of the other sites are only extended here; they are allocated by their own site
+        self.__partitionD = {otherSite: CcdCodeAllocator("%s.%s" % (poolFilePath, otherSite), verbose=verbose, log=log) for otherSite in self.__sites}
+        self.__partitionD[site] = self.__siteAllocator
+
+    def allocate(self, count=1, allOrNothing=False):
+        """Take count ids from the site partition.
+
+        :Returns:
+            (codeList, preSize, postSize) - preSize and postSize are the numbers of curated ids
+            left for the site before and after the allocation
+        """
+        self.__feed()
+        return self.__siteAllocator.allocate(count=count, allOrNothing=allOrNothing)
+
+    def getRemaining(self):
+        self.__feed()
+        return self.__siteAllocator.getRemaining()
+
+    def getPendingIds(self):
+        self.__feed()
+        return self.__siteAllocator.getPendingIds()
+
+    def replacePool(self, idList, snapshotList=None):
+        return self.__siteAllocator.replacePool(idList, snapshotList=snapshotList)
+
+    def __feed(self):
+        """Move the ids pending in the shared pool into the partitions of their sites"""
+        if os.access(self.__poolAllocator.poolFilePath, os.F_OK) and self.__poolAllocator.getRemaining():
+            idList = self.__poolAllocator.allocate(count=sys.maxsize)[0]
+            siteIdD = {}
+            for ccId in idList:
+                siteIdD.setdefault(self.__getSite(ccId), []).append(ccId)
+            for site, allocator in self.__partitionD.items():
+                allocator.extendPool(siteIdD.get(site))
+            self.__lfh.write(
+                "+CcdSiteCodeAllocator() moved %d pool ids to the site partitions (%s), dropped %d ids of no site\n"
+                % (len(idList), ", ".join("%s %d" % (site, len(siteIdD.get(site, []))) for site in self.__sites), len(siteIdD.get(None, [])))
+            )
+
+    def __getSite(self, ccId):
+        try:
+            return self.__cCH.getChemCompIdSite(ccId, sites=self.__sites)
+        except ValueError:
+            return None
+
+
+def isInSandbox(crpi, ccId, log=sys.stderr):
+    """Return True if the component file of ccId is in the local sandbox.  An id whose sandbox path
+    cannot be resolved cannot be checked and is reported as taken, so that it is skipped.
+    """
+    try:
+        return os.access(crpi.getFilePath(ccId, "CC"), os.F_OK)
+    except:  # noqa: E722 pylint: disable=bare-except
+        log.write("+isInSandbox() cannot resolve the sandbox path of %s - skipping it\n" % ccId)
+        traceback.print_exc(file=log)
+        return True
+
+
+def getCcdCodeAllocator(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide allocator of the unused code pool of siteId.
+
+    If the site configuration sets SITE_CCD_CODE_PARTITION, a CcdSiteCodeAllocator serving only the
+    ids of the site (SITE_NAME) is returned; otherwise a CcdCodeAllocator over the whole pool.  Ids
+    whose component file is already in the local sandbox are skipped; the CVS repository is not consulted.
+    """
+    siteConfig = getSiteConfig(siteId)
+    poolFilePath = siteConfig.cIAppCc.get_unused_ccd_file()
+    allocator = _allocatorD.get(poolFilePath)
+    if allocator is None:
+        with _allocatorLock:
+            allocator = _allocatorD.get(poolFilePath)
+            if allocator is None:
+                crpi = siteConfig.crpi
+
+                def isTaken(ccId):
+                    return isInSandbox(crpi, ccId, log=log)
+
+                site = str(siteConfig.cI.get("SITE_NAME", "")).upper()
+                if siteConfig.cI.get("SITE_CCD_CODE_PARTITION") and (site in SITES):
+                    allocator = CcdSiteCodeAllocator(poolFilePath, site, isTaken=isTaken, verbose=verbose, log=log)
+                else:
+                    allocator = CcdCodeAllocator(poolFilePath, isTaken=isTaken, verbose=verbose, log=log)
+                _allocatorD[poolFilePath] = allocator
+    return allocator
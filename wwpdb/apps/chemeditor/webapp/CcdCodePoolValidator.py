@@ -0,0 +1,151 @@
+##
+# File:  CcdCodePoolValidator.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Offline validation of the unused chemical component code pool.
+
+All ids left in the pool are checked against the CVS repository in bulk: the sandbox hash
+directories holding the candidates are brought up to date from CVS one after the other (one
+checkout per hash directory instead of one per candidate; checkouts into the same sandbox would
+race on its CVS administrative files), and the candidates are then checked against the sandbox
+in parallel.  Taken ids are recorded in <pool file>.taken and the pool is replaced with the ids that
+are still free, so that allocation (CcdCodeAllocator) never meets a dead code.  Ids whose hash
+directory could not be checked out cannot be validated: they are removed from the pool as well and
+recorded in <pool file>.unchecked, from which they can be appended to the pool again.  Ids added
+to the pool while the validation runs are kept.
+
+Run it periodically, or after appending ids to the pool, with:
+
+    python -m wwpdb.apps.chemeditor.webapp.CcdCodePoolValidator --siteid <siteId>
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from wwpdb.io.cvs.CvsAdmin import CvsSandBoxAdmin
+
+from wwpdb.apps.chemeditor.webapp.CcdCodeAllocator import getCcdCodeAllocator
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Number of concurrent sandbox checks
+DEFAULT_WORKERS = 8
+
+
+class CcdCodePoolValidator:
+    """Remove the ids that already exist in the chemical component dictionary from the unused code pool of siteId."""
+
+    def __init__(self, siteId, workers=DEFAULT_WORKERS, updateCvs=True, verbose=False, log=sys.stderr):
+        self.__siteId = siteId
+        self.__siteConfig = getSiteConfig(siteId)
+        self.__workers = workers
+        self.__updateCvs = updateCvs
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__crpi = self.__siteConfig.crpi
+        self.__allocator = getCcdCodeAllocator(siteId, verbose=verbose, log=log)
+
+    def run(self):
+        """Validate the pool.
+
+        :Returns:
+            (number of free ids kept in the pool, list of taken ids removed)
+        """
+        startTime = time.time()
+        snapshotList = self.__allocator.getPendingIds()
+        uncheckedD = self.__updateSandbox(snapshotList) if self.__updateCvs else {}
+        idList = [ccId for ccId in snapshotList if ccId not in uncheckedD]
+        uncheckedList = [ccId for ccId in snapshotList if ccId in uncheckedD]
+        executor = ThreadPoolExecutor(max_workers=self.__workers)
+        try:
+            takenList = [ccId for ccId, taken in zip(idList, executor.map(self.__isTaken, idList)) if taken]
+        finally:
+            executor.shutdown(wait=True)
+        takenD = dict.fromkeys(takenList, True)
+        freeCount = self.__allocator.replacePool([ccId for ccId in idList if ccId not in takenD], snapshotList=snapshotList)
+        self.__writeIdList(".taken", takenList)
+        self.__writeIdList(".unchecked", uncheckedList)
+        self.__lfh.write(
+            "+CcdCodePoolValidator.run() checked %d ids, removed %d taken and %d unchecked, %d free in %.2f seconds\n"
+            % (len(idList), len(takenList), len(uncheckedList), freeCount, time.time() - startTime)
+        )
+        return freeCount, takenList
+
+    def __isTaken(self, ccId):
+        return os.access(self.__crpi.getFilePath(ccId, "CC"), os.F_OK)
+
+    def __updateSandbox(self, idList):
+        """Check out from CVS the sandbox hash directories of the ids in idList.
+
+        :Returns:
+            dictionary of the ids whose hash directory could not be checked out or resolved
+        """
+        projectPathD = {}
+        for ccId in idList:
+            projectName, relPath = self.__crpi.getCvsProjectInfo(ccId, "CC")
+            projectPath = os.path.join(projectName, os.path.dirname(os.path.dirname(relPath))) if (projectName and relPath) else None
+            projectPathD.setdefault(projectPath, []).append(ccId)
+        uncheckedD = dict.fromkeys(projectPathD.pop(None, []), True)
+        # checkouts share the sandbox and its CVS/ administrative files, so they are not run concurrently
+        okCount = 0
+        for projectPath in sorted(projectPathD):
+            if self.__checkOut(projectPath):
+                okCount += 1
+            else:
+                uncheckedD.update((ccId, True) for ccId in projectPathD[projectPath])
+        self.__lfh.write("+CcdCodePoolValidator.__updateSandbox() checked out %d of %d hash directories\n" % (okCount, len(projectPathD)))
+        return uncheckedD
+
+    def __writeIdList(self, suffix, idList):
+        """Append the ids of idList with a time stamp to <pool file><suffix>"""
+        if not idList:
+            return
+        ofh = open(self.__siteConfig.cIAppCc.get_unused_ccd_file() + suffix, "a")
+        ofh.write("".join("%s %s\n" % (time.strftime("%Y-%m-%d %H:%M:%S"), ccId) for ccId in idList))
+        ofh.close()
+
+    def __checkOut(self, projectPath):
+        """Check out projectPath with a private CVS working area"""
+        cI = self.__siteConfig.cI
+        tmpPath = tempfile.mkdtemp(dir=self.__siteConfig.getCachePath("ccd_code_pool"), prefix="cvs_")
+        try:
+            cvs = CvsSandBoxAdmin(tmpPath=tmpPath, verbose=self.__verbose, log=self.__lfh)
+            cvs.setRepositoryPath(host=cI.get("SITE_REFDATA_CVS_HOST"), path=cI.get("SITE_REFDATA_CVS_PATH"))
+            cvs.setAuthInfo(user=cI.get("SITE_REFDATA_CVS_USER"), password=cI.get("SITE_REFDATA_CVS_PASSWORD"))
+            cvs.setSandBoxTopPath(self.__siteConfig.cIAppCc.get_site_refdata_top_cvs_sb_path())
+            ok, _text = cvs.checkOut(projectPath)
+            cvs.cleanup()
+            return ok
+        except:  # noqa: E722 pylint: disable=bare-except
+            self.__lfh.write("+CcdCodePoolValidator.__checkOut() failed for %s\n" % projectPath)
+            traceback.print_exc(file=self.__lfh)
+            return False
+        finally:
+            shutil.rmtree(tmpPath, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove taken ids from the unused chemical component code pool")
+    parser.add_argument("--siteid", default=os.getenv("WWPDB_SITE_ID"), help="wwPDB site id")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of concurrent sandbox checks")
+    parser.add_argument("--no_cvs_update", action="store_true", help="check the sandbox without updating it from CVS")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    validator = CcdCodePoolValidator(args.siteid, workers=args.workers, updateCvs=not args.no_cvs_update, verbose=args.verbose)
+    validator.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+##
+# File:  CcdFingerprintIndex.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Screening index over the chemical component dictionary.
+
+One NumPy record per component holds the heavy-atom element count vector, formula, heavy-atom
+count, ring count and a packed hashed circular fingerprint derived from chem_comp_atom and
+chem_comp_bond.  The records are stored in a single .npy file which is memory mapped by every
+worker process.  The index is used to screen candidates by composition and to rank components
+by Tanimoto similarity.  It is built (and refreshed incrementally by file modification time) from
+the CVS sandbox with a pool of processes, and updated in place when a component is committed.
+isFresh() compares the recorded modification time of every component with its sandbox file.
+
+Build or refresh the index of a site with:
+
+    python -m wwpdb.apps.chemeditor.webapp.CcdFingerprintIndex <siteId>
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import (
+    getSandboxFileTimes,
+    iterSandboxFiles,
+)
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import (
+    getAtomGraph,
+    getFingerprintBits,
+    getRingCount,
+    readCifFile,
+)
+from wwpdb.apps.chemeditor.webapp.FileLock import FileLock
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Elements with their own position in the element count vector; all others are counted in the last position
+ELEMENTS = ("C", "N", "O", "S", "P", "F", "CL", "BR", "I", "B", "SE", "SI", "FE", "ZN", "CU")
+ELEMENTS += ("MG", "CO", "NI", "MN", "CA", "NA", "K", "PT", "RU", "HG", "AS", "W", "MO", "V", "AL")
+FINGERPRINT_BITS = 1024
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("id", "U5"),
+        ("formula", "U64"),
+        ("counts", "i2", (len(ELEMENTS) + 1,)),
+        ("heavy", "i2"),
+        ("rings", "i2"),
+        ("fp", "u1", (FINGERPRINT_BITS // 8,)),
+        ("mtime", "f8"),
+    ]
+)
+
+# Number of fingerprint rows compared at once in similarity searches
+SIMILARITY_BATCH_SIZE = 8192
+
+# Number of set bits of each byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.uint8)
+
+_elementIndexD = {element: idx for idx, element in enumerate(ELEMENTS)}
+
+_indexD = {}
+_indexLock = threading.Lock()
+
+
+def getRecord(ccId, containerObj, mtime=0.0):
+    """Return the index record of the chemical component definition containerObj"""
+    record = np.zeros((), dtype=RECORD_DTYPE)
+    atomList, bondList = getAtomGraph(containerObj)
+    record["id"] = ccId.upper()
+    compCat = containerObj.getObj("chem_comp")
+    if compCat and compCat.hasAttribute("formula"):
+        formula = str(compCat.getValue("formula", 0))
+        record["formula"] = formula if formula not in ("?", ".") else ""
+    for atom in atomList:
+        record["counts"][_elementIndexD.get(atom[1], len(ELEMENTS))] += 1
+    record["heavy"] = len(atomList)
+    record["rings"] = getRingCount(atomList, bondList)
+    bitArray = np.zeros(FINGERPRINT_BITS, dtype=np.uint8)
+    bitArray[getFingerprintBits(atomList, bondList, nBits=FINGERPRINT_BITS)] = 1
+    record["fp"] = np.packbits(bitArray)
+    record["mtime"] = mtime
+    return record
+
+
+def _readFileRecord(args):
+    """Worker function: return the index record of a sandbox file, or None if it cannot be read"""
+    ccId, filePath, mtime = args
+    try:
+        return getRecord(ccId, readCifFile(filePath)[0], mtime=mtime)
+    except:  # noqa: E722 pylint: disable=bare-except
+        return None
+
+
+class CcdFingerprintIndex:
+    """Memory mapped array of RECORD_DTYPE records stored in indexFilePath."""
+
+    def __init__(self, indexFilePath, verbose=False, log=sys.stderr):
+        self.__indexFilePath = indexFilePath
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__data = None
+        self.__signature = None
+
+    def getData(self):
+        """Return the read-only memory mapped record array, or None if the index has not been built"""
+        try:
+            st = os.stat(self.__indexFilePath)
+            signature = (st.st_ino, st.st_mtime, st.st_size)
+        except OSError:
+            return None
+        with self.__lock:
+            if signature != self.__signature:
+                self.__data = np.load(self.__indexFilePath, mmap_mode="r")
+                self.__signature = signature
+            return self.__data
+
+    def getBuildTime(self):
+        """Return the start time of the last refresh of the index, or None if the index has not been built"""
+        try:
+            return os.stat(self.__indexFilePath).st_mtime
+        except OSError:
+            return None
+
+    def isFresh(self, ccCvsPath):
+        """Return True if the index holds a record of every component file of the sandbox ccCvsPath, with the
+        modification time of the file, i.e. no component has been added, removed or edited since it was indexed.
+        This costs one stat() per component, which is far less than a matchComp run.
+        """
+        data = self.getData()
+        if data is None:
+            return False
+        fileTimeD = getSandboxFileTimes(ccCvsPath)
+        if (not fileTimeD) or (len(fileTimeD) != len(data)):
+            return False
+        for ccId, mtime in zip(data["id"].tolist(), data["mtime"].tolist()):
+            if fileTimeD.get(ccId) != mtime:
+                return False
+        return True
+
+    def shortlist(self, containerObj, maxExtraAtoms=0):
+        """Return the ids of the components whose heavy-atom composition can match containerObj.
+
+        A candidate is kept if it has at most maxExtraAtoms heavy atoms more than the query in total
+        over all elements; with maxExtraAtoms=0 candidates must also have the same heavy-atom and ring
+        counts.  Returns None if the index is not available.
+        """
+        data = self.getData()
+        if data is None:
+            return None
+        query = getRecord("", containerObj)
+        excess = np.maximum(data["counts"] - query["counts"], 0).sum(axis=1)
+        mask = excess <= maxExtraAtoms
+        if maxExtraAtoms == 0:
+            mask &= (data["heavy"] == query["heavy"]) & (data["rings"] == query["rings"])
+        return data["id"][mask].tolist()
+
+    def similarity(self, containerObj, topK=15):
+        """Rank all components by Tanimoto similarity of their fingerprint to containerObj.
+
+        :Returns:
+            list of up to topK (ccId, similarity) tuples in decreasing order of similarity,
+            or None if the index is not available
+        """
+        data = self.getData()
+        if data is None:
+            return None
+        queryFp = getRecord("", containerObj)["fp"]
+        queryCount = int(_POPCOUNT[queryFp].sum())
+        fpMatrix = data["fp"]
+        scoreArray = np.zeros(len(data), dtype=np.float32)
+        for start in range(0, len(data), SIMILARITY_BATCH_SIZE):
+            fpBatch = fpMatrix[start : start + SIMILARITY_BATCH_SIZE]
+            common = _POPCOUNT[fpBatch & queryFp].sum(axis=1, dtype=np.int32)
+            union = _POPCOUNT[fpBatch].sum(axis=1, dtype=np.int32) + queryCount - common
+            scoreArray[start : start + len(fpBatch)] = common / np.maximum(union, 1)
+        topK = min(topK, len(data))
+        if topK <= 0:
+            return []
+        idxArray = np.argpartition(-scoreArray, topK - 1)[:topK]
+        idxArray = idxArray[np.argsort(-scoreArray[idxArray], kind="stable")]
+        return [(str(data["id"][idx]), float(scoreArray[idx])) for idx in idxArray]
+
+    def update(self, ccId, containerObj, mtime=0.0):
+        """Add or replace the record of ccId.  Nothing is done if the index has not been built."""
+        if not os.access(self.__indexFilePath, os.F_OK):
+            return False
+        record = getRecord(ccId, containerObj, mtime=mtime)
+        with self.__writeLock():
+            data = np.load(self.__indexFilePath)
+            idxList = np.flatnonzero(data["id"] == record["id"])
+            if len(idxList) > 0:
+                data[idxList[0]] = record
+            else:
+                data = np.append(data, record.reshape(1))
+            # an update does not bring the rest of the index up to date with the sandbox
+            self.__save(data, self.getBuildTime())
+        return True
+
+    def refresh(self, ccCvsPath, processes=None):
+        """Build the index from the sandbox ccCvsPath, re-reading only files modified since the last build.
+
+        :Returns:
+            number of files read
+        """
+        startTime = time.time()
+        with self.__writeLock():
+            recordD = {}
+            if os.access(self.__indexFilePath, os.F_OK):
+                for record in np.load(self.__indexFilePath):
+                    recordD[str(record["id"])] = record
+            taskList = []
+            seenD = {}
+            for ccId, filePath, mtime in iterSandboxFiles(ccCvsPath):
+                seenD[ccId] = True
+                if (ccId in recordD) and (recordD[ccId]["mtime"] == mtime):
+                    continue
+                taskList.append((ccId, filePath, mtime))
+            if taskList:
+                pool = multiprocessing.Pool(processes=processes)
+                try:
+                    for record in pool.imap_unordered(_readFileRecord, taskList, chunksize=64):
+                        if record is not None:
+                            recordD[str(record["id"])] = record
+                finally:
+                    pool.close()
+                    pool.join()
+            data = np.array([recordD[ccId] for ccId in sorted(recordD) if ccId in seenD], dtype=RECORD_DTYPE)
+            self.__save(data, startTime)
+        self.__lfh.write("+CcdFingerprintIndex.refresh() %d components, read %d files in %.2f seconds\n" % (len(data), len(taskList), time.time() - startTime))
+        return len(taskList)
+
+    def __save(self, data, buildTime):
+        """Atomically replace the index file.  The modification time of the file records buildTime."""
+        fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(self.__indexFilePath), prefix=".tmp_", suffix=".npy")
+        ofh = os.fdopen(fd, "wb")
+        np.save(ofh, data)
+        ofh.close()
+        os.utime(tmpPath, (buildTime, buildTime))
+        os.replace(tmpPath, self.__indexFilePath)
+
+    def __writeLock(self):
+        return FileLock(self.__indexFilePath + ".lock")
+
+
+def getCcdFingerprintIndex(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide CcdFingerprintIndex for siteId"""
+    indexFilePath = os.path.join(getSiteConfig(siteId).getCachePath("ccd_fingerprint"), "ccd_fingerprint.npy")
+    index = _indexD.get(indexFilePath)
+    if index is None:
+        with _indexLock:
+            index = _indexD.get(indexFilePath)
+            if index is None:
+                index = CcdFingerprintIndex(indexFilePath, verbose=verbose, log=log)
+                _indexD[indexFilePath] = index
+    return index
+
+
+if __name__ == "__main__":
+    siteId_ = sys.argv[1] if len(sys.argv) > 1 else os.getenv("WWPDB_SITE_ID")
+    getCcdFingerprintIndex(siteId_).refresh(getSiteConfig(siteId_).cIAppCc.get_site_cc_cvs_path())
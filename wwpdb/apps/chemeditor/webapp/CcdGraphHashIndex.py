@@ -0,0 +1,162 @@
+##
+# File:  CcdGraphHashIndex.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+SQLite map of graph hash -> chemical component ids.
+
+Every sandbox component is keyed by the Weisfeiler-Lehman graph hash of its atoms, bonds, charges
+and stereo flags (see ChemCompStructure.getGraphHash).  Identical graphs have the same hash, so a
+definition whose hash is not in an up-to-date map has no exact duplicate; the hash is not canonical,
+so the ids found for a hash are only candidates which must be confirmed by matchComp.  The map is
+built (and refreshed incrementally by file modification time) with a pool of processes and updated
+after each commit.
+
+Build or refresh the map of a site with:
+
+    python -m wwpdb.apps.chemeditor.webapp.CcdGraphHashIndex <siteId>
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import (
+    getSandboxFileTimes,
+    iterSandboxFiles,
+)
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import (
+    getAtomGraph,
+    getGraphHash,
+    readCifFile,
+)
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+_indexD = {}
+_indexLock = threading.Lock()
+
+
+def getContainerGraphHash(containerObj):
+    """Return the graph hash of the chemical component definition containerObj, hydrogen atoms included"""
+    atomList, bondList = getAtomGraph(containerObj, heavyOnly=False)
+    return getGraphHash(atomList, bondList)
+
+
+def _readFileHash(args):
+    """Worker function: return (ccId, graph hash, mtime) of a sandbox file, or None if it cannot be read"""
+    ccId, filePath, mtime = args
+    try:
+        return ccId, getContainerGraphHash(readCifFile(filePath)[0]), mtime
+    except:  # noqa: E722 pylint: disable=bare-except
+        return None
+
+
+class CcdGraphHashIndex:
+    """graph hash -> ids map of the components in ccCvsPath stored in the SQLite database dbPath."""
+
+    def __init__(self, dbPath, ccCvsPath, verbose=False, log=sys.stderr):
+        self.__dbPath = dbPath
+        self.__ccCvsPath = ccCvsPath
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__con = sqlite3.connect(dbPath, timeout=30.0, check_same_thread=False)
+        with self.__lock:
+            self.__con.execute("PRAGMA journal_mode=WAL")
+            self.__con.execute("CREATE TABLE IF NOT EXISTS ccd_graph_hash (comp_id TEXT PRIMARY KEY, graph_hash TEXT, mtime REAL)")
+            self.__con.execute("CREATE INDEX IF NOT EXISTS ccd_graph_hash_idx ON ccd_graph_hash (graph_hash)")
+            self.__con.commit()
+
+    def getCount(self):
+        """Return the number of indexed components"""
+        with self.__lock:
+            return self.__con.execute("SELECT COUNT(*) FROM ccd_graph_hash").fetchone()[0]
+
+    def isFresh(self):
+        """Return True if the map holds an entry of every component file of the sandbox, with the
+        modification time of the file, i.e. no component has been added, removed or edited since it was hashed
+        """
+        fileTimeD = getSandboxFileTimes(self.__ccCvsPath)
+        with self.__lock:
+            indexedD = {row[0]: row[1] for row in self.__con.execute("SELECT comp_id, mtime FROM ccd_graph_hash")}
+        return bool(fileTimeD) and (indexedD == fileTimeD)
+
+    def lookup(self, graphHash):
+        """Return the sorted ids of the components with graph hash graphHash"""
+        if not graphHash:
+            return []
+        with self.__lock:
+            rowList = self.__con.execute("SELECT comp_id FROM ccd_graph_hash WHERE graph_hash = ? ORDER BY comp_id", (graphHash,)).fetchall()
+        return [row[0] for row in rowList]
+
+    def findDuplicates(self, containerObj):
+        """Return the ids of the indexed components with the same graph hash as containerObj (duplicate candidates)"""
+        return self.lookup(getContainerGraphHash(containerObj))
+
+    def update(self, ccId, containerObj, mtime=0.0):
+        """Add or replace the graph hash of ccId"""
+        with self.__lock:
+            self.__con.execute(
+                "INSERT OR REPLACE INTO ccd_graph_hash (comp_id, graph_hash, mtime) VALUES (?, ?, ?)",
+                (ccId.upper(), getContainerGraphHash(containerObj), mtime),
+            )
+            self.__con.commit()
+
+    def refresh(self, processes=None):
+        """Walk the sandbox and hash new or modified component files in parallel.  Entries of removed files are dropped.
+
+        :Returns:
+            number of files read
+        """
+        startTime = time.time()
+        with self.__lock:
+            indexedD = {row[0]: row[1] for row in self.__con.execute("SELECT comp_id, mtime FROM ccd_graph_hash")}
+        taskList = []
+        seenD = {}
+        for ccId, filePath, mtime in iterSandboxFiles(self.__ccCvsPath):
+            seenD[ccId] = True
+            if indexedD.get(ccId) != mtime:
+                taskList.append((ccId, filePath, mtime))
+        rowList = []
+        if taskList:
+            pool = multiprocessing.Pool(processes=processes)
+            try:
+                rowList = [row for row in pool.imap_unordered(_readFileHash, taskList, chunksize=64) if row is not None]
+            finally:
+                pool.close()
+                pool.join()
+        removedList = [(ccId,) for ccId in indexedD if ccId not in seenD]
+        with self.__lock:
+            self.__con.executemany("INSERT OR REPLACE INTO ccd_graph_hash (comp_id, graph_hash, mtime) VALUES (?, ?, ?)", rowList)
+            self.__con.executemany("DELETE FROM ccd_graph_hash WHERE comp_id = ?", removedList)
+            self.__con.commit()
+        self.__lfh.write("+CcdGraphHashIndex.refresh() hashed %d files, removed %d entries in %.2f seconds\n" % (len(rowList), len(removedList), time.time() - startTime))
+        return len(rowList)
+
+
+def getCcdGraphHashIndex(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide CcdGraphHashIndex for siteId"""
+    siteConfig = getSiteConfig(siteId)
+    dbPath = os.path.join(siteConfig.getCachePath("ccd_graph_hash"), "ccd_graph_hash.sqlite")
+    index = _indexD.get(dbPath)
+    if index is None:
+        with _indexLock:
+            index = _indexD.get(dbPath)
+            if index is None:
+                index = CcdGraphHashIndex(dbPath, siteConfig.cIAppCc.get_site_cc_cvs_path(), verbose=verbose, log=log)
+                _indexD[dbPath] = index
+    return index
+
+
+if __name__ == "__main__":
+    siteId_ = sys.argv[1] if len(sys.argv) > 1 else os.getenv("WWPDB_SITE_ID")
+    getCcdGraphHashIndex(siteId_).refresh()
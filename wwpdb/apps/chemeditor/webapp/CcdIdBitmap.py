@@ -0,0 +1,192 @@
+##
+# File:  CcdIdBitmap.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Bitmap of the chemical component ids in use.
+
+One bit per id of the 1-5 character id space (ChemCompHash.chemCompIdToIndex), set when the id
+exists in the chemical component dictionary.  The bitmap (about 8 MB) is stored in a .npy file
+which is memory mapped by every process, so existence checks, free-code scans and per-site
+partitioning (ChemCompHash.getChemCompIdSite) are array operations.  It is built from a listing
+of the sandbox directories and updated when a component is committed.
+
+Build the bitmap of a site with:
+
+    python -m wwpdb.apps.chemeditor.webapp.CcdIdBitmap <siteId>
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from wwpdb.apps.chemeditor.webapp.ChemCompHash import (
+    ID_LENGTH_OFFSETS,
+    ID_SPACE_SIZE,
+    ChemCompHash,
+)
+from wwpdb.apps.chemeditor.webapp.FileLock import FileLock
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+BITMAP_BYTES = (ID_SPACE_SIZE + 7) // 8
+
+_bitmapD = {}
+_bitmapLock = threading.Lock()
+
+
+def listSandboxIds(ccCvsPath):
+    """Return the ids of the <hash>/<ccId> directories of the sandbox ccCvsPath"""
+    idList = []
+    try:
+        hashDirList = [entry.path for entry in os.scandir(ccCvsPath) if entry.is_dir()]
+    except OSError:
+        return idList
+    for hashDir in hashDirList:
+        try:
+            idList.extend(entry.name for entry in os.scandir(hashDir) if entry.is_dir() and entry.name != "CVS")
+        except OSError:
+            continue
+    return idList
+
+
+class CcdIdBitmap:
+    """Memory mapped bitmap of the ids in use stored in bitmapFilePath."""
+
+    def __init__(self, bitmapFilePath, verbose=False, log=sys.stderr):
+        self.__bitmapFilePath = bitmapFilePath
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__data = None
+        self.__signature = None
+        self.__cCH = ChemCompHash()
+
+    def getData(self):
+        """Return the read-only memory mapped bitmap (little bit order), or None if it has not been built"""
+        try:
+            st = os.stat(self.__bitmapFilePath)
+            signature = (st.st_ino, st.st_mtime, st.st_size)
+        except OSError:
+            return None
+        with self.__lock:
+            if signature != self.__signature:
+                self.__data = np.load(self.__bitmapFilePath, mmap_mode="r")
+                self.__signature = signature
+            return self.__data
+
+    def contains(self, ccId):
+        """Return True if ccId is in use, or None if the bitmap has not been built"""
+        data = self.getData()
+        if data is None:
+            return None
+        try:
+            index = self.__cCH.chemCompIdToIndex(ccId)
+        except ValueError:
+            return False
+        return bool((data[index >> 3] >> (index & 7)) & 1)
+
+    def containsMany(self, ccIdList):
+        """Return a boolean NumPy array telling which ids of ccIdList are in use, or None if the bitmap has not been built"""
+        data = self.getData()
+        if data is None:
+            return None
+        indexArray, valid = self.__cCH.chemCompIdsToIndex(ccIdList)
+        return valid & (((data[indexArray >> 3] >> (indexArray & 7).astype(np.uint8)) & 1) == 1)
+
+    def getCount(self):
+        """Return the number of ids in use"""
+        data = self.getData()
+        if data is None:
+            return 0
+        return int(np.unpackbits(data, bitorder="little").sum(dtype=np.int64))
+
+    def getFreeIds(self, length, site=None, sites=None, limit=None, after=None):
+        """Return the free ids of the given length in id order, starting after the id after if given.
+
+        With site, only ids that ChemCompHash.getChemCompIdSite(ccId, sites) assigns to site are
+        returned.  Returns None if the bitmap has not been built.
+        """
+        data = self.getData()
+        if data is None:
+            return None
+        start = int(ID_LENGTH_OFFSETS[length])
+        end = int(ID_LENGTH_OFFSETS[length + 1])
+        bits = np.unpackbits(data[start >> 3 : (end + 7) >> 3], bitorder="little")
+        bits = bits[start & 7 : (start & 7) + end - start]
+        values = np.flatnonzero(bits == 0)
+        if after:
+            values = values[values > self.__cCH.chemCompIdToInt(after)]
+        if site is not None:
+            if sites is None:
+                sites = ["RCSB", "PDBE", "PDBJ"]
+            values = values[values % len(sites) == sites.index(site)]
+        if limit is not None:
+            values = values[:limit]
+        return [self.__cCH.indexToChemCompId(start + int(value)) for value in values]
+
+    def build(self, idList):
+        """Replace the bitmap with the ids of idList"""
+        bits = np.zeros(BITMAP_BYTES * 8, dtype=np.uint8)
+        indexArray, valid = self.__cCH.chemCompIdsToIndex(idList)
+        bits[indexArray[valid]] = 1
+        with self.__writeLock():
+            self.__save(np.packbits(bits, bitorder="little"))
+        return int(valid.sum())
+
+    def buildFromSandbox(self, ccCvsPath):
+        """Replace the bitmap with the ids of the sandbox ccCvsPath"""
+        startTime = time.time()
+        count = self.build(listSandboxIds(ccCvsPath))
+        self.__lfh.write("+CcdIdBitmap.buildFromSandbox() %d ids in %.2f seconds\n" % (count, time.time() - startTime))
+        return count
+
+    def add(self, ccIdList):
+        """Mark the ids of ccIdList as in use.  Nothing is done if the bitmap has not been built."""
+        if not os.access(self.__bitmapFilePath, os.F_OK):
+            return False
+        indexArray, valid = self.__cCH.chemCompIdsToIndex(ccIdList)
+        indexArray = indexArray[valid]
+        with self.__writeLock():
+            data = np.load(self.__bitmapFilePath)
+            np.bitwise_or.at(data, indexArray >> 3, np.left_shift(1, indexArray & 7).astype(np.uint8))
+            self.__save(data)
+        return True
+
+    def __save(self, data):
+        """Atomically replace the bitmap file"""
+        fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(self.__bitmapFilePath), prefix=".tmp_", suffix=".npy")
+        ofh = os.fdopen(fd, "wb")
+        np.save(ofh, data)
+        ofh.close()
+        os.replace(tmpPath, self.__bitmapFilePath)
+
+    def __writeLock(self):
+        return FileLock(self.__bitmapFilePath + ".lock")
+
+
+def getCcdIdBitmap(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide CcdIdBitmap for siteId"""
+    bitmapFilePath = os.path.join(getSiteConfig(siteId).getCachePath("ccd_id_bitmap"), "ccd_id_bitmap.npy")
+    bitmap = _bitmapD.get(bitmapFilePath)
+    if bitmap is None:
+        with _bitmapLock:
+            bitmap = _bitmapD.get(bitmapFilePath)
+            if bitmap is None:
+                bitmap = CcdIdBitmap(bitmapFilePath, verbose=verbose, log=log)
+                _bitmapD[bitmapFilePath] = bitmap
+    return bitmap
+
+
+if __name__ == "__main__":
+    siteId_ = sys.argv[1] if len(sys.argv) > 1 else os.getenv("WWPDB_SITE_ID")
+    getCcdIdBitmap(siteId_).buildFromSandbox(getSiteConfig(siteId_).cIAppCc.get_site_cc_cvs_path())
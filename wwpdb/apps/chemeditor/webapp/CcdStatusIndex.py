@@ -0,0 +1,195 @@
+##
+# File:  CcdStatusIndex.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+SQLite index of chemical component release status in the CVS sandbox.
+
+Each entry holds the release status, replaced-by id and modification time of a sandbox
+component file, so that obsolete components can be filtered with one lookup instead of
+checking out and parsing the file.  The index is built offline by walking the sandbox and
+refreshed incrementally: only files whose modification time has changed are read again.
+Until the index of a site has been built, callers look up the sandbox file of each id.
+
+Build or refresh the index of a site (e.g. from cron after the sandbox is updated) with:
+
+    python -m wwpdb.apps.chemeditor.webapp.CcdStatusIndex <siteId>
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+_indexD = {}
+_indexLock = threading.Lock()
+
+_ITEM_RE = re.compile(r"^_chem_comp\.(pdbx_release_status|pdbx_replaced_by)[ \t]+(\S+)", re.MULTILINE)
+
+
+class CcdStatusIndex:
+    """id -> (release status, replaced_by, file mtime) index of the components in ccCvsPath."""
+
+    def __init__(self, dbPath, ccCvsPath, verbose=False, log=sys.stderr):
+        self.__dbPath = dbPath
+        self.__ccCvsPath = ccCvsPath
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__con = sqlite3.connect(dbPath, timeout=30.0, check_same_thread=False)
+        with self.__lock:
+            self.__con.execute("PRAGMA journal_mode=WAL")
+            self.__con.execute("CREATE TABLE IF NOT EXISTS ccd_status (comp_id TEXT PRIMARY KEY, status TEXT, replaced_by TEXT, mtime REAL, path TEXT)")
+            self.__con.execute("CREATE TABLE IF NOT EXISTS ccd_status_meta (name TEXT PRIMARY KEY, value REAL)")
+            self.__con.commit()
+
+    def getCount(self):
+        """Return the number of indexed components"""
+        with self.__lock:
+            return self.__con.execute("SELECT COUNT(*) FROM ccd_status").fetchone()[0]
+
+    def getBuildTime(self):
+        """Return the start time of the last completed refresh, or None if the index has not been built"""
+        with self.__lock:
+            row = self.__con.execute("SELECT value FROM ccd_status_meta WHERE name = 'build_time'").fetchone()
+        return row[0] if row else None
+
+    def lookup(self, ccId):
+        """Return (status, replaced_by) of ccId, or None if ccId is not indexed or its file is gone.
+        An entry whose file has been modified since it was indexed is read again.
+        """
+        ccId = ccId.upper()
+        with self.__lock:
+            row = self.__con.execute("SELECT status, replaced_by, mtime, path FROM ccd_status WHERE comp_id = ?", (ccId,)).fetchone()
+        if row is None:
+            return None
+        status, replacedBy, mtime, filePath = row
+        try:
+            currentMtime = os.stat(filePath).st_mtime
+        except OSError:
+            self.remove(ccId)
+            return None
+        if currentMtime != mtime:
+            return self.update(ccId, filePath)
+        return (status, replacedBy)
+
+    def update(self, ccId, filePath):
+        """Read the status of ccId from filePath and store it.  Return (status, replaced_by) or None."""
+        entry = self.__readEntry(filePath)
+        if entry is None:
+            return None
+        with self.__lock:
+            self.__con.execute(
+                "INSERT OR REPLACE INTO ccd_status (comp_id, status, replaced_by, mtime, path) VALUES (?, ?, ?, ?, ?)",
+                (ccId.upper(),) + entry + (filePath,),
+            )
+            self.__con.commit()
+        return entry[:2]
+
+    def remove(self, ccId):
+        with self.__lock:
+            self.__con.execute("DELETE FROM ccd_status WHERE comp_id = ?", (ccId.upper(),))
+            self.__con.commit()
+
+    def refresh(self):
+        """Walk the sandbox and index new or modified component files.  Entries of removed files are dropped.
+
+        :Returns:
+            number of files read
+        """
+        startTime = time.time()
+        with self.__lock:
+            indexedD = {row[0]: row[1] for row in self.__con.execute("SELECT comp_id, mtime FROM ccd_status")}
+        rowList = []
+        seenD = {}
+        for ccId, filePath, mtime in iterSandboxFiles(self.__ccCvsPath):
+            seenD[ccId] = True
+            if indexedD.get(ccId) == mtime:
+                continue
+            entry = self.__readEntry(filePath)
+            if entry is not None:
+                rowList.append((ccId,) + entry + (filePath,))
+        removedList = [(ccId,) for ccId in indexedD if ccId not in seenD]
+        with self.__lock:
+            self.__con.executemany(
+                "INSERT OR REPLACE INTO ccd_status (comp_id, status, replaced_by, mtime, path) VALUES (?, ?, ?, ?, ?)",
+                rowList,
+            )
+            self.__con.executemany("DELETE FROM ccd_status WHERE comp_id = ?", removedList)
+            self.__con.execute("INSERT OR REPLACE INTO ccd_status_meta (name, value) VALUES ('build_time', ?)", (startTime,))
+            self.__con.commit()
+        self.__lfh.write("+CcdStatusIndex.refresh() read %d files, removed %d entries in %.2f seconds\n" % (len(rowList), len(removedList), time.time() - startTime))
+        return len(rowList)
+
+    def __readEntry(self, filePath):
+        """Return (status, replaced_by, mtime) read from filePath, or None if it cannot be read"""
+        try:
+            mtime = os.stat(filePath).st_mtime
+            ifh = open(filePath)
+            data = ifh.read()
+            ifh.close()
+        except (OSError, UnicodeDecodeError) as e:
+            if self.__verbose:
+                self.__lfh.write("+CcdStatusIndex.__readEntry() cannot read %s: %s\n" % (filePath, str(e)))
+            return None
+        itemD = {"pdbx_release_status": "", "pdbx_replaced_by": ""}
+        for item, value in _ITEM_RE.findall(data):
+            value = value.strip("'\"")
+            if value not in ("?", "."):
+                itemD[item] = value
+        return (itemD["pdbx_release_status"].upper(), itemD["pdbx_replaced_by"].upper(), mtime)
+
+
+def iterSandboxFiles(ccCvsPath):
+    """Yield (ccId, filePath, mtime) for the <hash>/<ccId>/<ccId>.cif files of the sandbox ccCvsPath"""
+    try:
+        hashDirList = [entry.path for entry in os.scandir(ccCvsPath) if entry.is_dir()]
+    except OSError:
+        return
+    for hashDir in hashDirList:
+        try:
+            idDirList = [entry for entry in os.scandir(hashDir) if entry.is_dir()]
+        except OSError:
+            continue
+        for idDir in idDirList:
+            filePath = os.path.join(idDir.path, idDir.name + ".cif")
+            try:
+                yield idDir.name.upper(), filePath, os.stat(filePath).st_mtime
+            except OSError:
+                continue
+
+
+def getSandboxFileTimes(ccCvsPath):
+    """Return {ccId: mtime} of the component files of the sandbox ccCvsPath.
+    Comparing this with the modification times recorded in an index finds added, removed and edited files.
+    """
+    return {ccId: mtime for ccId, _filePath, mtime in iterSandboxFiles(ccCvsPath)}
+
+
+def getCcdStatusIndex(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide CcdStatusIndex for siteId.  The index is not built here; see getBuildTime()."""
+    siteConfig = getSiteConfig(siteId)
+    dbPath = os.path.join(siteConfig.getCachePath("ccd_status"), "ccd_status.sqlite")
+    index = _indexD.get(dbPath)
+    if index is None:
+        with _indexLock:
+            index = _indexD.get(dbPath)
+            if index is None:
+                index = CcdStatusIndex(dbPath, siteConfig.cIAppCc.get_site_cc_cvs_path(), verbose=verbose, log=log)
+                _indexD[dbPath] = index
+    return index
+
+
+if __name__ == "__main__":
+    siteId_ = sys.argv[1] if len(sys.argv) > 1 else os.getenv("WWPDB_SITE_ID")
+    getCcdStatusIndex(siteId_).refresh()
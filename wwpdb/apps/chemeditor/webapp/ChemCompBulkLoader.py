@@ -0,0 +1,264 @@
+##
+# File:  ChemCompBulkLoader.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Command line bulk loader of the chemical component sandbox into the compv4 database.
+
+Component files are parsed into table rows by a pool of processes (IoAdapterCore/SchemaDefLoader)
+and written with batched multi-row inserts over a few pooled connections.  Ids of the loaded
+components are recorded in a checkpoint file so that an interrupted run resumes where it stopped.
+
+    python -m wwpdb.apps.chemeditor.webapp.ChemCompBulkLoader --siteid <siteId> [--truncate]
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from mmcif.io.IoAdapterCore import IoAdapterCore
+from wwpdb.utils.db.ChemCompSchemaDef import ChemCompSchemaDef
+from wwpdb.utils.db.MyConnectionBase import MyConnectionBase
+from wwpdb.utils.db.SchemaDefLoader import SchemaDefLoader
+
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import iterSandboxFiles
+from wwpdb.apps.chemeditor.webapp.ChemCompDbUtil import getInsertStatements
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Number of component files parsed and loaded together
+DEFAULT_CHUNK_SIZE = 200
+# Number of database connections used for loading
+DEFAULT_CONNECTIONS = 3
+
+
+def _fetchChunk(filePathList):
+    """Worker function: return (tableDataDict, containerNameList, failedFilePathList) for the files in filePathList"""
+    sdl = SchemaDefLoader(schemaDefObj=ChemCompSchemaDef(), ioObj=IoAdapterCore(verbose=False), verbose=False)
+    try:
+        tableDataDict, containerNameList = sdl.fetch(filePathList)
+        return tableDataDict, containerNameList, []
+    except:  # noqa: E722 pylint: disable=bare-except
+        pass
+    # Parse the files one at a time to isolate the unreadable ones
+    tableDataDict = {}
+    containerNameList = []
+    failedList = []
+    for filePath in filePathList:
+        try:
+            fileTableDataDict, fileContainerNameList = sdl.fetch([filePath])
+        except:  # noqa: E722 pylint: disable=bare-except
+            failedList.append(filePath)
+            continue
+        for tableId, rowList in fileTableDataDict.items():
+            tableDataDict.setdefault(tableId, []).extend(rowList)
+        containerNameList.extend(fileContainerNameList)
+    return tableDataDict, containerNameList, failedList
+
+
+class _CcDbConnection(MyConnectionBase):
+    """compv4 database connection of one loader thread"""
+
+    def __init__(self, siteId, verbose=False, log=sys.stderr):
+        super(_CcDbConnection, self).__init__(siteId=siteId, verbose=verbose, log=log)
+        self.setResource(resourceName="CC")
+
+    def getConnection(self):
+        if (self._dbCon is None) and (not self.openConnection()):
+            raise OSError("compv4 database connection failed")
+        return self._dbCon
+
+
+class ChemCompBulkLoader:
+    """Load every component of the site CVS sandbox into the compv4 database."""
+
+    def __init__(
+        self,
+        siteId,
+        checkpointPath=None,
+        processes=None,
+        connections=DEFAULT_CONNECTIONS,
+        chunkSize=DEFAULT_CHUNK_SIZE,
+        verbose=False,
+        log=sys.stderr,
+    ):
+        self.__siteId = siteId
+        siteConfig = getSiteConfig(siteId)
+        self.__ccCvsPath = siteConfig.cIAppCc.get_site_cc_cvs_path()
+        if checkpointPath is None:
+            checkpointPath = os.path.join(siteConfig.getCachePath("ccd_bulk_load"), "checkpoint.txt")
+        self.__checkpointPath = checkpointPath
+        self.__processes = processes
+        self.__connections = connections
+        self.__chunkSize = chunkSize
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__schemaDefObj = ChemCompSchemaDef()
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__dbObjList = []
+        self.__componentCount = 0
+        self.__rowCount = 0
+        self.__failedList = []
+
+    def run(self, truncate=False):
+        """Load the sandbox.  With truncate, the compv4 tables are emptied first unless a checkpoint is resumed.
+
+        :Returns:
+            True if every component was loaded
+        """
+        startTime = time.time()
+        doneD = self.__readCheckpoint()
+        if doneD:
+            self.__lfh.write("+ChemCompBulkLoader.run() resuming after %d loaded components\n" % len(doneD))
+        elif truncate:
+            self.__truncateTables()
+        # rows of the loaded components must be replaced unless the tables were just emptied
+        deleteExisting = bool(doneD) or (not truncate)
+        filePathList = [filePath for ccId, filePath, _mtime in iterSandboxFiles(self.__ccCvsPath) if ccId not in doneD]
+        chunkList = [filePathList[i : i + self.__chunkSize] for i in range(0, len(filePathList), self.__chunkSize)]
+        self.__lfh.write("+ChemCompBulkLoader.run() loading %d components in %d chunks\n" % (len(filePathList), len(chunkList)))
+        ok = True
+        pool = multiprocessing.Pool(processes=self.__processes)
+        executor = ThreadPoolExecutor(max_workers=self.__connections)
+        try:
+            futureList = []
+            for tableDataDict, containerNameList, failedList in pool.imap_unordered(_fetchChunk, chunkList):
+                with self.__lock:
+                    self.__failedList.extend(failedList)
+                futureList.append(executor.submit(self.__loadChunk, tableDataDict, containerNameList, deleteExisting))
+                # keep the parsed data waiting for a connection bounded
+                while len(futureList) > 2 * self.__connections:
+                    ok = futureList.pop(0).result() and ok
+                self.__report(startTime)
+            for future in futureList:
+                ok = future.result() and ok
+        finally:
+            pool.close()
+            pool.join()
+            executor.shutdown(wait=True)
+            for dbObj in self.__dbObjList:
+                dbObj.closeConnection()
+        self.__report(startTime)
+        for filePath in self.__failedList:
+            self.__lfh.write("+ChemCompBulkLoader.run() failed to parse %s\n" % filePath)
+        if ok and (not self.__failedList):
+            # a complete run starts from scratch next time
+            if os.access(self.__checkpointPath, os.F_OK):
+                os.remove(self.__checkpointPath)
+            return True
+        return False
+
+    def __loadChunk(self, tableDataDict, containerNameList, deleteExisting):
+        """Write the rows of one chunk in one transaction and record its components in the checkpoint file"""
+        if not containerNameList:
+            return True
+        databaseName = self.__schemaDefObj.getDatabaseName()
+        rowCount = 0
+        try:
+            dbCon = self.__getConnection()
+            curs = dbCon.cursor()
+            try:
+                for tableId in self.__schemaDefObj.getTableIdList():
+                    tObj = self.__schemaDefObj.getTable(tableId)
+                    if deleteExisting:
+                        sql = "delete from %s.%s where %s in (%s)" % (
+                            databaseName,
+                            tObj.getName(),
+                            tObj.getDeleteAttributeName(),
+                            ",".join(["%s"] * len(containerNameList)),
+                        )  # noqa: S608
+                        curs.execute(sql, containerNameList)
+                    # MySQLdb sends executemany() inserts as multi-row INSERT statements
+                    for sql, valueLists in getInsertStatements(databaseName, tObj, tableDataDict.get(tableId, [])):
+                        curs.executemany(sql, valueLists)
+                        rowCount += len(valueLists)
+                dbCon.commit()
+            except:  # noqa: E722 pylint: disable=bare-except
+                dbCon.rollback()
+                raise
+            finally:
+                curs.close()
+        except:  # noqa: E722 pylint: disable=bare-except
+            self.__lfh.write("+ChemCompBulkLoader.__loadChunk() failed loading %s\n" % ",".join(containerNameList))
+            traceback.print_exc(file=self.__lfh)
+            return False
+        with self.__lock:
+            ofh = open(self.__checkpointPath, "a")
+            ofh.write("\n".join(containerNameList) + "\n")
+            ofh.flush()
+            os.fsync(ofh.fileno())
+            ofh.close()
+            self.__componentCount += len(containerNameList)
+            self.__rowCount += rowCount
+        return True
+
+    def __getConnection(self):
+        dbObj = getattr(self.__local, "dbObj", None)
+        if dbObj is None:
+            dbObj = _CcDbConnection(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+            self.__local.dbObj = dbObj
+            with self.__lock:
+                self.__dbObjList.append(dbObj)
+        return dbObj.getConnection()
+
+    def __truncateTables(self):
+        databaseName = self.__schemaDefObj.getDatabaseName()
+        dbCon = self.__getConnection()
+        curs = dbCon.cursor()
+        for tableId in self.__schemaDefObj.getTableIdList():
+            curs.execute("truncate table %s.%s" % (databaseName, self.__schemaDefObj.getTable(tableId).getName()))
+        curs.close()
+        dbCon.commit()
+        self.__lfh.write("+ChemCompBulkLoader.__truncateTables() emptied compv4 tables\n")
+
+    def __readCheckpoint(self):
+        doneD = {}
+        if os.access(self.__checkpointPath, os.R_OK):
+            ifh = open(self.__checkpointPath)
+            for line in ifh:
+                if line.strip():
+                    doneD[line.strip().upper()] = True
+            ifh.close()
+        return doneD
+
+    def __report(self, startTime):
+        elapsed = max(time.time() - startTime, 1.0e-3)
+        with self.__lock:
+            componentCount, rowCount = self.__componentCount, self.__rowCount
+        self.__lfh.write("+ChemCompBulkLoader() %d components %d rows in %.1f seconds (%.0f rows/sec)\n" % (componentCount, rowCount, elapsed, rowCount / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load the chemical component sandbox into the compv4 database")
+    parser.add_argument("--siteid", default=os.getenv("WWPDB_SITE_ID"), help="wwPDB site id")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: site chemeditor cache)")
+    parser.add_argument("--processes", type=int, default=None, help="number of parsing processes")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="number of database connections")
+    parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_SIZE, help="components per load transaction")
+    parser.add_argument("--truncate", action="store_true", help="empty the compv4 tables before a fresh load")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    loader = ChemCompBulkLoader(
+        args.siteid,
+        checkpointPath=args.checkpoint,
+        processes=args.processes,
+        connections=args.connections,
+        chunkSize=args.chunk_size,
+        verbose=args.verbose,
+    )
+    sys.exit(0 if loader.run(truncate=args.truncate) else 1)
+
+
+if __name__ == "__main__":
+    main()
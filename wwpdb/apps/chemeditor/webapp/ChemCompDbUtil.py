@@ -3,6 +3,8 @@
 # Date:  07-Mar-2025
 #
 # Updated
+# 18-Oct-2026  agent  single parameterized duplicate descriptor query with OBS filtering
+# 18-Oct-2026  agent  diff-aware loadCCD rewriting only changed tables in one transaction
 """
 Wrapper for utilities for database loading of chemical reference data
 """
@@ -15,14 +17,74 @@ __version__ = "V0.07"
 import os
 import sys
 import traceback
+from collections import Counter
 
 from mmcif.io.IoAdapterCore import IoAdapterCore
 
 from wwpdb.utils.db.ChemCompSchemaDef import ChemCompSchemaDef
 from wwpdb.utils.db.MyConnectionBase import MyConnectionBase
-from wwpdb.utils.db.MyDbUtil import MyDbQuery
 from wwpdb.utils.db.SchemaDefLoader import SchemaDefLoader
 
+# Released components matching every one of the (type, program, descriptor) conditions joined by "or"
+SEARCH_SAME_CCDS_SQL = (
+    "select d.comp_id from pdbx_chem_comp_descriptor d join chem_comp c on c.id = d.comp_id"
+    " where (%s)"
+    " and (c.pdbx_release_status != 'OBS') and ((c.pdbx_replaced_by is null) or (c.pdbx_replaced_by = ''))"
+    " group by d.comp_id having count(distinct d.type, d.program, d.descriptor) = %%s"
+)
+DESCRIPTOR_MATCH_SQL = "(d.type = %s and d.program = %s and d.descriptor = %s)"
+
+# Index supporting the descriptor lookup of SEARCH_SAME_CCDS_SQL (descriptor is VARCHAR(2048), so a prefix is indexed)
+DESCRIPTOR_INDEX_DDL = "create index pdbx_chem_comp_descriptor_tpd on pdbx_chem_comp_descriptor (type, program, descriptor(255))"
+
+
+def _normalizeValue(tObj, attributeId, value, fromDb=False):
+    """Return a comparable form of a loadable value (fromDb=False) or of a value read from the database"""
+    if value is None:
+        return None
+    if not fromDb:
+        if (len(value) == 0) or (value == r"\N"):
+            return None
+    try:
+        if tObj.isAttributeFloatType(attributeId):
+            return float(value)
+        if tObj.isAttributeIntegerType(attributeId):
+            return int(value)
+    except ValueError:
+        pass
+    if hasattr(value, "isoformat"):
+        return value.isoformat(" ") if hasattr(value, "hour") else value.isoformat()
+    return str(value)
+
+
+def getInsertStatements(databaseName, tObj, rowList):
+    """Return (sql, valueLists) insert statements for the loadable rows of table tObj.
+
+    As with SchemaDefLoader batch-insert, empty values are left out of the insert, so rows are
+    grouped by the attributes they have values for.
+    """
+    attributeIdList = tObj.getAttributeIdList()
+    attributeNameList = tObj.getAttributeNameList()
+    insertD = {}
+    for row in rowList:
+        nameList = []
+        valueList = []
+        for attributeId, attributeName in zip(attributeIdList, attributeNameList):
+            if (len(row[attributeId]) > 0) and (row[attributeId] != r"\N"):
+                nameList.append(attributeName)
+                valueList.append(row[attributeId])
+        insertD.setdefault(tuple(nameList), []).append(valueList)
+    statementList = []
+    for nameList, valueLists in insertD.items():
+        sql = "insert into %s.%s (%s) values (%s)" % (
+            databaseName,
+            tObj.getName(),
+            ",".join(nameList),
+            ",".join(["%s"] * len(nameList)),
+        )  # noqa: S608
+        statementList.append((sql, valueLists))
+    return statementList
+
 
 class ChemCompDbUtil(MyConnectionBase):
     """Wrapper for utilities for database loading of chemical reference data"""
@@ -40,17 +102,27 @@ class ChemCompDbUtil(MyConnectionBase):
         self.__ioObj = IoAdapterCore(verbose=self.__verbose, log=self.__lfh)
         self.setResource(resourceName="CC")
 
-    def loadCCD(self, ccdFilePath=None):
-        """Load CCD definition into compv4 database"""
+    def loadCCD(self, ccdFilePath=None, ccdFilePathList=None):
+        """Load CCD definition(s) into compv4 database.
+
+        The rows of each definition are compared table by table with the rows stored for the same
+        comp_id and only the tables that differ are rewritten, all in one transaction.
+        """
+        pathList = []
+        if ccdFilePath is not None:
+            pathList.append(ccdFilePath)
+        if ccdFilePathList is not None:
+            pathList.extend(ccdFilePathList)
         if self.__verbose:
-            self.__lfh.write("+ChemCompDbUtil.loadCCD() - loading %s\n" % ccdFilePath)
-        if (ccdFilePath is None) or (not os.access(ccdFilePath, os.R_OK)):
+            self.__lfh.write("+ChemCompDbUtil.loadCCD() - loading %s\n" % ",".join(pathList))
+        if (not pathList) or [filePath for filePath in pathList if not os.access(filePath, os.R_OK)]:
             return False
         try:
             ok = self.openConnection()
             if ok:
+                schemaDefObj = ChemCompSchemaDef()
                 sdl = SchemaDefLoader(
-                    schemaDefObj=ChemCompSchemaDef(),
+                    schemaDefObj=schemaDefObj,
                     ioObj=self.__ioObj,
                     dbCon=self._dbCon,
                     workPath=self.__sessionPath,
@@ -59,7 +131,8 @@ class ChemCompDbUtil(MyConnectionBase):
                     verbose=self.__verbose,
                     log=self.__lfh,
                 )
-                ok = sdl.load(inputPathList=[ccdFilePath], loadType="batch-insert", deleteOpt="selected")
+                tableDataDict, containerNameList = sdl.fetch(pathList)
+                ok = self.__loadTableDifferences(schemaDefObj, tableDataDict, containerNameList)
                 self.closeConnection()
             elif self.__verbose:
                 self.__lfh.write("+ChemCompDbUtil.loadCCD() - database connection failed\n")
@@ -71,6 +144,65 @@ class ChemCompDbUtil(MyConnectionBase):
             ok = False
         return ok
 
+    def __loadTableDifferences(self, schemaDefObj, tableDataDict, containerNameList):
+        """Rewrite the rows of each (table, container) whose content differs from the database, in one transaction"""
+        databaseName = schemaDefObj.getDatabaseName()
+        changedCount = 0
+        unchangedCount = 0
+        curs = self._dbCon.cursor()
+        try:
+            for tableId in schemaDefObj.getTableIdList():
+                tObj = schemaDefObj.getTable(tableId)
+                tableName = tObj.getName()
+                attributeIdList = tObj.getAttributeIdList()
+                attributeNameList = tObj.getAttributeNameList()
+                deleteAttributeId = tObj.getDeleteAttributeId()
+                deleteAttributeName = tObj.getDeleteAttributeName()
+                deleteSql = "delete from %s.%s where %s = %%s" % (
+                    databaseName,
+                    tableName,
+                    deleteAttributeName,
+                )  # noqa: S608
+                newRowD = {}
+                newCountD = {}
+                for row in tableDataDict.get(tableId, []):
+                    containerName = row[deleteAttributeId]
+                    newRowD.setdefault(containerName, []).append(row)
+                    valueTuple = tuple(_normalizeValue(tObj, attributeId, row[attributeId], fromDb=False) for attributeId in attributeIdList)
+                    newCountD.setdefault(containerName, Counter())[valueTuple] += 1
+                oldCountD = {}
+                sql = "select %s from %s.%s where %s in (%s)" % (
+                    ",".join(attributeNameList),
+                    databaseName,
+                    tableName,
+                    deleteAttributeName,
+                    ",".join(["%s"] * len(containerNameList)),
+                )  # noqa: S608
+                curs.execute(sql, containerNameList)
+                deleteIdx = attributeIdList.index(deleteAttributeId)
+                for row in curs.fetchall():
+                    valueTuple = tuple(_normalizeValue(tObj, attributeId, value, fromDb=True) for attributeId, value in zip(attributeIdList, row))
+                    oldCountD.setdefault(row[deleteIdx], Counter())[valueTuple] += 1
+                for containerName in containerNameList:
+                    oldCount = oldCountD.get(containerName, Counter())
+                    if newCountD.get(containerName, Counter()) == oldCount:
+                        unchangedCount += 1
+                        continue
+                    changedCount += 1
+                    if oldCount:
+                        curs.execute(deleteSql, (containerName,))
+                    for sql, valueLists in getInsertStatements(databaseName, tObj, newRowD.get(containerName, [])):
+                        curs.executemany(sql, valueLists)
+            self._dbCon.commit()
+        except:  # noqa: E722 pylint: disable=bare-except
+            self._dbCon.rollback()
+            raise
+        finally:
+            curs.close()
+        if self.__verbose:
+            self.__lfh.write("+ChemCompDbUtil.__loadTableDifferences() %d table(s) rewritten %d unchanged\n" % (changedCount, unchangedCount))
+        return True
+
     def searchSameCCDs(self, ccdFilePath=None):
         """Search same CCDs with same OpenEye stereo SMILES descriptor, same CACTVS stereo SMILES descriptor,
         and same InChI descriptor.
@@ -104,19 +236,7 @@ class ChemCompDbUtil(MyConnectionBase):
                 return []
             ok = self.openConnection()
             if ok:
-                myq = MyDbQuery(dbcon=self._dbCon, verbose=self.__verbose, log=self.__lfh)
-                ccdIdList = self.__searchDuplicateIdList(myq, checkValueLists[0])
-                if len(ccdIdList) > 0:
-                    for valueList in checkValueLists[1:]:
-                        ccdIdList1 = self.__searchDuplicateIdList(myq, valueList)
-                        if len(ccdIdList1) > 0:
-                            ccdIdList = list(set(ccdIdList).intersection(ccdIdList1))
-                        else:
-                            ccdIdList = []
-                        if len(ccdIdList) == 0:
-                            break
-                    if len(ccdIdList) > 0:
-                        ccdIdList = self.__removeOBSCCDs(myq, ccdIdList)
+                ccdIdList = self.__searchDuplicateIdList(checkValueLists)
                 self.closeConnection()
                 return ccdIdList
         except:  # noqa: E722 pylint: disable=bare-except
@@ -143,44 +263,38 @@ class ChemCompDbUtil(MyConnectionBase):
                 valueList.append(tD)
         return valueList
 
-    def __searchDuplicateIdList(self, myq, valueList):
-        """ """
+    def __searchDuplicateIdList(self, checkValueLists):
+        """Return the ids of the released components having all (type, program, descriptor) values in checkValueLists"""
         retIdList = []
+        valueSet = sorted({tuple(valueList) for valueList in checkValueLists})
+        sql = SEARCH_SAME_CCDS_SQL % " or ".join([DESCRIPTOR_MATCH_SQL] * len(valueSet))
+        params = [value for valueList in valueSet for value in valueList] + [len(valueSet)]
         try:
-            sql = (
-                'select comp_id from pdbx_chem_comp_descriptor where type = "'
-                + valueList[0]
-                + '" and program = "'
-                + valueList[1]
-                + '" and descriptor = "'
-                + valueList[2]
-                + '"'
-            )  # noqa: S608
-            rows = myq.selectRows(queryString=sql)
-            if rows and (len(rows) > 0):
-                for row in rows:
-                    retIdList.append(row[0])
+            curs = self._dbCon.cursor()
+            curs.execute(sql, params)
+            for row in curs.fetchall():
+                retIdList.append(row[0])
+            curs.close()
         except:  # noqa: E722 pylint: disable=bare-except
             if self.__verbose:
                 self.__lfh.write("+ChemCompDbUtil.__searchDuplicateIdList():\n")
                 traceback.print_exc(file=self.__lfh)
         return retIdList
 
-    def __removeOBSCCDs(self, myq, inputCcdIdList):
-        """ """
-        retIdList = []
+    def createDescriptorIndex(self):
+        """Create the (type, program, descriptor) index of pdbx_chem_comp_descriptor used by searchSameCCDs"""
+        ok = False
         try:
-            sql = (
-                "select id from chem_comp where (pdbx_release_status != 'OBS') and ((pdbx_replaced_by is null) or (pdbx_replaced_by = '')) and id in ('"
-                + "', '".join(inputCcdIdList)
-                + "')"
-            )  # noqa: S608
-            rows = myq.selectRows(queryString=sql)
-            if rows and (len(rows) > 0):
-                for row in rows:
-                    retIdList.append(row[0])
+            if self.openConnection():
+                curs = self._dbCon.cursor()
+                curs.execute(DESCRIPTOR_INDEX_DDL)
+                curs.close()
+                self._dbCon.commit()
+                ok = True
+            self.closeConnection()
         except:  # noqa: E722 pylint: disable=bare-except
+            self.closeConnection()
             if self.__verbose:
-                self.__lfh.write("+ChemCompDbUtil.__removeOBSCCDs():\n")
+                self.__lfh.write("+ChemCompDbUtil.createDescriptorIndex():\n")
                 traceback.print_exc(file=self.__lfh)
-        return retIdList
+        return ok
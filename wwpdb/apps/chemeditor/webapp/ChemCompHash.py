@@ -2,6 +2,7 @@
 # File:  ChemCompHash.py
 # Date:  08-Nov-2016
 # Updates:
+# 18-Oct-2026  agent  table-driven id conversion with a NumPy batch path and id space positions
 ##
 """
 Hash function to ensure equal distribution of available CCDs
@@ -18,6 +19,22 @@ __email__ = "peisach@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.01"
 
+import numpy as np
+
+ID_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+ID_BASE = len(ID_CHARACTERS)
+MAX_ID_LENGTH = 5
+# Position of the first id of each length (index) in the space of all 1-5 character ids
+ID_LENGTH_OFFSETS = np.cumsum([0, 0] + [ID_BASE**length for length in range(1, MAX_ID_LENGTH + 1)], dtype=np.int64)
+# Number of 1-5 character ids
+ID_SPACE_SIZE = int(ID_LENGTH_OFFSETS[-1])
+
+_CHARACTER_VALUE_D = {c: idx for idx, c in enumerate(ID_CHARACTERS)}
+# Value of each byte in an id, -1 for bytes that are not id characters
+_BYTE_VALUE = np.full(256, -1, dtype=np.int64)
+for _c, _idx in _CHARACTER_VALUE_D.items():
+    _BYTE_VALUE[ord(_c)] = _idx
+
 
 class ChemCompHash:
     def getChemCompIdSite(self, ccId, sites=None):
@@ -31,47 +48,59 @@ class ChemCompHash:
 
     def chemCompIdToInt(self, ccId):
         """Convert ccId to a ~base36 (A-Z,0-9) integer --"""
-        characters = [
-            "A",
-            "B",
-            "C",
-            "D",
-            "E",
-            "F",
-            "G",
-            "H",
-            "I",
-            "J",
-            "K",
-            "L",
-            "M",
-            "N",
-            "O",
-            "P",
-            "Q",
-            "R",
-            "S",
-            "T",
-            "U",
-            "V",
-            "W",
-            "X",
-            "Y",
-            "Z",
-        ]
-        numbers = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
         iret = 0
-        cList = characters + numbers
-        base = len(cList)
-        ccIdU = ccId.upper()
-        try:
-            for i, c in enumerate(ccIdU[::-1]):
-                iret += cList.index(c) * pow(base, i)
-        except:  # noqa: E722,TRY302  pylint: disable=bare-except,try-except-raise
-            raise
-
+        for c in ccId.upper():
+            value = _CHARACTER_VALUE_D.get(c)
+            if value is None:
+                raise ValueError("%r is not in list" % c)
+            iret = iret * ID_BASE + value
         return iret
 
+    def chemCompIdsToInt(self, ccIdList):
+        """Convert the ids of ccIdList to ~base36 integers with the same values as chemCompIdToInt.
+
+        :Returns:
+            (values, valid) NumPy int64 array and boolean array; values of invalid ids are 0
+        """
+        values, _lengths, valid = _encodeIds(ccIdList)
+        return values, valid
+
+    def chemCompIdToIndex(self, ccId):
+        """Return the position of ccId in the space of all 1-5 character ids, shorter ids first"""
+        if not 0 < len(ccId) <= MAX_ID_LENGTH:
+            raise ValueError("invalid id length %r" % ccId)
+        return int(ID_LENGTH_OFFSETS[len(ccId)]) + self.chemCompIdToInt(ccId)
+
+    def chemCompIdsToIndex(self, ccIdList):
+        """Return (indexes, valid) NumPy arrays of the positions of the ids of ccIdList in the id space"""
+        values, lengths, valid = _encodeIds(ccIdList)
+        return np.where(valid, ID_LENGTH_OFFSETS[lengths] + values, 0), valid
+
+    def indexToChemCompId(self, index):
+        """Return the id at position index of the id space (inverse of chemCompIdToIndex)"""
+        length = int(np.searchsorted(ID_LENGTH_OFFSETS, index, side="right")) - 1
+        value = index - int(ID_LENGTH_OFFSETS[length])
+        cList = []
+        for _i in range(length):
+            value, digit = divmod(value, ID_BASE)
+            cList.append(ID_CHARACTERS[digit])
+        return "".join(cList[::-1])
+
+
+def _encodeIds(ccIdList):
+    """Return (values, lengths, valid) NumPy arrays for the ids of ccIdList"""
+    idArray = np.char.upper(np.asarray(ccIdList, dtype="S%d" % (MAX_ID_LENGTH + 1)))
+    lengths = np.char.str_len(idArray)
+    digits = _BYTE_VALUE[idArray.view(np.uint8).reshape(len(idArray), MAX_ID_LENGTH + 1)]
+    # positions past the end of an id are padding
+    inId = np.arange(MAX_ID_LENGTH + 1) < lengths[:, np.newaxis]
+    valid = (lengths > 0) & (lengths <= MAX_ID_LENGTH) & np.all((digits >= 0) | ~inId, axis=1)
+    values = np.zeros(len(idArray), dtype=np.int64)
+    for col in range(MAX_ID_LENGTH):
+        values = np.where(inId[:, col], values * ID_BASE + digits[:, col], values)
+    values[~valid] = 0
+    return values, lengths.clip(0, MAX_ID_LENGTH), valid
+
 
 if __name__ == "__main__":
     cCH = ChemCompHash()
@@ -0,0 +1,251 @@
+##
+# File:  ChemCompStructure.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Utilities operating on the atom and bond graph of a chemical component definition.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import hashlib
+import zlib
+
+from mmcif.io.PdbxReader import PdbxReader
+from mmcif.io.PdbxWriter import PdbxWriter
+
+# Categories computed by annotateComp from the atom and bond graph
+STRUCTURE_CATEGORIES = ("chem_comp_atom", "chem_comp_bond", "pdbx_chem_comp_descriptor", "pdbx_chem_comp_identifier")
+
+# chem_comp items computed by annotateComp from the atom and bond graph
+STRUCTURE_CHEM_COMP_ITEMS = (
+    "formula",
+    "formula_weight",
+    "pdbx_formal_charge",
+    "pdbx_ideal_coordinates_details",
+    "pdbx_ideal_coordinates_missing_flag",
+    "pdbx_model_coordinates_missing_flag",
+)
+
+# Items of the atom and bond graph which make up the structure key
+STRUCTURE_KEY_ITEMS = (
+    ("chem_comp_atom", ("atom_id", "type_symbol", "charge", "pdbx_aromatic_flag", "pdbx_stereo_config", "pdbx_leaving_atom_flag")),
+    ("chem_comp_bond", ("atom_id_1", "atom_id_2", "value_order", "pdbx_aromatic_flag", "pdbx_stereo_config")),
+)
+
+# Model coordinate items of chem_comp_atom, which annotateComp passes through unchanged
+MODEL_COORDINATE_ITEMS = ("model_Cartn_x", "model_Cartn_y", "model_Cartn_z")
+
+
+def readCifFile(filePath):
+    """Return the list of data containers read from filePath"""
+    myDataList = []
+    ifh = open(filePath)
+    pRd = PdbxReader(ifh)
+    pRd.read(myDataList)
+    ifh.close()
+    return myDataList
+
+
+def writeCifFile(filePath, myDataList):
+    """Write the list of data containers to filePath"""
+    ofh = open(filePath, "w")
+    pdbxW = PdbxWriter(ofh)
+    pdbxW.write(myDataList)
+    ofh.close()
+
+
+def getStructureKey(containerObj):
+    """Return a hash of the connectivity of a chemical component definition.
+
+    Only the items in STRUCTURE_KEY_ITEMS (atom names, elements, charges, aromatic, stereo and
+    leaving atom flags, bonded atom pairs and bond orders) are included, so that definitions which
+    differ only in coordinates, chem_comp metadata, synonyms or audit records have the same key.
+    Returns "" if there are no atoms.
+    """
+    atomCat = containerObj.getObj("chem_comp_atom")
+    if (not atomCat) or (atomCat.getRowCount() == 0):
+        return ""
+    hashObj = hashlib.sha256()
+    for catName, itemList in STRUCTURE_KEY_ITEMS:
+        catObj = containerObj.getObj(catName)
+        if not catObj:
+            continue
+        hashObj.update(("%s\n" % catName).encode("utf-8"))
+        for rowIdx in range(catObj.getRowCount()):
+            hashObj.update(("\t".join([_getItem(catObj, item, rowIdx) for item in itemList]) + "\n").encode("utf-8"))
+    return hashObj.hexdigest()
+
+
+def mergeStructureCategories(containerObj, annotatedObj):
+    """Copy the structure-derived categories and chem_comp items of annotatedObj into containerObj.
+
+    comp_id values of the copied categories are set to the chem_comp.id of containerObj.  The model
+    coordinates of containerObj are kept, since the structure key does not cover coordinates.
+    """
+    compCat = containerObj.getObj("chem_comp")
+    ccId = compCat.getValue("id", 0) if compCat else None
+    for catName in STRUCTURE_CATEGORIES:
+        catObj = annotatedObj.getObj(catName)
+        if not catObj:
+            continue
+        if ccId and catObj.hasAttribute("comp_id"):
+            for rowIdx in range(catObj.getRowCount()):
+                catObj.setValue(ccId, "comp_id", rowIdx)
+        if catName == "chem_comp_atom":
+            _copyModelCoordinates(containerObj.getObj(catName), catObj)
+        containerObj.append(catObj)
+    annotatedCompCat = annotatedObj.getObj("chem_comp")
+    if compCat and annotatedCompCat:
+        for item in STRUCTURE_CHEM_COMP_ITEMS:
+            if annotatedCompCat.hasAttribute(item):
+                compCat.setValue(annotatedCompCat.getValue(item, 0), item, 0)
+
+
+def _copyModelCoordinates(atomCat, annotatedAtomCat):
+    """Copy the model coordinates of atomCat onto the atoms of annotatedAtomCat with the same atom_id"""
+    if (not atomCat) or (not atomCat.hasAttribute("atom_id")) or (not annotatedAtomCat.hasAttribute("atom_id")):
+        return
+    itemList = [item for item in MODEL_COORDINATE_ITEMS if atomCat.hasAttribute(item) and annotatedAtomCat.hasAttribute(item)]
+    if not itemList:
+        return
+    coordD = {}
+    for rowIdx in range(atomCat.getRowCount()):
+        coordD[atomCat.getValue("atom_id", rowIdx)] = [atomCat.getValue(item, rowIdx) for item in itemList]
+    for rowIdx in range(annotatedAtomCat.getRowCount()):
+        coordList = coordD.get(annotatedAtomCat.getValue("atom_id", rowIdx))
+        if coordList is None:
+            continue
+        for item, value in zip(itemList, coordList):
+            annotatedAtomCat.setValue(value, item, rowIdx)
+
+
+def getAtomGraph(containerObj, heavyOnly=True):
+    """Return the atom and bond graph of a chemical component definition.
+
+    :Returns:
+        (atomList, bondList) where atomList holds (atomId, element, charge, aromatic, stereo) tuples and
+        bondList holds (atomIndex1, atomIndex2, order, aromatic, stereo) tuples referring to atomList
+    """
+    atomList = []
+    indexD = {}
+    atomCat = containerObj.getObj("chem_comp_atom")
+    if atomCat:
+        for rowIdx in range(atomCat.getRowCount()):
+            element = _getItem(atomCat, "type_symbol", rowIdx).upper()
+            if heavyOnly and (element in ("H", "D")):
+                continue
+            atomId = _getItem(atomCat, "atom_id", rowIdx)
+            charge = _getItem(atomCat, "charge", rowIdx)
+            try:
+                charge = int(charge)
+            except ValueError:
+                charge = 0
+            aromatic = _getItem(atomCat, "pdbx_aromatic_flag", rowIdx).upper()
+            stereo = _getItem(atomCat, "pdbx_stereo_config", rowIdx).upper()
+            indexD[atomId] = len(atomList)
+            atomList.append((atomId, element, charge, aromatic == "Y", stereo if stereo in ("R", "S") else ""))
+    bondList = []
+    bondCat = containerObj.getObj("chem_comp_bond")
+    if bondCat:
+        for rowIdx in range(bondCat.getRowCount()):
+            atomId1 = _getItem(bondCat, "atom_id_1", rowIdx)
+            atomId2 = _getItem(bondCat, "atom_id_2", rowIdx)
+            if (atomId1 not in indexD) or (atomId2 not in indexD):
+                continue
+            order = _getItem(bondCat, "value_order", rowIdx).upper()
+            aromatic = _getItem(bondCat, "pdbx_aromatic_flag", rowIdx).upper()
+            stereo = _getItem(bondCat, "pdbx_stereo_config", rowIdx).upper()
+            bondList.append((indexD[atomId1], indexD[atomId2], order, aromatic == "Y", stereo if stereo in ("E", "Z") else ""))
+    return atomList, bondList
+
+
+def getRingCount(atomList, bondList):
+    """Return the number of independent rings (cycle rank) of the graph"""
+    parentList = list(range(len(atomList)))
+
+    def find(i):
+        while parentList[i] != i:
+            parentList[i] = parentList[parentList[i]]
+            i = parentList[i]
+        return i
+
+    components = len(atomList)
+    for bond in bondList:
+        root1, root2 = find(bond[0]), find(bond[1])
+        if root1 != root2:
+            parentList[root1] = root2
+            components -= 1
+    return len(bondList) - len(atomList) + components
+
+
+def getFingerprintBits(atomList, bondList, nBits=1024, radius=2):
+    """Return the sorted bit positions of a hashed circular (ECFP-like) fingerprint of the graph.
+
+    Atom environments up to radius bonds are hashed with a process independent hash.
+    """
+    neighborList = [[] for _ in atomList]
+    for i, j, order, aromatic, _stereo in bondList:
+        bondType = "ar" if aromatic else order
+        neighborList[i].append((j, bondType))
+        neighborList[j].append((i, bondType))
+    labelList = ["%s|%d|%d|%d" % (element, charge, int(aromatic), len(neighborList[idx])) for idx, (_atomId, element, charge, aromatic, _stereo) in enumerate(atomList)]
+    bitD = {}
+    for _ in range(radius + 1):
+        for label in labelList:
+            bitD[zlib.crc32(label.encode("utf-8")) % nBits] = True
+        labelList = [labelList[idx] + "(" + ",".join(sorted(bondType + labelList[j] for j, bondType in neighborList[idx])) + ")" for idx in range(len(atomList))]
+        labelList = ["%08x" % zlib.crc32(label.encode("utf-8")) for label in labelList]
+    return sorted(bitD)
+
+
+def getGraphHash(atomList, bondList):
+    """Return a hash of the graph computed by Weisfeiler-Lehman refinement.
+
+    Atoms are labelled by element, formal charge, aromatic flag and R/S configuration and bonds by order,
+    aromatic flag and E/Z configuration.  Labels are refined until the number of atom classes no longer
+    grows; the hash covers the multiset of refined atom labels and of labelled bonds, so it does not depend
+    on atom names or on the order of the atom and bond records.  Returns "" if there are no atoms.
+
+    Identical graphs always have the same hash, but the hash is not canonical: some different graphs
+    (e.g. decalin and bicyclopentyl) collide, so equal hashes must be confirmed by a graph match.
+    """
+    if not atomList:
+        return ""
+    neighborList = [[] for _ in atomList]
+    bondLabelList = []
+    for i, j, order, aromatic, stereo in bondList:
+        bondLabel = "%s%s%s" % (order, "a" if aromatic else "", stereo)
+        bondLabelList.append(bondLabel)
+        neighborList[i].append((j, bondLabel))
+        neighborList[j].append((i, bondLabel))
+    labelList = ["%s|%d|%d|%s" % (element, charge, int(aromatic), stereo) for _, element, charge, aromatic, stereo in atomList]
+    classCount = len(set(labelList))
+    for _ in range(len(atomList)):
+        newLabelList = []
+        for idx, label in enumerate(labelList):
+            neighborLabel = ",".join(sorted(bondLabel + ":" + labelList[j] for j, bondLabel in neighborList[idx]))
+            newLabelList.append(hashlib.sha1(("%s(%s)" % (label, neighborLabel)).encode("utf-8")).hexdigest()[:16])
+        labelList = newLabelList
+        newClassCount = len(set(labelList))
+        if newClassCount == classCount:
+            break
+        classCount = newClassCount
+    bondKeyList = ["%s:%s" % (bondLabel, ",".join(sorted((labelList[bond[0]], labelList[bond[1]])))) for bond, bondLabel in zip(bondList, bondLabelList)]
+    hashObj = hashlib.sha256()
+    hashObj.update(("\n".join(sorted(labelList)) + "\n").encode("utf-8"))
+    hashObj.update(("\n".join(sorted(bondKeyList)) + "\n").encode("utf-8"))
+    return hashObj.hexdigest()
+
+
+def _getItem(catObj, itemName, rowIdx):
+    if not catObj.hasAttribute(itemName):
+        return ""
+    value = catObj.getValue(itemName, rowIdx)
+    if value in ("?", "."):
+        return ""
+    return str(value)
@@ -2,6 +2,11 @@
 # File:  ChemEditorBase.py
 # Date:  11-Jul-2019
 # Updates:
+# 18-Oct-2026  agent  share per-site configuration objects through SiteConfigCache
+# 18-Oct-2026  agent  run external tools through ToolRunner (no shell, output captured in memory)
+# 18-Oct-2026  agent  reuse cached annotateComp results (AnnotateCompCache)
+# 18-Oct-2026  agent  reuse annotateComp results for inputs with an unchanged atom and bond graph
+# 18-Oct-2026  agent  submit matchComp searches to the process-wide MatchCompService (memo of matchComp results)
 ##
 """
 
@@ -21,13 +26,25 @@ __email__ = "zfeng@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.07"
 
+import hashlib
 import os
 import sys
+import traceback
 
 from wwpdb.io.cvs.CvsAdmin import CvsSandBoxAdmin
-from wwpdb.io.locator.ChemRefPathInfo import ChemRefPathInfo
-from wwpdb.utils.config.ConfigInfo import ConfigInfo
-from wwpdb.utils.config.ConfigInfoApp import ConfigInfoAppCc, ConfigInfoAppCommon
+
+from wwpdb.apps.chemeditor.webapp.AnnotateCompCache import getAnnotateCompCache
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import (
+    getStructureKey,
+    mergeStructureCategories,
+    readCifFile,
+    writeCifFile,
+)
+from wwpdb.apps.chemeditor.webapp.MatchCompService import getMatchCompService
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+from wwpdb.apps.chemeditor.webapp.ToolRunner import getToolRunner
+
+ANNOTATE_COMP_OPS = "stereo-cactvs|aro-cactvs|descriptor-oe|descriptor-cactvs|descriptor-inchi|name-oe|name-acd|xyz-ideal-corina|xyz-model-h-oe|fix"
 
 
 class ChemEditorBase:
@@ -42,12 +59,15 @@ class ChemEditorBase:
         self._sessionPath = None
         self._rltvSessionPath = None
         self.__siteId = str(self._reqObj.getValue("WWPDB_SITE_ID"))
-        self._cI = ConfigInfo(siteId=self.__siteId, verbose=self._verbose, log=self._lfh)
-        self._cICommon = ConfigInfoAppCommon(siteId=self.__siteId, verbose=self._verbose, log=self._lfh)
-        self._cIAppCc = ConfigInfoAppCc(siteId=self.__siteId, verbose=self._verbose, log=self._lfh)
+        self._siteConfig = getSiteConfig(self.__siteId)
+        self._cI = self._siteConfig.cI
+        self._cICommon = self._siteConfig.cICommon
+        self._cIAppCc = self._siteConfig.cIAppCc
         self.__sbTopPath = self._cIAppCc.get_site_refdata_top_cvs_sb_path()  # "/wwpdb_da/da_top/reference/components"
         self._ccProjectName = self._cI.get("SITE_REFDATA_PROJ_NAME_CC")  # "ligand-dict-v3"
-        self._crpi = ChemRefPathInfo(siteId=self.__siteId, verbose=self._verbose, log=self._lfh)
+        self._crpi = self._siteConfig.crpi
+
+        self._toolRunner = getToolRunner(self.__siteId, verbose=self._verbose, log=self._lfh)
 
         self.__getSession()
         self._cvsAdmin = self.__setupCvs()
@@ -76,86 +96,9 @@ class ChemEditorBase:
             return ""
         return self.getSandBoxFilePath(ccId)
 
-    def _annotBashSetting(self):
-        """ """
-        setting = (
-            " RCSBROOT="
-            + self._cICommon.get_site_annot_tools_path()
-            + "; export RCSBROOT; "
-            + " COMP_PATH="
-            + self._cIAppCc.get_site_cc_cvs_path()
-            + "; export COMP_PATH; "
-            + " BINPATH=${RCSBROOT}/bin; export BINPATH; "
-        )
-        return setting
-
-    def _ccToolsBashSetting(self):
-        """ """
-        setting = (
-            " CC_TOOLS="
-            + os.path.join(self._cICommon.get_site_cc_apps_path(), "bin")
-            + "; export CC_TOOLS; "
-            + " OE_DIR="
-            + self._cICommon.get_site_cc_oe_dir()
-            + "; export OE_DIR; "
-            + " OE_LICENSE="
-            + self._cICommon.get_site_cc_oe_licence()
-            + "; export OE_LICENSE; "
-            + " ACD_DIR="
-            + self._cICommon.get_site_cc_acd_dir()
-            + "; export ACD_DIR; "
-            + " CACTVS_DIR="
-            + self._cICommon.get_site_cc_cactvs_dir()
-            + "; export CACTVS_DIR; "
-            + " CORINA_DIR="
-            + os.path.join(self._cICommon.get_site_cc_corina_dir(), "bin")
-            + "; export CORINA_DIR; "
-            + " BABEL_DIR="
-            + self._cICommon.get_site_cc_babel_dir()
-            + "; export BABEL_DIR; "
-            + " BABEL_DATADIR="
-            + self._cICommon.get_site_cc_babel_datadir()
-            + "; export BABEL_DATADIR; "
-            + " INCHI_DIR="
-            + self._cICommon.get_site_cc_inchi_dir()
-            + "; export INCHI_DIR; "
-            + " LD_LIBRARY_PATH="
-            + self._cICommon.get_site_cc_babel_lib()
-            + ":"
-            + os.path.join(self._cICommon.get_site_local_apps_path(), "lib")
-            + ":"
-            + self._cICommon.get_site_cc_acd_dir()
-            + "; export LD_LIBRARY_PATH; "
-        )
-        return setting
-
-    def _mmcifDictBashSetting(self):
-        """ """
-        setting = (
-            " PDBX_DICT_PATH="
-            + self._cICommon.get_mmcif_dict_path()
-            + "; export PDBX_DICT_PATH; "
-            + " DICT_NAME="
-            + self._cICommon.get_mmcif_archive_next_dict_filename()
-            + "; export DICT_NAME; "
-            + " DICT_CIF_FILE=${PDBX_DICT_PATH}/${DICT_NAME}.dic; export DICT_CIF_FILE; "
-            + " DICT_SDB_FILE=${PDBX_DICT_PATH}/${DICT_NAME}.sdb; export DICT_SDB_FILE; "
-            + " DICT_ODB_FILE=${PDBX_DICT_PATH}/${DICT_NAME}.odb; export DICT_ODB_FILE; "
-        )
-        return setting
-
-    def _ccDictBashSetting(self):
-        """ """
-        setting = []
-        setting.append(f" CC_DICT={self._cIAppCc.get_site_cc_dict_path()}; export CC_DICT; ")
-        setting.append(f" CC_IDX_FILE={self._cIAppCc.get_cc_dict_idx()}; export CC_IDX_FILE; ")
-        setting.append(f" CC_SDB_FILE={self._cIAppCc.get_cc_dict_serial()}; export CC_SDB_FILE; ")
-        return "".join(setting)
-
-    def _runCmd(self, cmd):
-        """ """
-        self._lfh.write("running cmd=%s\n" % cmd)
-        os.system(cmd)  # noqa: S605
+    def _runTool(self, program, args, workingPath, timeout=None):
+        """Run an external tool through the shared ToolRunner and return its ToolResult"""
+        return self._toolRunner.run(program, args, workingPath, timeout=timeout, log=self._lfh)
 
     def _removeFile(self, filePath):
         """ """
@@ -163,19 +106,71 @@ class ChemEditorBase:
             os.remove(filePath)
 
     def _updateCompCif(self, workingPath, inFile):
-        """ """
+        """Replace inFile with its annotated version.  Return True if inFile was annotated."""
         inputFilePath = os.path.join(workingPath, inFile)
         if not os.access(inputFilePath, os.R_OK):
-            return
+            return False
         outputFilePath = os.path.join(workingPath, "out.cif")
         self._removeFile(outputFilePath)
-        self._runCmd(self.__getAnnotateCompCmd(workingPath, inFile, "out.cif"))
-        if os.access(outputFilePath, os.R_OK):
-            try:
-                os.rename(outputFilePath, inputFilePath)
-            except:  # noqa: E722 pylint: disable=bare-except
-                self._removeFile(inputFilePath)
-                os.rename(outputFilePath, inputFilePath)
+        self.__annotateComp(workingPath, inFile, "out.cif")
+        if not os.access(outputFilePath, os.R_OK):
+            return False
+        try:
+            os.rename(outputFilePath, inputFilePath)
+        except:  # noqa: E722 pylint: disable=bare-except
+            self._removeFile(inputFilePath)
+            os.rename(outputFilePath, inputFilePath)
+        return True
+
+    def __annotateComp(self, workingPath, inFile, outFile):
+        """Run annotateComp, reusing the cached result of an identical input file or of an input
+        file with the same atom and bond graph (metadata-only edits)
+        """
+        inputFilePath = os.path.join(workingPath, inFile)
+        outputFilePath = os.path.join(workingPath, outFile)
+        # the key covers the OpenEye/ACD/CACTVS/CORINA installations as well as the annotateComp binary
+        toolVersion = self._toolRunner.getProgramVersion("annotateComp") + self._toolRunner.getToolchainVersion("cc-tools") + ANNOTATE_COMP_OPS
+        cache = getAnnotateCompCache(self._siteConfig.getCachePath("annotate_comp"), verbose=self._verbose, log=self._lfh)
+        cacheKey = cache.getKey(inputFilePath, toolVersion)
+        if cache.get(cacheKey, outputFilePath):
+            return
+        structureCache = getAnnotateCompCache(self._siteConfig.getCachePath("annotate_comp_structure"), verbose=self._verbose, log=self._lfh)
+        structureKey = ""
+        try:
+            myDataList = readCifFile(inputFilePath)
+            structureKey = getStructureKey(myDataList[0])
+        except:  # noqa: E722 pylint: disable=bare-except
+            if self._verbose:
+                traceback.print_exc(file=self._lfh)
+        if structureKey:
+            structureKey = hashlib.sha256((toolVersion + "\0" + structureKey).encode("utf-8")).hexdigest()
+            annotatedFilePath = os.path.join(workingPath, "annotated_structure.cif")
+            if structureCache.get(structureKey, annotatedFilePath):
+                try:
+                    mergeStructureCategories(myDataList[0], readCifFile(annotatedFilePath)[0])
+                    writeCifFile(outputFilePath, myDataList)
+                    cache.put(cacheKey, outputFilePath)
+                    return
+                except:  # noqa: E722 pylint: disable=bare-except
+                    traceback.print_exc(file=self._lfh)
+                    self._removeFile(outputFilePath)
+                finally:
+                    self._removeFile(annotatedFilePath)
+        result = self._runTool("annotateComp", ["-vv", "-i", inFile, "-op", ANNOTATE_COMP_OPS, "-o", outFile], workingPath)
+        if (result.returnCode == 0) and os.access(outputFilePath, os.R_OK):
+            cache.put(cacheKey, outputFilePath)
+            if structureKey:
+                structureCache.put(structureKey, outputFilePath)
+                # edits made to the annotated file are resubmitted with the annotated atom and bond graph
+                try:
+                    outputKey = getStructureKey(readCifFile(outputFilePath)[0])
+                    if outputKey:
+                        outputKey = hashlib.sha256((toolVersion + "\0" + outputKey).encode("utf-8")).hexdigest()
+                        if outputKey != structureKey:
+                            structureCache.put(outputKey, outputFilePath)
+                except:  # noqa: E722 pylint: disable=bare-except
+                    if self._verbose:
+                        traceback.print_exc(file=self._lfh)
 
     def _runMatchComp(self, workingPath, inFile, outFile, option):
         """ """
@@ -184,21 +179,15 @@ class ChemEditorBase:
             return
         outputFilePath = os.path.join(workingPath, outFile)
         self._removeFile(outputFilePath)
-        cmd = (
-            "cd "
-            + workingPath
-            + " ; "
-            + self._ccToolsBashSetting()
-            + self._ccDictBashSetting()
-            + " ${CC_TOOLS}/matchComp -i "
-            + inFile
-            + " -lib ${CC_SDB_FILE} -index ${CC_IDX_FILE} -type structure -o "
-            + outFile
-            + " -op "
-            + option
-            + " > _matchComp_log 2>&1 ; "
-        )
-        self._runCmd(cmd)
+        text = self._submitMatchComp(inputFilePath, option).result()
+        if text:
+            ofh = open(outputFilePath, "w")
+            ofh.write(text)
+            ofh.close()
+
+    def _submitMatchComp(self, inputFilePath, option):
+        """Submit a matchComp search to the MatchCompService and return a Future of the report text"""
+        return getMatchCompService(self.__siteId, log=self._lfh).submit(inputFilePath, option, log=self._lfh)
 
     def _getInputCifData(self, filePath):
         """ """
@@ -229,19 +218,3 @@ class ChemEditorBase:
         cvs.setAuthInfo(user=cvsUsername, password=cvsPassword)
         cvs.setSandBoxTopPath(self.__sbTopPath)
         return cvs
-
-    def __getAnnotateCompCmd(self, workingPath, inFile, outFile):
-        """ """
-        cmd = (
-            "cd "
-            + workingPath
-            + " ; "
-            + self._ccToolsBashSetting()
-            + " ${CC_TOOLS}/annotateComp -vv -i "
-            + inFile
-            + " -op 'stereo-cactvs|aro-cactvs|descriptor-oe|descriptor-cactvs|descriptor-inchi|name-oe|name-acd|xyz-ideal-corina|xyz-model-h-oe|fix' "
-            + " -o "
-            + outFile
-            + " > _comp_log 2>&1 ; "
-        )
-        return cmd
@@ -2,6 +2,14 @@
 # File:  ChemEditorWebApp.py
 # Date:  25-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  use shared per-site configuration snapshot
+# 18-Oct-2026  agent  get_entries_with_ligand accepts ccid lists, count_only and paging
+# 18-Oct-2026  agent  serve get_entries_with_ligand from the shared ligand entry cache
+# 18-Oct-2026  agent  allocate new codes with the locked CcdCodeAllocator
+# 18-Oct-2026  agent  add get_new_codes batch reservation
+# 18-Oct-2026  agent  add get_2d_batch for laying out many molfiles in one request
+# 18-Oct-2026  agent  upload of archives and multi-block CIF files returns a per-component summary
+# 18-Oct-2026  agent  report rejected uploads as an error
 ##
 """
 Chemeditor web request and response processing modules.
@@ -26,24 +34,29 @@ import os
 import sys
 import traceback
 
+from wwpdb.apps.chemeditor.webapp.ArchiveUpload import ArchiveUpload
 from wwpdb.apps.chemeditor.webapp.AtomMatch import AtomMatch
+from wwpdb.apps.chemeditor.webapp.CcdCodeAllocator import getCcdCodeAllocator
 
 # from wwpdb.apps.chemeditor.webapp.ChemCompHash import ChemCompHash
-from wwpdb.apps.chemeditor.webapp.ChemEditorBase import ChemEditorBase
+from wwpdb.apps.chemeditor.webapp.ComponentArchive import isMultiBlockCif
 from wwpdb.apps.chemeditor.webapp.CVSCommit import CVSCommit
 from wwpdb.apps.chemeditor.webapp.DaInternalCombineDb import DaInternalCombineDb
 from wwpdb.apps.chemeditor.webapp.Enumeration import Enumeration
 from wwpdb.apps.chemeditor.webapp.Get2D import Get2D
 from wwpdb.apps.chemeditor.webapp.GetLigand import GetLigand
+from wwpdb.apps.chemeditor.webapp.LigandEntryCache import getLigandEntryCache
 from wwpdb.apps.chemeditor.webapp.SaveLigand import SaveLigand
 from wwpdb.apps.chemeditor.webapp.Search import Search
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
 from wwpdb.apps.chemeditor.webapp.UpdateLigand import UpdateLigand
 from wwpdb.apps.chemeditor.webapp.Upload import Upload
 from wwpdb.io.misc.SendEmail import SendEmail
-from wwpdb.utils.config.ConfigInfo import ConfigInfo
-from wwpdb.utils.config.ConfigInfoApp import ConfigInfoAppCc
 from wwpdb.utils.session.WebRequest import InputRequest, ResponseContent
 
+# Maximum number of codes reserved by one get_new_codes request
+MAX_NEW_CODES = 200
+
 
 def threshold_crossed(pre, post, thresholdList):
     """Returns True if going from pre to post crosses a value in the thresholdList.
@@ -74,7 +87,7 @@ class ChemEditorWebApp:
         self.__lfh = log
         self.__debug = False
         self.__siteId = siteId
-        self.__cI = ConfigInfo(self.__siteId)
+        self.__cI = getSiteConfig(self.__siteId).cI
         self.__topPath = self.__cI.get("SITE_WEB_APPS_TOP_PATH")
 
         if isinstance(parameterDict, dict):
@@ -160,16 +173,18 @@ class ChemEditorWebAppWorker:
         self.__lfh = log
         self.__reqObj = reqObj
         self.__siteId = str(self.__reqObj.getValue("WWPDB_SITE_ID"))
-        self.__cIAppCc = ConfigInfoAppCc(self.__siteId, verbose=verbose, log=log)
+        self.__cIAppCc = getSiteConfig(self.__siteId).cIAppCc
         self.__appPathD = {
             "/service/environment/dump": "_dumpOp",
             "/service/chemeditor/get_2d": "_get2D",
+            "/service/chemeditor/get_2d_batch": "_get2DBatch",
             "/service/chemeditor/upload": "_upLoad",
             "/service/chemeditor/get_ligand": "_getLigand",
             "/service/chemeditor/search": "_searchLigand",
             "/service/chemeditor/atom_match": "_atomMatch",
             "/service/chemeditor/echo_file": "_echoFileDownLoad",
             "/service/chemeditor/get_new_code": "_getNewCode",
+            "/service/chemeditor/get_new_codes": "_getNewCodes",
             "/service/chemeditor/status_code": "_getStatusCode",
             "/service/chemeditor/one_letter_code": "_getOneLetterCode",
             "/service/chemeditor/update": "_updateLigand",
@@ -252,14 +267,45 @@ class ChemEditorWebAppWorker:
             rC.setText(text=textcontent)
         return rC
 
+    def _get2DBatch(self):
+        """Get 2D SDF of each record of a multi-record SDF or a JSON list of molfiles"""
+        if self.__verbose:
+            self.__lfh.write("+ChemEditorWebAppWorker._get2DBatch() Starting now\n")
+        self.__reqObj.setReturnFormat(return_format="json")
+        rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+        classObj = Get2D(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+        try:
+            resultList = classObj.GetBatchResult()
+        except ValueError as e:
+            rC.setError(errMsg=str(e))
+            return rC
+        rC.setData(resultList)
+        return rC
+
     def _upLoad(self):
-        """Get upload file"""
+        """Get upload file.  Archives and multi-block CIF files are processed per component."""
         if self.__verbose:
             self.__lfh.write("+ChemEditorWebAppWorker._upLoad() Starting now\n")
+        classObj = Upload(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+        text = classObj.GetResult()
+        filePath = classObj.getFilePath()
+        if classObj.getError():
+            self.__reqObj.setReturnFormat(return_format="json")
+            rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+            rC.setError(errMsg=classObj.getError())
+            return rC
+        # an upload too large to return to the editor is treated as a set of components
+        if filePath and (classObj.isArchive() or classObj.isTruncated() or isMultiBlockCif(text)):
+            self.__reqObj.setReturnFormat(return_format="json")
+            rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+            try:
+                rC.setData(ArchiveUpload(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh).GetResult(filePath))
+            except ValueError as e:
+                rC.setError(errMsg=str(e))
+            return rC
         self.__reqObj.setReturnFormat(return_format="html")
         rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
-        classObj = Upload(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
-        rC.setHtmlText(classObj.GetResult())
+        rC.setHtmlText(text)
         return rC
 
     def _getLigand(self):
@@ -329,53 +375,51 @@ class ChemEditorWebAppWorker:
         """Get New Ligand ID Code"""
         if self.__verbose:
             self.__lfh.write("+ChemEditorWebAppWorker._getNewCode() Starting now\n")
-        code = self.__getNewCodeFromList()
+        codeList = self.__getNewCodesFromList()
         self.__reqObj.setReturnFormat(return_format="json")
         rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
-        if not code:
+        if not codeList:
             rC.setError(errMsg="failed")
         else:
-            rC.setText(text=code)
+            rC.setText(text=codeList[0])
         return rC
 
-    def __getNewCodeFromList(self):
-        """Get unused Ligand Code from pre-defined list"""
-        cvsUtil = ChemEditorBase(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
-        code = ""
-        filePath = os.path.join(self.__cIAppCc.get_unused_ccd_file())
-        self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodeFromList filePath=%s\n" % filePath)
-        f = open(filePath)
-        data = f.read()
-        f.close()
-        #       cCH = ChemCompHash()
-        idlist = data.split("\n")
-        idx = 0
-        for ccId in idlist:
-            idx += 1
-            #           if cCH.getChemCompIdSite(ccId) != self.__cI.get('SITE_NAME').upper():
-            #               continue
-            #           #
-            component = cvsUtil.getSandBoxFilePath(ccId)
-            if not component:
-                code = ccId
-                break
-        data = "\n".join(idlist[idx:])
-        f = open(filePath, "w")
-        f.write(data)
-        f.close()
+    def _getNewCodes(self):
+        """Reserve count (request parameter) new Ligand ID Codes at once"""
+        if self.__verbose:
+            self.__lfh.write("+ChemEditorWebAppWorker._getNewCodes() Starting now\n")
+        self.__reqObj.setReturnFormat(return_format="json")
+        rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
+        try:
+            count = int(self.__reqObj.getValue("count"))
+        except (TypeError, ValueError):
+            count = 0
+        if (count < 1) or (count > MAX_NEW_CODES):
+            rC.setError(errMsg="count must be between 1 and %d" % MAX_NEW_CODES)
+            return rC
+        codeList = self.__getNewCodesFromList(count)
+        if not codeList:
+            rC.setError(errMsg="failed")
+        else:
+            rC.setData(codeList)
+        return rC
+
+    def __getNewCodesFromList(self, count=1):
+        """Get count unused Ligand Codes from pre-defined list; none unless all count codes are available"""
+        allocator = getCcdCodeAllocator(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+        codeList, presize, postsize = allocator.allocate(count=count, allOrNothing=True)
+        self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodesFromList codes=%s left=%s\n" % (",".join(codeList), postsize))
 
         # Notify if need be
         # Lists of thresholds to notify on
         crossList = [500, 250, 100, 50, 25, 10, 5, 4, 2, 1]
 
-        presize = len(idlist)
-        postsize = presize - idx
         notify = threshold_crossed(presize, postsize, crossList)
         if notify:
-            self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodeFromList threshold notification len=%s\n" % postsize)
+            self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodesFromList threshold notification len=%s\n" % postsize)
             if self.__reqObj.getValue("debug_no_notify"):
                 # Turn off notification
-                self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodeFromList skip threshold notification\n")
+                self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodesFromList skip threshold notification\n")
             else:
                 se = SendEmail(self.__siteId, self.__verbose, self.__lfh)
                 subj = "CCD count warning : ID left = %r" % postsize
@@ -383,10 +427,10 @@ class ChemEditorWebAppWorker:
                 body += f"for siteId {self.__siteId}"
                 status = se.send_system_error(body, subj)
                 if not status:
-                    self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodeFromList failed to send notification\n")
+                    self.__lfh.write("+ChemEditorWebAppWorker.__getNewCodesFromList failed to send notification\n")
 
-        # Notification complete, return code
-        return code
+        # Notification complete, return codes
+        return codeList
 
     def _getStatusCode(self):
         """Check status code for existing chemical component"""
@@ -471,6 +515,10 @@ class ChemEditorWebAppWorker:
     def _getEntriesWithLigands(self):
         """Get depositions containing the requested ligand.
 
+        Request parameters: ccid (one ligand id or a comma separated list), count_only
+        (return the number of entries per ligand), page and page_size (one page of the
+        entries of a single ligand).
+
         Returns:
             ResponseContent: ResponseContent instance wrapping a list
                 of entries
@@ -480,10 +528,43 @@ class ChemEditorWebAppWorker:
         self.__reqObj.setReturnFormat(return_format="json")
         rC = ResponseContent(reqObj=self.__reqObj, verbose=self.__verbose, log=self.__lfh)
 
+        # ccid may be a comma separated list of ligand ids
+        ccIdList = [ccId.strip() for ccId in str(self.__reqObj.getValue("ccid")).split(",") if ccId.strip()]
+        countOnly = str(self.__reqObj.getValue("count_only")).lower() in ("1", "true", "yes", "y")
+        page = self.__reqObj.getValue("page")
+        pageSize = self.__reqObj.getValue("page_size")
+        if page or pageSize:
+            try:
+                page = int(page)
+                pageSize = int(pageSize)
+            except ValueError:
+                page = pageSize = 0
+            if (page < 1) or (pageSize < 1):
+                rC.setError("page and page_size must both be positive integers")
+                return rC
+        cache = None
         try:
-            combine_db = DaInternalCombineDb(siteId=self.__siteId, verbose=True, log=self.__lfh)
-            entries = combine_db.getEntriesWithLigand(self.__reqObj.getValue("ccid"))
+            cache = getLigandEntryCache(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+        except:  # noqa: E722 pylint: disable=bare-except
+            # without the cache every lookup goes to the database
+            self.__lfh.write("+ChemEditorWebAppWorker._getEntriesWithLigands() ligand entry cache not available\n")
+            traceback.print_exc(file=self.__lfh)
+        try:
+            combine_db = DaInternalCombineDb(siteId=self.__siteId, verbose=True, log=self.__lfh, cache=cache)
+            if countOnly:
+                entries = combine_db.countEntriesWithLigands(ccIdList)
+            elif len(ccIdList) > 1:
+                entries = combine_db.getEntriesWithLigands(ccIdList)
+            elif page:
+                entries = combine_db.getEntriesWithLigand(self.__reqObj.getValue("ccid"), page=page, pageSize=pageSize)
+            else:
+                entries = combine_db.getEntriesWithLigand(self.__reqObj.getValue("ccid"))
             rC.setData(entries)
+            if self.__verbose and (cache is not None):
+                statD = cache.getStats()
+                self.__lfh.write(
+                    "+ChemEditorWebAppWorker._getEntriesWithLigands() ligand entry cache hit rate %.2f (%d hits, %d misses)\n" % (statD["hit_rate"], statD["hits"], statD["misses"])
+                )
         except:  # noqa: E722 pylint: disable=bare-except
             rC.setError("Could not open a connection to the database")
         return rC
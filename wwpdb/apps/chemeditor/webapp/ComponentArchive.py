@@ -0,0 +1,158 @@
+##
+# File:  ComponentArchive.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Reading of uploads holding many chemical component definitions.
+
+A zip or tar archive of CIF files, or a single CIF file with several data blocks, is split into
+one CIF text per data block.  Reading is bounded in the number of components and the expanded
+size, so that an archive cannot expand without limit on the server.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import os
+import re
+import tarfile
+import zipfile
+
+# Maximum number of components read from one upload
+MAX_COMPONENTS = 500
+# Default cap on the expanded size of the components read from one upload
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Number of leading bytes needed to recognize an archive (the tar magic is at offset 257)
+ARCHIVE_HEADER_BYTES = 512
+
+_DATA_BLOCK_RE = re.compile(r"^data_(\S*)", re.IGNORECASE)
+
+
+def getArchiveType(data):
+    """Return "zip" or "tar" if the leading bytes data are those of an archive of that type, else None"""
+    if data.startswith(b"PK\x03\x04"):
+        return "zip"
+    if data[257:262] == b"ustar":
+        return "tar"
+    return None
+
+
+def isMultiBlockCif(text):
+    """Return True if the CIF text holds more than one data block"""
+    for count, _match in enumerate(re.finditer(r"^data_", text, re.IGNORECASE | re.MULTILINE), 1):
+        if count > 1:
+            # a data_ line may be inside a text field
+            return len(splitCifBlocks(text)) > 1
+    return False
+
+
+def splitCifBlocks(text):
+    """Split CIF text into [(block name, block text), ...].  Text before the first data block is dropped
+    and data_ lines inside semicolon delimited text fields do not start a block.
+    """
+    blockList = []
+    name = None
+    lineList = []
+    inTextField = False
+    for line in text.splitlines(True):
+        if line.startswith(";"):
+            inTextField = not inTextField
+        elif not inTextField:
+            match = _DATA_BLOCK_RE.match(line)
+            if match:
+                if name is not None:
+                    blockList.append((name, "".join(lineList)))
+                name = match.group(1)
+                lineList = []
+        if name is not None:
+            lineList.append(line)
+    if name is not None:
+        blockList.append((name, "".join(lineList)))
+    return blockList
+
+
+def readComponents(filePath, maxBytes=DEFAULT_MAX_BYTES, maxComponents=MAX_COMPONENTS):
+    """Return the components of the zip or tar archive or CIF file filePath as
+    [(source file name, block name, CIF text), ...] in file and block order.
+
+    Only the .cif members of archives are read.  Raises ValueError for a corrupt archive, or if the
+    upload holds more than maxComponents components or expands to more than maxBytes bytes.
+    """
+    ifh = open(filePath, "rb")
+    header = ifh.read(ARCHIVE_HEADER_BYTES)
+    ifh.close()
+    archiveType = getArchiveType(header)
+    if archiveType is not None:
+        try:
+            if archiveType == "zip":
+                memberList = _readZipMembers(filePath, maxBytes)
+            else:
+                memberList = _readTarMembers(filePath, maxBytes)
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+            raise ValueError("corrupt %s archive: %s" % (archiveType, str(e))) from e
+    else:
+        if os.path.getsize(filePath) > maxBytes:
+            raise ValueError("upload exceeds %d bytes" % maxBytes)
+        ifh = open(filePath, "rb")
+        memberList = [(os.path.basename(filePath), ifh.read())]
+        ifh.close()
+    componentList = []
+    for source, data in memberList:
+        for name, text in splitCifBlocks(data.decode("utf-8", "replace")):
+            componentList.append((source, name, text))
+            if len(componentList) > maxComponents:
+                raise ValueError("upload holds more than %d components" % maxComponents)
+    return componentList
+
+
+def _isComponentMember(name):
+    """Skip directories, non-CIF and hidden members (e.g. __MACOSX/ resource forks)"""
+    if name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+        return False
+    return name.lower().endswith(".cif")
+
+
+def _readZipMembers(filePath, maxBytes):
+    memberList = []
+    remaining = maxBytes
+    zf = zipfile.ZipFile(filePath)
+    try:
+        for info in zf.infolist():
+            if info.is_dir() or (not _isComponentMember(info.filename)):
+                continue
+            # file_size is the declared size; the read limit guards against a false declaration
+            if info.file_size > remaining:
+                raise ValueError("archive expands to more than %d bytes" % maxBytes)
+            ifh = zf.open(info)
+            data = ifh.read(remaining + 1)
+            ifh.close()
+            remaining -= len(data)
+            if remaining < 0:
+                raise ValueError("archive expands to more than %d bytes" % maxBytes)
+            memberList.append((info.filename, data))
+    finally:
+        zf.close()
+    return memberList
+
+
+def _readTarMembers(filePath, maxBytes):
+    memberList = []
+    remaining = maxBytes
+    tf = tarfile.open(filePath)
+    try:
+        for member in tf:
+            if (not member.isfile()) or (not _isComponentMember(member.name)):
+                continue
+            if member.size > remaining:
+                raise ValueError("archive expands to more than %d bytes" % maxBytes)
+            ifh = tf.extractfile(member)
+            data = ifh.read()
+            ifh.close()
+            remaining -= len(data)
+            memberList.append((member.name, data))
+    finally:
+        tf.close()
+    return memberList
@@ -1,5 +1,7 @@
 import sys
 
+from MySQLdb.cursors import SSCursor
+
 from wwpdb.apps.chemeditor.webapp.Utils import setupLog
 from wwpdb.utils.db.MyConnectionBase import MyConnectionBase
 
@@ -9,11 +11,19 @@ class ConnectError(Exception):
 
 
 class DaInternalCombineDb:
-    def __init__(self, siteId=None, verbose=False, log=sys.stderr):
+
+    def __init__(self, siteId=None, verbose=False, log=sys.stderr, cache=None):
+        """
+        Args:
+            cache (LigandEntryCache, optional): cache of ligand entry lookups. The database
+                connection is only opened when a lookup is not answered by the cache
+        """
         self._mydb = None
         self._siteId = siteId
+        self._cache = cache
         self.logger = setupLog(verbose, log)
-        self._open()
+        if cache is None:
+            self._open()
 
     def __enter__(self):
         return self
@@ -42,33 +52,49 @@ class DaInternalCombineDb:
 
         return True
 
+    def _getDb(self):
+        if self._mydb is None:
+            self._open()
+        return self._mydb
+
     def _close(self):
         if self._mydb:
             self._mydb.closeConnection()
             self._mydb = None
 
-    def getEntriesWithLigand(self, ccId):
+    def getEntriesWithLigand(self, ccId, page=None, pageSize=None):
         """Get entries in pdbx_entity_nonpoly table that
         have a given ligand.
 
         Args:
             ccId (str): ligand id
+            page (int, optional): 1-based page number. If given together with
+                pageSize, only that page of the entries ordered by dep id is returned
+            pageSize (int, optional): number of entries per page
 
         Returns:
             list: list containing entries (dep ids) containing the ligid
         """
-        query = "select Structure_ID from pdbx_entity_nonpoly where comp_id = %s"
+        paged = (page is not None) and bool(pageSize)
+        if (not paged) and (self._cache is not None):
+            depIds = self._cache.get(ccId)
+            if depIds is not None:
+                self.logger.debug("cached entries with ligand %s", ccId)
+                return depIds
+
+        if paged:
+            query = "select Structure_ID from pdbx_entity_nonpoly where comp_id = %s order by Structure_ID limit %s offset %s"
+            params = (ccId, int(pageSize), (int(page) - 1) * int(pageSize))
+        else:
+            query = "select Structure_ID from pdbx_entity_nonpoly where comp_id = %s"
+            params = (ccId,)
 
         self.logger.debug("querying entries with ligand %s", ccId)
 
         depIds = []
 
-        if self._mydb is None:
-            msg = "Error opening connection to database"
-            raise ConnectError(msg)
-
-        cursor = self._mydb.getCursor()
-        cursor.execute(query, (ccId,))
+        cursor = self._getDb().getCursor()
+        cursor.execute(query, params)
 
         rows = cursor.fetchall()
 
@@ -77,4 +103,81 @@ class DaInternalCombineDb:
         for r in rows:
             depIds.append(r[0])
 
+        if (not paged) and (self._cache is not None):
+            self._cache.put(ccId, depIds)
+
         return depIds
+
+    def getEntriesWithLigands(self, ccIdList, pageSize=1000):
+        """Get the entries that have each of a list of ligands with a single query.
+
+        Args:
+            ccIdList (list): ligand ids
+            pageSize (int): number of rows fetched from the server at a time
+
+        Returns:
+            dict: ligand id -> list of entries (dep ids) containing the ligand
+        """
+        resultD = {}
+        queryIdList = []
+        for ccId in ccIdList:
+            depIds = self._cache.get(ccId) if self._cache is not None else None
+            if depIds is None:
+                resultD[ccId] = []
+                queryIdList.append(ccId)
+            else:
+                resultD[ccId] = depIds
+        if not queryIdList:
+            return resultD
+        keyD = {ccId.upper(): ccId for ccId in queryIdList}
+        query = "select comp_id, Structure_ID from pdbx_entity_nonpoly where comp_id in (%s)" % ",".join(["%s"] * len(queryIdList))
+        for compId, depId in self.__streamRows(query, tuple(queryIdList), pageSize):
+            resultD[keyD.get(compId.upper(), compId)].append(depId)
+        self.logger.info("got entries with ligands %s", ",".join(queryIdList))
+        if self._cache is not None:
+            for ccId in queryIdList:
+                self._cache.put(ccId, resultD[ccId])
+        return resultD
+
+    def countEntriesWithLigands(self, ccIdList):
+        """Count the entries that have each of a list of ligands.
+
+        Args:
+            ccIdList (list): ligand ids
+
+        Returns:
+            dict: ligand id -> number of entries containing the ligand
+        """
+        resultD = {}
+        queryIdList = []
+        for ccId in ccIdList:
+            depIds = self._cache.get(ccId) if self._cache is not None else None
+            if depIds is None:
+                resultD[ccId] = 0
+                queryIdList.append(ccId)
+            else:
+                resultD[ccId] = len(depIds)
+        if not queryIdList:
+            return resultD
+        keyD = {ccId.upper(): ccId for ccId in queryIdList}
+        query = "select comp_id, count(*) from pdbx_entity_nonpoly where comp_id in (%s) group by comp_id" % ",".join(["%s"] * len(queryIdList))
+
+        cursor = self._getDb().getCursor()
+        cursor.execute(query, tuple(queryIdList))
+        for compId, count in cursor.fetchall():
+            resultD[keyD.get(compId.upper(), compId)] = int(count)
+        cursor.close()
+        return resultD
+
+    def __streamRows(self, query, params, pageSize):
+        """Execute query on a server-side cursor and yield its rows, fetching pageSize rows at a time"""
+        cursor = self._getDb().getConnection().cursor(SSCursor)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(pageSize)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
@@ -2,6 +2,7 @@
 # File:  Enumeration.py
 # Date:  29-Aug-2020
 # Updates:
+# 18-Oct-2026  agent  run GetEnumeration_json through ToolRunner
 ##
 """
 
@@ -55,16 +56,8 @@ class Enumeration(ChemEditorBase):
         """Run getting Enumeration program"""
         jsonFilePath = os.path.join(self._sessionPath, "enumeration.json")
         self._removeFile(jsonFilePath)
-        cmd = (
-            "cd "
-            + self._sessionPath
-            + " ; "
-            + self._annotBashSetting()
-            + " ${BINPATH}/GetEnumeration_json -input "
-            + self.__cif_items
-            + " -output enumeration.json > get_enumeration.log 2>&1 ; "
-        )
-        self._runCmd(cmd)
+        args = ["-input"] + self.__cif_items.split() + ["-output", "enumeration.json"]
+        self._runTool("GetEnumeration_json", args, self._sessionPath)
         retD = {}
         if os.access(jsonFilePath, os.R_OK):
             try:
@@ -0,0 +1,34 @@
+##
+# File:  FileLock.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Exclusive inter-process lock on a lock file, shared by the file-backed indexes and pools.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import fcntl
+import os
+
+
+class FileLock:
+    """Exclusive inter-process lock held on lockFilePath (fcntl.flock), used as a context manager"""
+
+    def __init__(self, lockFilePath):
+        self.__lockFilePath = lockFilePath
+        self.__fd = None
+
+    def __enter__(self):
+        self.__fd = os.open(self.__lockFilePath, os.O_RDWR | os.O_CREAT, 0o664)
+        fcntl.flock(self.__fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        os.close(self.__fd)
+        self.__fd = None
@@ -2,6 +2,11 @@
 # File:  Get2D.py
 # Date:  25-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  use shared per-site configuration snapshot
+# 18-Oct-2026  agent  lay out with the persistent CactvsPool, keeping the script as fallback
+# 18-Oct-2026  agent  cache results in LayoutCache; the session is only joined for the script fallback
+# 18-Oct-2026  agent  add GetBatchResult for multi-record SDF and JSON molfile lists
+# 18-Oct-2026  agent  clear files of earlier script runs from the session; do not cache script results
 ##
 """
 
@@ -19,12 +24,19 @@ __docformat__ = "restructuredtext en"
 __author__ = "Zukang Feng"
 __email__ = "zfeng@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
-__version__ = "V0.07"
+__version__ = "V0.08"
 
+import glob
+import json
 import os
 import sys
 
-from wwpdb.utils.config.ConfigInfoApp import ConfigInfoAppCommon
+from wwpdb.apps.chemeditor.webapp.CactvsPool import CactvsError, getCactvsPool
+from wwpdb.apps.chemeditor.webapp.LayoutCache import getLayoutCache, splitSdf
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Maximum number of records laid out by one batch request
+MAX_BATCH_RECORDS = 500
 
 
 class Get2D:
@@ -39,8 +51,7 @@ class Get2D:
         self.__sessionPath = None
         # self.__rltvSessionPath = None
         self.__siteId = str(self.__reqObj.getValue("WWPDB_SITE_ID"))
-        self.__cICommon = ConfigInfoAppCommon(self.__siteId)
-        self.__getSession()
+        self.__cICommon = getSiteConfig(self.__siteId).cICommon
 
     def __getSession(self):
         """Join existing session or create new session as required."""
@@ -54,36 +65,121 @@ class Get2D:
             self.__lfh.write("+Get2D.__getSession() - session path %s\n" % self.__sessionPath)
 
     def GetResult(self):
-        self.__getInputSdfData()
-        self.__getCACTVSScript()
-        self.__runCACTVSScript()
-        return self.__returnSdfData()
-
-    def __getInputSdfData(self):
         sdf = self.__reqObj.getValue("sdf")
-        filePath = os.path.join(self.__sessionPath, "in.sdf")
-        f = open(filePath, "w")
-        f.write(sdf + "\n")
-        f.close()
+        hflag = str(self.__reqObj.getValue("hflag")) == "yes"
+        # cached results skip the session directory and the CACTVS run
+        cache = getLayoutCache(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+        key = cache.getKey(sdf, hflag, toolVersion=self.__cICommon.get_site_cc_cactvs_dir())
+        result = cache.get(key)
+        if result is None:
+            result = self.__layout(sdf, hflag)
+            if result is None:
+                # results of the script fallback are not cached
+                result = self.__runScript([sdf], hflag)[0]
+            else:
+                cache.put(key, result)
+        return result
+
+    def GetBatchResult(self):
+        """Return the 2D SDF of each record of the multi-record SDF (request parameter sdf) or of the
+        JSON list of molfiles (request parameter molfiles), in order.  Failed records are empty.
+        Raises ValueError for malformed or oversized input.
+        """
+        molfiles = self.__reqObj.getValue("molfiles")
+        if molfiles:
+            try:
+                sdfList = json.loads(molfiles)
+            except ValueError as e:
+                raise ValueError("molfiles is not a JSON list") from e
+            if (not isinstance(sdfList, list)) or (not all(isinstance(sdf, str) for sdf in sdfList)):
+                raise ValueError("molfiles is not a JSON list of strings")
+        else:
+            sdfList = splitSdf(self.__reqObj.getValue("sdf"))
+        if not sdfList:
+            raise ValueError("no records")
+        if len(sdfList) > MAX_BATCH_RECORDS:
+            raise ValueError("at most %d records per request" % MAX_BATCH_RECORDS)
+        hflag = str(self.__reqObj.getValue("hflag")) == "yes"
+        cache = getLayoutCache(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+        toolVersion = self.__cICommon.get_site_cc_cactvs_dir()
+        keyList = [cache.getKey(sdf, hflag, toolVersion=toolVersion) for sdf in sdfList]
+        resultList = [cache.get(key) for key in keyList]
+        missList = [i for i, result in enumerate(resultList) if result is None]
+        if missList:
+            try:
+                pool = getCactvsPool(self.__siteId, verbose=self.__verbose, log=self.__lfh)
+                layoutList = pool.layoutMany([sdf + "\n" for sdf in (sdfList[i] for i in missList)], hflag=hflag)
+            except (CactvsError, OSError) as e:
+                self.__lfh.write("+Get2D.GetBatchResult() interpreter pool failed (%s) - running script\n" % str(e))
+                layoutList = [None] * len(missList)
+            # records the pool could not lay out are run together in one script session
+            failList = [j for j, result in enumerate(layoutList) if result is None]
+            if failList:
+                for j, result in zip(failList, self.__runScript([sdfList[missList[j]] for j in failList], hflag)):
+                    layoutList[j] = result
+            failD = dict.fromkeys(failList, True)
+            for j, i in enumerate(missList):
+                resultList[i] = layoutList[j]
+                # results of the script fallback are not cached
+                if j not in failD:
+                    cache.put(keyList[i], layoutList[j])
+        if self.__verbose:
+            self.__lfh.write("+Get2D.GetBatchResult() %d records, %d laid out, %d cached\n" % (len(sdfList), len(missList), len(sdfList) - len(missList)))
+        return resultList
+
+    def __layout(self, sdf, hflag):
+        """Lay out sdf with the interpreter pool.  Returns None if the pool failed."""
+        try:
+            return getCactvsPool(self.__siteId, verbose=self.__verbose, log=self.__lfh).layout(sdf + "\n", hflag=hflag)
+        except (CactvsError, OSError) as e:
+            self.__lfh.write("+Get2D.GetResult() interpreter pool failed (%s) - running script\n" % str(e))
+        return None
+
+    def __runScript(self, sdfList, hflag):
+        """Lay out the molfiles of sdfList in one csts session and return their 2D SDF in order"""
+        self.__getSession()
+        self.__clearSdfData()
+        self.__getInputSdfData(sdfList)
+        self.__getCACTVSScript(len(sdfList), hflag)
+        self.__runCACTVSScript()
+        return [self.__returnSdfData(i) for i in range(len(sdfList))]
+
+    def __clearSdfData(self):
+        """Remove the in_/out_ files of earlier runs in the session, so no record gets a stale result"""
+        for filePath in glob.glob(os.path.join(self.__sessionPath, "in_*.sdf")) + glob.glob(os.path.join(self.__sessionPath, "out_*.sdf")):
+            os.remove(filePath)
+
+    def __getInputSdfData(self, sdfList):
+        for i, sdf in enumerate(sdfList):
+            filePath = os.path.join(self.__sessionPath, "in_%d.sdf" % i)
+            f = open(filePath, "w")
+            f.write(sdf + "\n")
+            f.close()
 
-    def __getCACTVSScript(self):
-        hflag = str(self.__reqObj.getValue("hflag"))
+    def __getCACTVSScript(self, count, hflag):
         filePath = os.path.join(self.__sessionPath, "script")
         f = open(filePath, "w")
-        f.write("set ehandle [molfile read in.sdf]\n")
-        if hflag == "yes":
-            f.write("ens hadd $ehandle\n")
-        f.write("ens need $ehandle E_NATOMS recalc\n")
-        f.write("ens lock $ehandle E_NATOMS\n")
-        f.write("ens need $ehandle {A_SYMBOL A_FREE_ELECTRONS A_XY A_ELEMENT} nofunc\n")
-        f.write("ens lock $ehandle {E_STDBLE A_ELEMENT A_NOM_CHARGE A_CIPSTEREO A_DLSTEREO B_CIPSTEREO B_CTSTEREO}\n")
-        f.write("ens need $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO} recalc\n")
-        f.write("ens lock $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO}\n")
-        f.write("ens need $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO} recalc\n")
-        f.write("ens lock $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO}\n")
-        f.write("set whandle [molfile open out.sdf w format sdf valencelevel 1]\n")
-        f.write("molfile write $whandle $ehandle\n")
-        f.write("molfile close $whandle\n")
+        f.write("for {set i 0} {$i < %d} {incr i} {\n" % count)
+        f.write("    if {[catch {\n")
+        f.write("        set ehandle [molfile read in_$i.sdf]\n")
+        if hflag:
+            f.write("        ens hadd $ehandle\n")
+        f.write("        ens need $ehandle E_NATOMS recalc\n")
+        f.write("        ens lock $ehandle E_NATOMS\n")
+        f.write("        ens need $ehandle {A_SYMBOL A_FREE_ELECTRONS A_XY A_ELEMENT} nofunc\n")
+        f.write("        ens lock $ehandle {E_STDBLE A_ELEMENT A_NOM_CHARGE A_CIPSTEREO A_DLSTEREO B_CIPSTEREO B_CTSTEREO}\n")
+        f.write("        ens need $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO} recalc\n")
+        f.write("        ens lock $ehandle {A_LABSTEREO A_CIPSTEREO A_DLSTEREO}\n")
+        f.write("        ens need $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO} recalc\n")
+        f.write("        ens lock $ehandle {B_LABSTEREO B_CIPSTEREO B_CTSTEREO}\n")
+        f.write("        set whandle [molfile open out_$i.sdf w format sdf valencelevel 1]\n")
+        f.write("        molfile write $whandle $ehandle\n")
+        f.write("        molfile close $whandle\n")
+        f.write("        ens delete $ehandle\n")
+        f.write("    } msg]} {\n")
+        f.write('        puts stderr "record $i: $msg"\n')
+        f.write("    }\n")
+        f.write("}\n")
         f.close()
 
     def __runCACTVSScript(self):
@@ -98,9 +194,9 @@ class Get2D:
         cmd = "cd " + self.__sessionPath + "; chmod 755 get2d.csh; ./get2d.csh"
         os.system(cmd)  # noqa: S605
 
-    def __returnSdfData(self):
+    def __returnSdfData(self, i):
         data = ""
-        filePath = os.path.join(self.__sessionPath, "out.sdf")
+        filePath = os.path.join(self.__sessionPath, "out_%d.sdf" % i)
         if os.access(filePath, os.R_OK):
             f = open(filePath)
             data = f.read()
@@ -0,0 +1,189 @@
+##
+# File:  LayoutCache.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Cache of 2D layout (Get2D) results.
+
+Entries are keyed by a hash of the normalized input molfile/SDF, the hydrogen option and the
+CACTVS installation.  Recent results are held in a bounded in-memory LRU; they are optionally
+shared between worker processes through a size-bounded cache directory whose least recently
+used entries are evicted first.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Number of results held in memory
+DEFAULT_MAX_ENTRIES = 1024
+# Size bound of the shared cache directory
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_cacheD = {}
+_cacheLock = threading.Lock()
+
+
+class LayoutCache:
+    """LRU cache of 2D SDF results, held in memory and in cachePath if given."""
+
+    def __init__(self, cachePath=None, maxEntries=DEFAULT_MAX_ENTRIES, maxBytes=DEFAULT_MAX_BYTES, verbose=False, log=sys.stderr):
+        self.__cachePath = cachePath
+        self.__maxEntries = maxEntries
+        self.__maxBytes = maxBytes
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__resultD = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__putCount = 0
+
+    def getKey(self, sdf, hflag, toolVersion=""):
+        """Return the cache key of the molfile/SDF text sdf laid out with hydrogen option hflag by toolVersion"""
+        hashObj = hashlib.sha256()
+        hashObj.update(toolVersion.encode("utf-8"))
+        hashObj.update(b"\0")
+        hashObj.update(b"H" if hflag else b"-")
+        hashObj.update(b"\0")
+        hashObj.update(normalizeSdf(sdf).encode("utf-8"))
+        return hashObj.hexdigest()
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self.__lock:
+            result = self.__resultD.get(key)
+            if result is not None:
+                self.__resultD.move_to_end(key)
+        if (result is None) and self.__cachePath:
+            entryPath = self.__getEntryPath(key)
+            try:
+                ifh = open(entryPath)
+                result = ifh.read()
+                ifh.close()
+                # mark as recently used
+                os.utime(entryPath, None)
+                self.__remember(key, result)
+            except OSError:
+                result = None
+        with self.__lock:
+            if result is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+        if self.__verbose:
+            self.__lfh.write("+LayoutCache.get() %s %s\n" % (key, "miss" if result is None else "hit"))
+        return result
+
+    def put(self, key, result):
+        """Store result under key"""
+        if not result:
+            return
+        self.__remember(key, result)
+        if not self.__cachePath:
+            return
+        try:
+            fd, tmpPath = tempfile.mkstemp(dir=self.__cachePath, prefix=".tmp_")
+            ofh = os.fdopen(fd, "w")
+            ofh.write(result)
+            ofh.close()
+            os.replace(tmpPath, self.__getEntryPath(key))
+        except OSError as e:
+            self.__lfh.write("+LayoutCache.put() failed storing %s: %s\n" % (key, str(e)))
+            return
+        with self.__lock:
+            self.__putCount += 1
+            evict = self.__putCount % 64 == 0
+        if evict:
+            self.__evict()
+
+    def getStats(self):
+        """Return hit and miss counts of this process"""
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses, "size": len(self.__resultD)}
+
+    def __remember(self, key, result):
+        with self.__lock:
+            self.__resultD[key] = result
+            self.__resultD.move_to_end(key)
+            while len(self.__resultD) > self.__maxEntries:
+                self.__resultD.popitem(last=False)
+
+    def __getEntryPath(self, key):
+        return os.path.join(self.__cachePath, key + ".sdf")
+
+    def __evict(self):
+        """Remove least recently used entries until the cache directory fits in maxBytes"""
+        entryList = []
+        totalBytes = 0
+        try:
+            for entry in os.scandir(self.__cachePath):
+                if (not entry.name.endswith(".sdf")) or (not entry.is_file()):
+                    continue
+                st = entry.stat()
+                entryList.append((st.st_mtime, st.st_size, entry.path))
+                totalBytes += st.st_size
+        except OSError:
+            return
+        if totalBytes <= self.__maxBytes:
+            return
+        entryList.sort()
+        for _mtime, size, path in entryList:
+            try:
+                os.remove(path)
+                totalBytes -= size
+            except OSError:
+                pass
+            if totalBytes <= self.__maxBytes:
+                break
+
+
+def normalizeSdf(sdf):
+    """Normalize line endings, trailing white space and trailing blank lines of molfile/SDF text.
+    Blank lines inside a record are kept: they are significant in the molfile header.
+    """
+    lines = [line.rstrip() for line in sdf.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    while lines and (not lines[-1]):
+        lines.pop()
+    return "\n".join(lines)
+
+
+def splitSdf(sdf):
+    """Split multi-record SDF text into its records, each without the $$$$ delimiter line.
+    Text without a delimiter is returned as a single record; empty records are dropped.
+    """
+    recordList = []
+    lineList = []
+    for line in sdf.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if line.rstrip() == "$$$$":
+            recordList.append("\n".join(lineList))
+            lineList = []
+        else:
+            lineList.append(line)
+    recordList.append("\n".join(lineList))
+    return [record for record in recordList if record.strip()]
+
+
+def getLayoutCache(siteId, shared=True, verbose=False, log=sys.stderr):
+    """Return the process-wide LayoutCache for siteId, backed by the site cache directory if shared"""
+    cachePath = getSiteConfig(siteId).getCachePath("layout_2d") if shared else None
+    key = (siteId, cachePath)
+    cache = _cacheD.get(key)
+    if cache is None:
+        with _cacheLock:
+            cache = _cacheD.get(key)
+            if cache is None:
+                cache = LayoutCache(cachePath, verbose=verbose, log=log)
+                _cacheD[key] = cache
+    return cache
@@ -0,0 +1,186 @@
+##
+# File:  LigandEntryCache.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Shared cache of ligand id -> deposition entries lookups.
+
+Results of DaInternalCombineDb.getEntriesWithLigand are kept in a site-wide SQLite database, so
+that every worker process of the web application answers repeated lookups without opening a
+DA_INTERNAL_COMBINE connection.  Entries expire after a time-to-live, the least recently used
+entries are dropped beyond a maximum size, and hit/miss counters are kept with the entries.
+A lookup only reads the database; the counters and last-used times are kept in memory and
+written in one transaction every FLUSH_COUNT lookups or FLUSH_INTERVAL seconds.  Database
+errors are logged and treated as cache misses.
+
+Loaders expire the entries of ligands they have changed with invalidate(), or from the command line:
+
+    python -m wwpdb.apps.chemeditor.webapp.LigandEntryCache <siteId> [ccId ...]
+
+Without ccIds every entry is expired.  The hit rate is reported in both cases.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Seconds a lookup result is reused
+DEFAULT_TTL = 3600.0
+# Number of ligands kept in the cache
+DEFAULT_MAX_ENTRIES = 10000
+# Number of lookups after which counters and last-used times are written to the database
+FLUSH_COUNT = 256
+# Seconds after which counters and last-used times are written to the database
+FLUSH_INTERVAL = 60.0
+
+_cacheD = {}
+_cacheLock = threading.Lock()
+
+
+class LigandEntryCache:
+    """TTL and size bounded ligand id -> entry list cache stored in the SQLite database dbPath."""
+
+    def __init__(self, dbPath, ttl=DEFAULT_TTL, maxEntries=DEFAULT_MAX_ENTRIES, verbose=False, log=sys.stderr):
+        self.__dbPath = dbPath
+        self.__ttl = ttl
+        self.__maxEntries = maxEntries
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        # pending counters and last-used times, written by __flush()
+        self.__hits = 0
+        self.__misses = 0
+        self.__usedD = {}
+        self.__flushTime = time.time()
+        self.__con = sqlite3.connect(dbPath, timeout=30.0, check_same_thread=False)
+        with self.__lock:
+            self.__con.execute("PRAGMA journal_mode=WAL")
+            self.__con.execute("CREATE TABLE IF NOT EXISTS ligand_entries (comp_id TEXT PRIMARY KEY, entries TEXT, created REAL, last_used REAL)")
+            self.__con.execute("CREATE TABLE IF NOT EXISTS ligand_entries_stats (name TEXT PRIMARY KEY, count INTEGER)")
+            self.__con.execute("INSERT OR IGNORE INTO ligand_entries_stats (name, count) VALUES ('hits', 0), ('misses', 0)")
+            self.__con.commit()
+
+    def get(self, ccId):
+        """Return the cached entry list of ccId, or None if it is not cached or has expired"""
+        ccId = ccId.upper()
+        now = time.time()
+        with self.__lock:
+            try:
+                row = self.__con.execute("SELECT entries FROM ligand_entries WHERE comp_id = ? AND created > ?", (ccId, now - self.__ttl)).fetchone()
+            except sqlite3.Error as e:
+                self.__lfh.write("+LigandEntryCache.get() lookup of %s failed: %s\n" % (ccId, str(e)))
+                row = None
+            if row is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__usedD[ccId] = now
+            if (self.__hits + self.__misses >= FLUSH_COUNT) or (now - self.__flushTime >= FLUSH_INTERVAL):
+                self.__flush()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, ccId, entryList):
+        """Store the entry list of ccId, dropping expired and least recently used entries beyond the maximum size"""
+        now = time.time()
+        with self.__lock:
+            # pending last-used times decide which entries are dropped
+            self.__flush()
+            try:
+                self.__con.execute(
+                    "INSERT OR REPLACE INTO ligand_entries (comp_id, entries, created, last_used) VALUES (?, ?, ?, ?)",
+                    (ccId.upper(), json.dumps(list(entryList)), now, now),
+                )
+                self.__con.execute("DELETE FROM ligand_entries WHERE created <= ?", (now - self.__ttl,))
+                self.__con.execute(
+                    "DELETE FROM ligand_entries WHERE comp_id NOT IN (SELECT comp_id FROM ligand_entries ORDER BY last_used DESC LIMIT ?)",
+                    (self.__maxEntries,),
+                )
+                self.__con.commit()
+            except sqlite3.Error as e:
+                self.__con.rollback()
+                self.__lfh.write("+LigandEntryCache.put() store of %s failed: %s\n" % (ccId, str(e)))
+
+    def invalidate(self, ccId):
+        """Expire the cached entry list of ccId"""
+        with self.__lock:
+            self.__con.execute("DELETE FROM ligand_entries WHERE comp_id = ?", (ccId.upper(),))
+            self.__con.commit()
+
+    def clear(self):
+        """Expire every cached entry list"""
+        with self.__lock:
+            self.__con.execute("DELETE FROM ligand_entries")
+            self.__con.commit()
+
+    def flush(self):
+        """Write the pending hit/miss counters and last-used times to the database"""
+        with self.__lock:
+            self.__flush()
+
+    def getStats(self):
+        """Return a dictionary with the hits, misses, hit rate and number of cached ligands"""
+        with self.__lock:
+            self.__flush()
+            countD = dict(self.__con.execute("SELECT name, count FROM ligand_entries_stats").fetchall())
+            size = self.__con.execute("SELECT COUNT(*) FROM ligand_entries").fetchone()[0]
+        hits = countD.get("hits", 0)
+        misses = countD.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": float(hits) / (hits + misses) if (hits + misses) else 0.0,
+            "size": size,
+        }
+
+    def __flush(self):
+        """Write the pending counters and last-used times in one transaction (called with the lock held)"""
+        if (not self.__hits) and (not self.__misses):
+            return
+        try:
+            self.__con.executemany("UPDATE ligand_entries_stats SET count = count + ? WHERE name = ?", ((self.__hits, "hits"), (self.__misses, "misses")))
+            self.__con.executemany("UPDATE ligand_entries SET last_used = MAX(last_used, ?) WHERE comp_id = ?", [(used, ccId) for ccId, used in self.__usedD.items()])
+            self.__con.commit()
+        except sqlite3.Error as e:
+            self.__con.rollback()
+            self.__lfh.write("+LigandEntryCache.__flush() failed: %s\n" % str(e))
+        self.__hits = 0
+        self.__misses = 0
+        self.__usedD = {}
+        self.__flushTime = time.time()
+
+
+def getLigandEntryCache(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide LigandEntryCache for siteId"""
+    dbPath = os.path.join(getSiteConfig(siteId).getCachePath("ligand_entries"), "ligand_entries.sqlite")
+    cache = _cacheD.get(dbPath)
+    if cache is None:
+        with _cacheLock:
+            cache = _cacheD.get(dbPath)
+            if cache is None:
+                cache = LigandEntryCache(dbPath, verbose=verbose, log=log)
+                _cacheD[dbPath] = cache
+    return cache
+
+
+if __name__ == "__main__":
+    siteId_ = sys.argv[1] if len(sys.argv) > 1 else os.getenv("WWPDB_SITE_ID")
+    cache_ = getLigandEntryCache(siteId_)
+    if len(sys.argv) > 2:
+        for ccId_ in sys.argv[2:]:
+            cache_.invalidate(ccId_)
+    else:
+        cache_.clear()
+    sys.stdout.write("%s\n" % json.dumps(cache_.getStats()))
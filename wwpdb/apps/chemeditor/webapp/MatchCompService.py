@@ -0,0 +1,166 @@
+##
+# File:  MatchCompService.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Process-wide memo of matchComp search results.
+
+matchComp has no resident mode, so every search that is not memoized still starts a matchComp
+process which loads the chemical component dictionary library.  Searches are run in private
+scratch directories by a bounded pool of threads, which caps the number of concurrent matchComp
+processes.  Results are memoized per library version and per input, so a repeated search of the
+same definition (e.g. a resubmitted or re-searched component) returns the earlier report without
+running matchComp.  The memoized results are discarded when the serialized library or its index
+changes.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.08"
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from wwpdb.apps.chemeditor.webapp.ToolRunner import getToolRunner
+
+# Number of concurrent matchComp processes per service
+DEFAULT_MAX_WORKERS = 3
+# Number of memoized search results
+DEFAULT_CACHE_SIZE = 256
+
+_serviceD = {}
+_serviceLock = threading.Lock()
+
+
+class MatchCompService:
+    """Memo of matchComp reports per library version, with a bounded number of concurrent matchComp processes."""
+
+    def __init__(self, toolRunner, scratchPath, maxWorkers=DEFAULT_MAX_WORKERS, cacheSize=DEFAULT_CACHE_SIZE, log=sys.stderr):
+        self.__toolRunner = toolRunner
+        self.__scratchPath = scratchPath
+        self.__maxWorkers = maxWorkers
+        self.__cacheSize = cacheSize
+        self.__lfh = log
+        self.__lock = threading.Lock()
+        self.__resultD = OrderedDict()
+        self.__executor = None
+        self.__librarySignature = None
+
+    @property
+    def toolRunner(self):
+        return self.__toolRunner
+
+    def submit(self, inputFilePath, option, log=None):
+        """Submit a search of the chemical component file inputFilePath with matchComp option string option.
+        A memoized result is returned if the same input was searched with the same option and library.
+
+        :Returns:
+            concurrent.futures.Future whose result is the matchComp report text ("" on failure)
+        """
+        ifh = open(inputFilePath, "rb")
+        data = ifh.read()
+        ifh.close()
+        signature = self.__getLibrarySignature()
+        with self.__lock:
+            # the pool is checked and used under the same lock, so that shutdown() or a library change
+            # in another thread cannot leave this thread submitting to a pool which has been shut down
+            executor = self.__getExecutor(signature)
+            key = (signature, option, hashlib.sha256(data).hexdigest())
+            future = self.__resultD.get(key)
+            if future is not None:
+                self.__resultD.move_to_end(key)
+                (log or self.__lfh).write("+MatchCompService.submit() reusing result for %s\n" % option)
+                return future
+            future = executor.submit(self.__search, data, option, log or self.__lfh)
+            self.__resultD[key] = future
+            while len(self.__resultD) > self.__cacheSize:
+                self.__resultD.popitem(last=False)
+        future.add_done_callback(lambda f: self.__discardFailed(key, f))
+        return future
+
+    def match(self, inputFilePath, option, log=None):
+        """Search inputFilePath with option and return the matchComp report text"""
+        return self.submit(inputFilePath, option, log=log).result()
+
+    def shutdown(self):
+        """Stop the pool and discard memoized results"""
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=False)
+            self.__executor = None
+            self.__librarySignature = None
+            self.__resultD.clear()
+
+    def __getExecutor(self, signature):
+        """Return the pool, discarding memoized results if the library has changed.  Called with the lock held."""
+        if (self.__executor is None) or (signature != self.__librarySignature):
+            if self.__executor is not None:
+                self.__lfh.write("+MatchCompService() library changed - discarding memoized results\n")
+                self.__executor.shutdown(wait=False)
+            self.__executor = ThreadPoolExecutor(max_workers=self.__maxWorkers)
+            self.__librarySignature = signature
+            self.__resultD.clear()
+        return self.__executor
+
+    def __getLibrarySignature(self):
+        sigList = []
+        for filePath in self.__toolRunner.getCcDictFiles():
+            try:
+                st = os.stat(filePath)
+                sigList.append((filePath, st.st_mtime, st.st_size))
+            except OSError:
+                sigList.append((filePath, None, None))
+        return tuple(sigList)
+
+    def __search(self, data, option, log):
+        """Run matchComp for the input data in a private scratch directory"""
+        workPath = tempfile.mkdtemp(dir=self.__scratchPath, prefix="match_")
+        try:
+            ofh = open(os.path.join(workPath, "in.cif"), "wb")
+            ofh.write(data)
+            ofh.close()
+            sdbFile, idxFile = self.__toolRunner.getCcDictFiles()
+            args = ["-i", "in.cif", "-lib", sdbFile, "-index", idxFile, "-type", "structure"]
+            args.extend(["-o", "result", "-op", option])
+            self.__toolRunner.run("matchComp", args, workPath, log=log)
+            resultFilePath = os.path.join(workPath, "result")
+            if not os.access(resultFilePath, os.R_OK):
+                return ""
+            ifh = open(resultFilePath)
+            text = ifh.read()
+            ifh.close()
+            return text
+        finally:
+            shutil.rmtree(workPath, ignore_errors=True)
+
+    def __discardFailed(self, key, future):
+        """Do not memoize failed or empty searches"""
+        if future.cancelled() or (future.exception() is not None) or (not future.result()):
+            with self.__lock:
+                if self.__resultD.get(key) is future:
+                    del self.__resultD[key]
+
+
+def getMatchCompService(siteId, log=sys.stderr):
+    """Return the process-wide matchComp result memo for siteId"""
+    toolRunner = getToolRunner(siteId, log=log)
+    service = _serviceD.get(toolRunner.siteConfig.siteId)
+    if (service is not None) and (service.toolRunner is toolRunner):
+        return service
+    with _serviceLock:
+        service = _serviceD.get(toolRunner.siteConfig.siteId)
+        if (service is None) or (service.toolRunner is not toolRunner):
+            if service is not None:
+                service.shutdown()
+            scratchPath = toolRunner.siteConfig.getCachePath("match_comp")
+            service = MatchCompService(toolRunner, scratchPath, log=log)
+            _serviceD[toolRunner.siteConfig.siteId] = service
+    return service
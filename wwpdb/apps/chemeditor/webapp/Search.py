@@ -2,6 +2,13 @@
 # File:  Search.py
 # Date:  26-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  matchComp options are passed without shell quoting (ToolRunner)
+# 18-Oct-2026  agent  run the relaxed search modes concurrently and merge results in mode order
+# 18-Oct-2026  agent  filter obsolete hits with CcdStatusIndex instead of parsing sandbox files
+# 18-Oct-2026  agent  skip exact matchComp modes when the up-to-date fingerprint index has no same-composition candidate
+# 18-Oct-2026  agent  add mode=similarity fingerprint Tanimoto ranking
+# 18-Oct-2026  agent  report annotation and matchComp failures through getErrorMessage()
+# 18-Oct-2026  agent  trust the fingerprint index only if it matches the modification time of every sandbox file
 ##
 """
 
@@ -23,11 +30,21 @@ __version__ = "V0.07"
 
 import os
 import sys
+import traceback
 from operator import itemgetter
 
+from wwpdb.apps.chemeditor.webapp.CcdFingerprintIndex import getCcdFingerprintIndex
+from wwpdb.apps.chemeditor.webapp.CcdStatusIndex import getCcdStatusIndex
 from wwpdb.apps.chemeditor.webapp.ChemCompDbUtil import ChemCompDbUtil
+from wwpdb.apps.chemeditor.webapp.ChemCompStructure import readCifFile
 from wwpdb.apps.chemeditor.webapp.ChemEditorBase import ChemEditorBase
-from wwpdb.io.file.mmCIFUtil import mmCIFUtil
+
+EXACT_SEARCH_OPTIONS = ("prefilter|strict|skip-h|exact",)
+RELAXED_SEARCH_OPTIONS = (
+    "prefilter|relaxedstereo|skip-h|exact",
+    "prefilter|relaxed|skip-h|allowextra",
+    "prefilter|relaxed|skip-h|close",
+)
 
 
 class Search(ChemEditorBase):
@@ -70,30 +87,93 @@ class Search(ChemEditorBase):
         )
         self.__idMap = {}
         self.__idList = []
+        self.__maxHits = 15
+        self.__errorMessage = ""
 
     def GetResult(self):
         self._getInputCifData(os.path.join(self._sessionPath, "in.cif"))
-        self._updateCompCif(self._sessionPath, "in.cif")
-        self.__search()
+        if not os.access(os.path.join(self._sessionPath, "in.cif"), os.R_OK):
+            self.__errorMessage = "no chemical component definition"
+        elif not self._updateCompCif(self._sessionPath, "in.cif"):
+            self.__errorMessage = "annotateComp failed"
+        if self._reqObj.getValue("mode") == "similarity":
+            self.__similaritySearch()
+        else:
+            self.__search()
         return self.__returnData()
 
+    def getErrorMessage(self):
+        """Return "" if the last GetResult() annotated the input and read a matchComp report for every
+        search mode it ran, else a message saying what failed
+        """
+        return self.__errorMessage
+
     def __search(self):
         filePath = os.path.join(self._sessionPath, "in.cif")
         if not os.access(filePath, os.R_OK):
             return
         exact_flag = self._reqObj.getValue("exact")
         if exact_flag == "yes":
-            self.__runSearchScript("'prefilter|strict|skip-h|exact'")
+            optionList = EXACT_SEARCH_OPTIONS
         else:
-            self.__runSearchScript("'prefilter|relaxedstereo|skip-h|exact'")
-            self.__runSearchScript("'prefilter|relaxed|skip-h|allowextra'")
-            self.__runSearchScript("'prefilter|relaxed|skip-h|close'")
+            optionList = RELAXED_SEARCH_OPTIONS
+        shortlist = self.__getShortlist(filePath)
+        # All modes run concurrently; results are merged in option order
+        futureList = []
+        for option in optionList:
+            if (shortlist is not None) and (not shortlist) and option.endswith("|exact"):
+                self._lfh.write("+Search.__search() no component with the same composition - skip %s\n" % option)
+                continue
+            futureList.append(self._submitMatchComp(filePath, option))
+        failedCount = 0
+        for future in futureList:
+            data = future.result()
+            if not data:
+                # a matchComp report has a header line even without hits
+                failedCount += 1
+            self.__parseSearchResult(data)
+        if failedCount and (not self.__errorMessage):
+            self.__errorMessage = "matchComp failed for %d of %d search modes" % (failedCount, len(futureList))
         if self.__siteName == "RCSB":
             self.__getDuplicatesFromCompv4Database(filePath)
 
-    def __runSearchScript(self, option):
-        self._runMatchComp(self._sessionPath, "in.cif", "search_result", option)
-        self.__parseSearchResult()
+    def __similaritySearch(self):
+        """Rank the dictionary by fingerprint Tanimoto similarity and keep the top_k (default 15) released hits"""
+        filePath = os.path.join(self._sessionPath, "in.cif")
+        if not os.access(filePath, os.R_OK):
+            return
+        try:
+            self.__maxHits = int(self._reqObj.getValue("top_k"))
+        except ValueError:
+            pass
+        fpIndex = getCcdFingerprintIndex(self._siteConfig.siteId, log=self._lfh)
+        # Ask for extra hits to allow for obsolete components
+        hitList = fpIndex.similarity(readCifFile(filePath)[0], topK=2 * self.__maxHits)
+        if not hitList:
+            return
+        for ccId, score in hitList:
+            if (ccId in self.__idMap) or (not self.__isValidId(ccId)):
+                continue
+            self.__idMap[ccId] = "yes"
+            standard = 1
+            if ccId in self.__standardComponents:
+                standard = 0
+            self.__idList.append((ccId, -score, standard))
+
+    def __getShortlist(self, filePath):
+        """Return the ids of the components with the same heavy-atom composition as filePath from the
+        fingerprint index, or None if the index is not available or may be out of date with the sandbox
+        """
+        try:
+            fpIndex = getCcdFingerprintIndex(self._siteConfig.siteId, log=self._lfh)
+            if not fpIndex.isFresh(self._siteConfig.cIAppCc.get_site_cc_cvs_path()):
+                self._lfh.write("+Search.__getShortlist() fingerprint index is not up to date with the sandbox\n")
+                return None
+            containerObj = readCifFile(filePath)[0]
+            return fpIndex.shortlist(containerObj)
+        except:  # noqa: E722 pylint: disable=bare-except
+            traceback.print_exc(file=self._lfh)
+            return None
 
     def __getDuplicatesFromCompv4Database(self, filePath):
         """Get duplicate CCD list from compv4 database"""
@@ -110,13 +190,9 @@ class Search(ChemEditorBase):
                 standard = 0
             self.__idList.append((ccId, 0, standard))
 
-    def __parseSearchResult(self):
-        filePath = os.path.join(self._sessionPath, "search_result")
-        if not os.access(filePath, os.R_OK):
+    def __parseSearchResult(self, data):
+        if not data:
             return
-        f = open(filePath)
-        data = f.read()
-        f.close()
         llist = data.split("\n")
         for line in llist[1:]:
             if not line:
@@ -138,12 +214,16 @@ class Search(ChemEditorBase):
             self.__idList.append((vlist[4], diff, standard))
 
     def __isValidId(self, ccId):
-        filePath = self.getSandBoxFilePath(ccId)
-        if (not filePath) or (not os.access(filePath, os.F_OK)):
-            return False
-        cifObj = mmCIFUtil(filePath=filePath)
-        status = cifObj.GetSingleValue("chem_comp", "pdbx_release_status").upper()
-        if status == "OBS":
+        statusIndex = getCcdStatusIndex(self._siteConfig.siteId, verbose=self._verbose, log=self._lfh)
+        entry = statusIndex.lookup(ccId)
+        if entry is None:
+            filePath = self.getSandBoxFilePath(ccId)
+            if (not filePath) or (not os.access(filePath, os.F_OK)):
+                return False
+            entry = statusIndex.update(ccId, filePath)
+            if entry is None:
+                return False
+        if entry[0] == "OBS":
             return False
         return True
 
@@ -153,7 +233,7 @@ class Search(ChemEditorBase):
             if len(self.__idList) > 1:
                 self.__idList.sort(key=itemgetter(1, 2))
             number = len(self.__idList)
-            number = min(number, 15)
+            number = min(number, self.__maxHits)
             for i in range(number):
                 if data:
                     data += "\n"
@@ -0,0 +1,131 @@
+##
+# File:  SiteConfigCache.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Process-wide cache of per-site configuration snapshots.
+
+ConfigInfo, ConfigInfoAppCommon, ConfigInfoAppCc and ChemRefPathInfo are resolved once per
+site and process and shared by every request.  A snapshot is rebuilt only when the site
+configuration cache file changes on disk or when reloadSiteConfig() is called explicitly.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import glob
+import os
+import threading
+import time
+
+from wwpdb.io.locator.ChemRefPathInfo import ChemRefPathInfo
+from wwpdb.utils.config.ConfigInfo import ConfigInfo
+from wwpdb.utils.config.ConfigInfoApp import ConfigInfoAppCc, ConfigInfoAppCommon
+
+# Minimum number of seconds between two checks of the site configuration file
+CHECK_INTERVAL = 30.0
+
+_snapshotD = {}
+_snapshotLock = threading.Lock()
+
+
+class SiteConfigSnapshot:
+    """Immutable bundle of the configuration objects used by the chemeditor application for one site."""
+
+    def __init__(self, siteId, signature=None):
+        self.__siteId = siteId
+        self.__signature = signature
+        self.__checkTime = time.time()
+        self.__cI = ConfigInfo(siteId=siteId, verbose=False)
+        self.__cICommon = ConfigInfoAppCommon(siteId=siteId, verbose=False)
+        self.__cIAppCc = ConfigInfoAppCc(siteId=siteId, verbose=False)
+        self.__crpi = ChemRefPathInfo(siteId=siteId, configObj=self.__cI, configCommonObj=self.__cICommon)
+
+    @property
+    def siteId(self):
+        return self.__siteId
+
+    @property
+    def signature(self):
+        return self.__signature
+
+    @property
+    def cI(self):
+        """ConfigInfo object"""
+        return self.__cI
+
+    @property
+    def cICommon(self):
+        """ConfigInfoAppCommon object"""
+        return self.__cICommon
+
+    @property
+    def cIAppCc(self):
+        """ConfigInfoAppCc object"""
+        return self.__cIAppCc
+
+    @property
+    def crpi(self):
+        """ChemRefPathInfo object"""
+        return self.__crpi
+
+    def getCachePath(self, name):
+        """Return (and create if needed) the site-wide chemeditor cache directory for name"""
+        cachePath = os.path.join(self.__cICommon.get_site_web_apps_top_sessions_path(), "chemeditor_cache", name)
+        if not os.access(cachePath, os.F_OK):
+            try:
+                os.makedirs(cachePath)
+            except OSError:
+                # created concurrently by another process
+                pass
+        return cachePath
+
+    def isStale(self, now):
+        """Return True if the configuration file has changed since this snapshot was built.
+        The file system is consulted at most once every CHECK_INTERVAL seconds.
+        """
+        if now - self.__checkTime < CHECK_INTERVAL:
+            return False
+        self.__checkTime = now
+        return getConfigFileSignature(self.__siteId) != self.__signature
+
+
+def getConfigFileSignature(siteId):
+    """Return (path, mtime, size) tuples for the site configuration cache files of siteId"""
+    topPath = os.getenv("TOP_WWPDB_SITE_CONFIG_DIR")
+    if (not topPath) or (not siteId):
+        return ()
+    sigList = []
+    for filePath in sorted(glob.glob(os.path.join(topPath, "*", str(siteId).lower(), "ConfigInfoFileCache.*"))):
+        try:
+            st = os.stat(filePath)
+            sigList.append((filePath, st.st_mtime, st.st_size))
+        except OSError:
+            pass
+    return tuple(sigList)
+
+
+def getSiteConfig(siteId):
+    """Return the shared configuration snapshot for siteId, building it on first use"""
+    siteId = str(siteId)
+    snapshot = _snapshotD.get(siteId)
+    if (snapshot is not None) and (not snapshot.isStale(time.time())):
+        return snapshot
+    with _snapshotLock:
+        current = _snapshotD.get(siteId)
+        if (current is None) or (current is snapshot):
+            current = SiteConfigSnapshot(siteId, signature=getConfigFileSignature(siteId))
+            _snapshotD[siteId] = current
+    return current
+
+
+def reloadSiteConfig(siteId=None):
+    """Discard the snapshot for siteId (or all snapshots) so that it is rebuilt on next use"""
+    with _snapshotLock:
+        if siteId is None:
+            _snapshotD.clear()
+        else:
+            _snapshotD.pop(str(siteId), None)
@@ -0,0 +1,221 @@
+##
+# File:  ToolRunner.py
+# Date:  18-Oct-2026
+#
+# Updated
+"""
+Launch the external annotation and chemical component tools used by the chemical editor.
+
+Each tool family environment (annotation tools, cc-tools, cc-tools plus CCD dictionary files) is
+built once per site configuration snapshot.  Programs are started directly with subprocess (no
+intermediate shell) and their output is captured in memory.
+"""
+
+__author__ = "agent"
+__email__ = "agent@local"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+ToolResult = namedtuple("ToolResult", ["program", "returnCode", "stdout", "stderr", "wallTime"])
+
+# program name -> tool family
+PROGRAM_FAMILY = {
+    "annotateComp": "cc-tools",
+    "matchComp": "cc-dict",
+    "GetAtomMatch": "annot",
+    "precheckComp": "annot",
+    "FindMissingCoordinate": "annot",
+    "GetEnumeration_json": "annot",
+}
+
+# Environment variables naming the third-party installations used by each tool family
+TOOLCHAIN_DIRS = {
+    "cc-tools": ("OE_DIR", "ACD_DIR", "CACTVS_DIR", "CORINA_DIR", "BABEL_DIR", "INCHI_DIR"),
+}
+
+_runnerD = {}
+_runnerLock = threading.Lock()
+
+
+class ToolRunner:
+    """Run external tools with prebuilt per-family environments and record wall time and exit status."""
+
+    def __init__(self, siteConfig, verbose=False, log=sys.stderr):
+        self.__verbose = verbose
+        self.__lfh = log
+        self.__siteConfig = siteConfig
+        self.__cICommon = siteConfig.cICommon
+        self.__cIAppCc = siteConfig.cIAppCc
+        self.__envD = {}
+        self.__binPathD = {}
+        self.__statsD = {}
+        self.__statsLock = threading.Lock()
+        self.__setup()
+
+    @property
+    def siteConfig(self):
+        return self.__siteConfig
+
+    def getEnvironment(self, family):
+        """Return the environment dictionary for the input tool family"""
+        return self.__envD[family]
+
+    def getCcDictFiles(self):
+        """Return (serialized library file, index file) of the chemical component dictionary"""
+        return self.__envD["cc-dict"]["CC_SDB_FILE"], self.__envD["cc-dict"]["CC_IDX_FILE"]
+
+    def getProgramPath(self, program):
+        """Return the full path of the input program"""
+        return os.path.join(self.__binPathD[PROGRAM_FAMILY[program]], program)
+
+    def getProgramVersion(self, program):
+        """Return a version signature (path, modification time and size) of the input program binary"""
+        programPath = self.getProgramPath(program)
+        try:
+            st = os.stat(programPath)
+            return "%s:%d:%d" % (programPath, int(st.st_mtime), st.st_size)
+        except OSError:
+            return programPath
+
+    def getToolchainVersion(self, family):
+        """Return a version signature (resolved path and modification time) of the third-party
+        installations (OpenEye, ACD, CACTVS, CORINA, ...) used by the input tool family
+        """
+        sigList = []
+        for name in TOOLCHAIN_DIRS.get(family, ()):
+            dirPath = self.__envD[family].get(name)
+            if not dirPath:
+                continue
+            realPath = os.path.realpath(dirPath)
+            try:
+                sigList.append("%s=%s:%d" % (name, realPath, int(os.stat(realPath).st_mtime)))
+            except OSError:
+                sigList.append("%s=%s" % (name, realPath))
+        return ";".join(sigList)
+
+    def run(self, program, args, workingPath, timeout=None, log=None):
+        """Run program with argument list args in directory workingPath.
+
+        :Returns:
+            ToolResult with exit status, captured stdout/stderr text and wall time (seconds).
+            A return code of -1 indicates a timeout, 127 a program that could not be started.
+        """
+        lfh = log if log is not None else self.__lfh
+        cmdList = [self.getProgramPath(program)] + [str(arg) for arg in args]
+        lfh.write("running cmd=%s (cwd=%s)\n" % (" ".join(cmdList), workingPath))
+        startTime = time.time()
+        try:
+            proc = subprocess.Popen(  # noqa: S603
+                cmdList,
+                cwd=workingPath,
+                env=self.__envD[PROGRAM_FAMILY[program]],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+            try:
+                out, err = proc.communicate(timeout=timeout)
+                returnCode = proc.returncode
+            except subprocess.TimeoutExpired:
+                # kill the whole process group; a child still holding the output pipes would keep communicate() waiting
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except OSError:
+                    proc.kill()
+                out, err = proc.communicate()
+                returnCode = -1
+                err += ("\n%s timed out after %s seconds\n" % (program, timeout)).encode()
+        except OSError as e:
+            out = b""
+            err = ("%s could not be started: %s\n" % (program, str(e))).encode()
+            returnCode = 127
+        result = ToolResult(
+            program,
+            returnCode,
+            out.decode("utf-8", "replace"),
+            err.decode("utf-8", "replace"),
+            time.time() - startTime,
+        )
+        self.__record(result)
+        lfh.write("+ToolRunner.run() %s exit status %d wall time %.3f s\n" % (program, returnCode, result.wallTime))
+        if (returnCode != 0) or self.__verbose:
+            for text in (result.stdout, result.stderr):
+                if text:
+                    lfh.write(text if text.endswith("\n") else text + "\n")
+        return result
+
+    def getStats(self):
+        """Return {program: {"calls": n, "failures": n, "wallTime": seconds}} accumulated by this runner"""
+        with self.__statsLock:
+            return {program: dict(statD) for program, statD in self.__statsD.items()}
+
+    def __record(self, result):
+        with self.__statsLock:
+            statD = self.__statsD.setdefault(result.program, {"calls": 0, "failures": 0, "wallTime": 0.0})
+            statD["calls"] += 1
+            if result.returnCode != 0:
+                statD["failures"] += 1
+            statD["wallTime"] += result.wallTime
+
+    def __setup(self):
+        """Build the environment of each tool family"""
+        baseEnv = dict(os.environ)
+
+        annotEnv = dict(baseEnv)
+        annotEnv["RCSBROOT"] = self.__cICommon.get_site_annot_tools_path()
+        annotEnv["COMP_PATH"] = self.__cIAppCc.get_site_cc_cvs_path()
+        annotEnv["BINPATH"] = os.path.join(annotEnv["RCSBROOT"], "bin")
+        self.__envD["annot"] = annotEnv
+        self.__binPathD["annot"] = annotEnv["BINPATH"]
+
+        ccToolsEnv = dict(baseEnv)
+        ccToolsEnv["CC_TOOLS"] = os.path.join(self.__cICommon.get_site_cc_apps_path(), "bin")
+        ccToolsEnv["OE_DIR"] = self.__cICommon.get_site_cc_oe_dir()
+        ccToolsEnv["OE_LICENSE"] = self.__cICommon.get_site_cc_oe_licence()
+        ccToolsEnv["ACD_DIR"] = self.__cICommon.get_site_cc_acd_dir()
+        ccToolsEnv["CACTVS_DIR"] = self.__cICommon.get_site_cc_cactvs_dir()
+        ccToolsEnv["CORINA_DIR"] = os.path.join(self.__cICommon.get_site_cc_corina_dir(), "bin")
+        ccToolsEnv["BABEL_DIR"] = self.__cICommon.get_site_cc_babel_dir()
+        ccToolsEnv["BABEL_DATADIR"] = self.__cICommon.get_site_cc_babel_datadir()
+        ccToolsEnv["INCHI_DIR"] = self.__cICommon.get_site_cc_inchi_dir()
+        ccToolsEnv["LD_LIBRARY_PATH"] = ":".join(
+            [
+                self.__cICommon.get_site_cc_babel_lib(),
+                os.path.join(self.__cICommon.get_site_local_apps_path(), "lib"),
+                self.__cICommon.get_site_cc_acd_dir(),
+            ]
+        )
+        self.__envD["cc-tools"] = ccToolsEnv
+        self.__binPathD["cc-tools"] = ccToolsEnv["CC_TOOLS"]
+
+        ccDictEnv = dict(ccToolsEnv)
+        ccDictEnv["CC_DICT"] = self.__cIAppCc.get_site_cc_dict_path()
+        ccDictEnv["CC_IDX_FILE"] = self.__cIAppCc.get_cc_dict_idx()
+        ccDictEnv["CC_SDB_FILE"] = self.__cIAppCc.get_cc_dict_serial()
+        self.__envD["cc-dict"] = ccDictEnv
+        self.__binPathD["cc-dict"] = ccToolsEnv["CC_TOOLS"]
+
+
+def getToolRunner(siteId, verbose=False, log=sys.stderr):
+    """Return the process-wide ToolRunner for siteId.  The runner is rebuilt when the site configuration is reloaded."""
+    siteConfig = getSiteConfig(siteId)
+    runner = _runnerD.get(siteConfig.siteId)
+    if (runner is not None) and (runner.siteConfig is siteConfig):
+        return runner
+    with _runnerLock:
+        runner = _runnerD.get(siteConfig.siteId)
+        if (runner is None) or (runner.siteConfig is not siteConfig):
+            runner = ToolRunner(siteConfig, verbose=verbose, log=log)
+            _runnerD[siteConfig.siteId] = runner
+    return runner
@@ -2,6 +2,7 @@
 # File:  UpdateLigand.py
 # Date:  27-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  run FindMissingCoordinate through ToolRunner
 ##
 """
 
@@ -68,18 +69,11 @@ class UpdateLigand(ChemEditorBase):
                 break
         if (not self.__instanceid) or (not self.__cclinkFile):
             return
-        cmd = (
-            "cd "
-            + self._sessionPath
-            + " ; "
-            + self._annotBashSetting()
-            + " ${BINPATH}/FindMissingCoordinate -comp in.cif -cclink "
-            + self.__cclinkFile
-            + " -instanceid "
-            + self.__instanceid
-            + " -log merge_log > _merge_log 2>&1 ; "
+        self._runTool(
+            "FindMissingCoordinate",
+            ["-comp", "in.cif", "-cclink", self.__cclinkFile, "-instanceid", self.__instanceid, "-log", "merge_log"],
+            self._sessionPath,
         )
-        self._runCmd(cmd)
 
     def __updateDefaultValue(self):
         filePath = os.path.join(self._sessionPath, "in.cif")
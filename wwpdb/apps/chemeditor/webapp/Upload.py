@@ -2,6 +2,11 @@
 # File:  Upload.py
 # Date:  26-Feb-2013
 # Updates:
+# 18-Oct-2026  agent  stream the upload in chunks with a size cap and gzip/bz2/xz decompression
+# 18-Oct-2026  agent  keep zip and tar archives as files (ArchiveUpload)
+# 18-Oct-2026  agent  cap the text returned to the editor, accept zero padding after compressed data
+# 18-Oct-2026  agent  recognize archives on their leading ARCHIVE_HEADER_BYTES bytes, add getMaxUploadBytes()
+# 18-Oct-2026  agent  add getError(); a failed upload never leaves a file path behind
 ##
 """
 
@@ -19,18 +24,38 @@ __docformat__ = "restructuredtext en"
 __author__ = "Zukang Feng"
 __email__ = "zfeng@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
-__version__ = "V0.07"
+__version__ = "V0.08"
 
+import bz2
+import codecs
+import io
+import lzma
 import ntpath
 import os
 import sys
 import traceback
+import zlib
+
+from wwpdb.apps.chemeditor.webapp.ComponentArchive import (
+    ARCHIVE_HEADER_BYTES,
+    getArchiveType,
+)
+from wwpdb.apps.chemeditor.webapp.SiteConfigCache import getSiteConfig
+
+# Size of the pieces read from the upload and written to the session directory
+CHUNK_SIZE = 1024 * 1024
+# Default cap on the (decompressed) size of an upload; site setting SITE_CHEMEDITOR_MAX_UPLOAD_BYTES
+DEFAULT_MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+# Cap on the number of bytes of an upload returned as text to the editor
+MAX_TEXT_BYTES = 4 * 1024 * 1024
+# Leading bytes of the compressed formats that are expanded while streaming
+_COMPRESSION_MAGIC = ((b"\x1f\x8b", "gz"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"))
 
 
 class Upload:
     """ """
 
-    def __init__(self, reqObj=None, verbose=False, log=sys.stderr):
+    def __init__(self, reqObj=None, maxBytes=None, verbose=False, log=sys.stderr):
         self.__verbose = verbose
         self.__lfh = log
         self.__reqObj = reqObj
@@ -39,6 +64,11 @@ class Upload:
         self.__sessionPath = None
         # self.__rltvSessionPath = None
         self.__fileName = None
+        self.__data = ""
+        self.__isArchive = False
+        self.__isTruncated = False
+        self.__errMsg = None
+        self.__maxBytes = maxBytes if maxBytes is not None else getMaxUploadBytes(str(self.__reqObj.getValue("WWPDB_SITE_ID")))
         self.__getSession()
 
     def __getSession(self):
@@ -56,12 +86,31 @@ class Upload:
         self.__uploadFile()
         return self.__returnData()
 
+    def getFilePath(self):
+        """Return the path of the stored upload, or None if the upload failed"""
+        if not self.__fileName:
+            return None
+        return os.path.join(self.__sessionPath, self.__fileName)
+
+    def isArchive(self):
+        """Return True if the upload is a zip or tar archive; its text is then not returned by GetResult()"""
+        return self.__isArchive
+
+    def getError(self):
+        """Return the reason the upload was rejected or failed, or None"""
+        return self.__errMsg
+
+    def isTruncated(self):
+        """Return True if the upload is larger than MAX_TEXT_BYTES; GetResult() then returns only its leading text"""
+        return self.__isTruncated
+
     def __uploadFile(self):
         if self.__verbose:
             self.__lfh.write("+Upload.__uploadFile() - file upload starting\n")
         #
         # Copy upload file to session directory -
         #
+        fs = None
         try:
             fs = self.__reqObj.getRawValue("data")
             fNameInput = str(fs.filename).lower()
@@ -73,6 +122,13 @@ class Upload:
                 self.__fileName = ntpath.basename(fNameInput)
             else:
                 self.__fileName = os.path.basename(fNameInput)
+            #
+            # Compressed uploads are stored expanded, without the compression suffix -
+            #
+            firstChunk = fs.file.read(CHUNK_SIZE)
+            kind = getCompression(firstChunk)
+            if kind and self.__fileName.endswith("." + kind):
+                self.__fileName = self.__fileName[: -len(kind) - 1]
             if self.__verbose:
                 self.__lfh.write("+Upload.__uploadFile() - upload file %s\n" % fs.filename)
                 self.__lfh.write("+Upload.__uploadFile() - base file   %s\n" % self.__fileName)
@@ -80,21 +136,150 @@ class Upload:
             # Store upload file in session directory -
             #
             fPathAbs = os.path.join(self.__sessionPath, self.__fileName)
-            ofh = open(fPathAbs, "wb")
-            ofh.write(fs.file.read())
-            ofh.close()
+            self.__data = saveUpload(_iterChunks(fs.file, firstChunk), fPathAbs, self.__maxBytes, compression=kind)
+            self.__isArchive = self.__data is None
+            self.__isTruncated = (not self.__isArchive) and (os.path.getsize(fPathAbs) > MAX_TEXT_BYTES)
+        except ValueError as e:
+            self.__lfh.write("+Upload.__uploadFile() File upload rejected for %s: %s\n" % (str(getattr(fs, "filename", None)), str(e)))
+            self.__fileName = None
+            self.__errMsg = str(e)
         except:  # noqa: E722 pylint: disable=bare-except
+            self.__fileName = None
+            self.__errMsg = "File upload failed"
             if self.__verbose:
-                self.__lfh.write("+Upload.__uploadFile() File upload processing failed for %s\n" % str(fs.filename))
+                self.__lfh.write("+Upload.__uploadFile() File upload processing failed for %s\n" % str(getattr(fs, "filename", None)))
                 traceback.print_exc(file=self.__lfh)
 
     def __returnData(self):
-        data = ""
-        if not self.__fileName:
-            return data
-        filePath = os.path.join(self.__sessionPath, self.__fileName)
-        if os.access(filePath, os.R_OK):
-            f = open(filePath)
-            data = f.read()
-            f.close()
-        return data
+        if (not self.__fileName) or self.__isArchive:
+            return ""
+        return self.__data
+
+
+def getMaxUploadBytes(siteId):
+    """Return the cap on the (decompressed) size of an upload set by SITE_CHEMEDITOR_MAX_UPLOAD_BYTES for siteId"""
+    try:
+        return int(getSiteConfig(siteId).cI.get("SITE_CHEMEDITOR_MAX_UPLOAD_BYTES", DEFAULT_MAX_UPLOAD_BYTES))
+    except:  # noqa: E722 pylint: disable=bare-except
+        return DEFAULT_MAX_UPLOAD_BYTES
+
+
+def getCompression(data):
+    """Return "gz", "bz2" or "xz" if data starts like a file of that compression format, else None"""
+    for magic, kind in _COMPRESSION_MAGIC:
+        if data.startswith(magic):
+            return kind
+    return None
+
+
+def _iterChunks(ifh, firstChunk=b"", chunkSize=CHUNK_SIZE):
+    """Yield firstChunk and then the rest of ifh in pieces of chunkSize bytes"""
+    if firstChunk:
+        yield firstChunk
+    while True:
+        chunk = ifh.read(chunkSize)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _newDecompressor(kind):
+    if kind == "gz":
+        return zlib.decompressobj(zlib.MAX_WBITS | 16)
+    if kind == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor()
+
+
+def decompressChunks(chunkIter, kind, chunkSize=CHUNK_SIZE):
+    """Yield the expanded data of the kind ("gz", "bz2" or "xz") compressed chunks of chunkIter in pieces
+    of at most chunkSize bytes, so that a highly compressed upload never expands in memory at once.
+    Zero bytes padding the data after the last stream are ignored.  Raises ValueError for corrupt or truncated data.
+    """
+    decomp = None
+    padded = False
+    try:
+        for data in chunkIter:
+            if padded:
+                if data.strip(b"\x00"):
+                    raise ValueError("data after the zero padding of %s data" % kind)
+                continue
+            while data:
+                if (decomp is not None) and decomp.eof and (not data.strip(b"\x00")):
+                    # zero padding after the last stream (e.g. written by tape or block devices)
+                    padded = True
+                    break
+                if (decomp is None) or decomp.eof:
+                    # concatenated streams (e.g. pigz or pbzip2 output) continue with a new decompressor
+                    decomp = _newDecompressor(kind)
+                if kind == "gz":
+                    out = decomp.decompress(data, chunkSize)
+                    data = decomp.unconsumed_tail
+                else:
+                    out = decomp.decompress(data, max_length=chunkSize)
+                    data = b""
+                    while (not decomp.eof) and (not decomp.needs_input):
+                        if out:
+                            yield out
+                        out = decomp.decompress(b"", max_length=chunkSize)
+                if out:
+                    yield out
+                if decomp.eof:
+                    data = decomp.unused_data + data
+        if kind == "gz" and (decomp is not None):
+            out = decomp.flush()
+            if out:
+                yield out
+    except (OSError, EOFError, zlib.error, lzma.LZMAError) as e:
+        raise ValueError("corrupt %s data: %s" % (kind, str(e))) from e
+    if (decomp is not None) and (not decomp.eof):
+        raise ValueError("truncated %s data" % kind)
+
+
+def saveUpload(chunkIter, filePath, maxBytes, compression=None, maxTextBytes=MAX_TEXT_BYTES):
+    """Write the byte chunks of chunkIter to filePath, expanding them if compression is given, and
+    return the first maxTextBytes bytes of the content as text (UTF-8, universal newlines), or None
+    for a zip or tar archive.  The file is removed and ValueError is raised if the (expanded)
+    content exceeds maxBytes.
+    """
+    if compression:
+        chunkIter = decompressChunks(chunkIter, compression)
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+    textList = []
+    textBytes = 0
+    # chunks read before the leading ARCHIVE_HEADER_BYTES bytes are known
+    pendingList = []
+    isArchive = None
+    size = 0
+    ofh = open(filePath, "wb")
+    try:
+        for chunk in chunkIter:
+            size += len(chunk)
+            if size > maxBytes:
+                raise ValueError("upload exceeds %d bytes" % maxBytes)
+            ofh.write(chunk)
+            if isArchive is None:
+                pendingList.append(chunk)
+                if size < ARCHIVE_HEADER_BYTES:
+                    continue
+                chunk = b"".join(pendingList)
+                pendingList = []
+                isArchive = getArchiveType(chunk) is not None
+            if (not isArchive) and (textBytes < maxTextBytes):
+                chunk = chunk[: maxTextBytes - textBytes]
+                textBytes += len(chunk)
+                textList.append(decoder.decode(chunk))
+        if isArchive is None:
+            # upload shorter than ARCHIVE_HEADER_BYTES
+            data = b"".join(pendingList)
+            isArchive = getArchiveType(data) is not None
+            textList.append(decoder.decode(data[:maxTextBytes]))
+        textList.append(decoder.decode(b"", final=True))
+    except:  # noqa: E722 pylint: disable=bare-except
+        ofh.close()
+        os.remove(filePath)
+        raise
+    ofh.close()
+    if isArchive:
+        return None
+    return "".join(textList)